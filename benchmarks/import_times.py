@@ -0,0 +1,88 @@
+"""
+Import-time report for the app modules.
+
+Each module is imported in a fresh interpreter with `python -X importtime`;
+the report lists its own cumulative import time, the time on top of the
+Streamlit/pandas baseline every page pays anyway, and the most expensive
+dependencies it pulled in:
+
+    python -m benchmarks.import_times
+    python -m benchmarks.import_times --modules utils.analysis --top 15 --out build/import_times.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = ["streamlit", "pandas"]
+MODULES = [
+    "utils.data_loader",
+    "utils.charts",
+    "utils.analysis",
+    "utils.network",
+    "utils.dedup",
+    "utils.instrumentation",
+]
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_profile(module, baseline=BASELINE):
+    """Per-module (self_us, cumulative_us, depth) from `-X importtime` for `module`."""
+    code = "".join(f"import {m}\n" for m in baseline) + f"import {module}\n"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    profile = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            self_us, cumulative_us, indent, name = m.groups()
+            profile[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return profile
+
+
+def report(modules, top=10):
+    baseline = import_profile("sys", baseline=BASELINE)
+    results = []
+    for module in modules:
+        profile = import_profile(module)
+        # modules imported only because of `module` (the baseline ones are cached)
+        extra = {name: v for name, v in profile.items() if name not in baseline}
+        heaviest = sorted(
+            ((name, v[1]) for name, v in extra.items() if v[2] <= 1 and name != module),
+            key=lambda item: item[1], reverse=True
+        )[:top]
+        results.append({
+            "module": module,
+            "cumulative_ms": profile.get(module, (0, 0, 0))[1] / 1000,
+            "new_modules": len(extra),
+            "heaviest_dependencies_ms": {name: us / 1000 for name, us in heaviest},
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--out", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    results = report(args.modules, top=args.top)
+    for r in results:
+        print(f"{r['module']:<26} {r['cumulative_ms']:9.1f} ms  ({r['new_modules']} modules beyond streamlit/pandas)")
+        for name, ms in r["heaviest_dependencies_ms"].items():
+            print(f"    {name:<40} {ms:9.1f} ms")
+
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
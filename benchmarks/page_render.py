@@ -0,0 +1,181 @@
+"""
+End-to-end render benchmark of the report pages.
+
+Every page script runs headlessly through Streamlit's app-testing API in its
+own process, reading the workbooks from this checkout (no network). Each page
+is rendered cold (empty caches) and then warm (a rerun in the same session);
+wall time per run, per `st.plotly_chart` / `st.dataframe` element and the
+RSS / peak RSS of the process are written as JSON:
+
+    python -m benchmarks.page_render --out build/page_render.json
+    python -m benchmarks.page_render --pages pages/Q4_2025_Report.py --warm-runs 3
+"""
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE_PATTERNS = [
+    "pages/Q*_2025_Report.py",
+    "pages/*_Annual_Report_*.py",
+    "pages/2024/*.py",
+]
+TIMED_ELEMENTS = ["plotly_chart", "dataframe"]
+
+
+def discover_pages():
+    pages = []
+    for pattern in PAGE_PATTERNS:
+        pages.extend(sorted(glob.glob(os.path.join(ROOT, pattern))))
+    return [os.path.relpath(p, ROOT) for p in pages]
+
+
+def _peak_rss_bytes():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _current_rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+
+class ElementTimer:
+    """
+    Wraps `st.plotly_chart` / `st.dataframe` while a page runs.
+
+    `seconds` is the time spent inside the Streamlit call (serialization);
+    `since_previous` also covers the page code since the previous element,
+    i.e. the chart builder or table preparation feeding it.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._originals = {}
+        self._last = None
+
+    def __enter__(self):
+        import streamlit as st
+
+        for name in TIMED_ELEMENTS:
+            original = getattr(st, name)
+            self._originals[name] = original
+            setattr(st, name, self._wrap(name, original))
+        return self
+
+    def __exit__(self, *exc):
+        import streamlit as st
+
+        for name, original in self._originals.items():
+            setattr(st, name, original)
+
+    def start_run(self):
+        self._last = time.perf_counter()
+
+    def _wrap(self, name, original):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                self.records.append({
+                    "element": name,
+                    "index": sum(r["element"] == name for r in self.records),
+                    "seconds": end - start,
+                    "since_previous": end - self._last,
+                })
+                self._last = end
+        return timed
+
+
+def render_page(page, warm_runs=1, timeout=300):
+    """Cold run plus `warm_runs` reruns of one page, in the current process."""
+    os.chdir(ROOT)
+    os.environ["CITATION_DATA_DIR"] = ROOT
+    sys.path.insert(0, ROOT)
+
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    from utils import disk_cache
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    disk_cache.ENABLED = False  # cold means parsing the workbooks, as for a fresh host
+
+    result = {"page": page, "rss_before_bytes": _current_rss_bytes(), "runs": []}
+    app = AppTest.from_file(os.path.join(ROOT, page), default_timeout=timeout)
+
+    with ElementTimer() as timer:
+        for i in range(1 + warm_runs):
+            timer.records = []
+            timer.start_run()
+            start = time.perf_counter()
+            app.run()
+            result["runs"].append({
+                "cache": "cold" if i == 0 else "warm",
+                "seconds": time.perf_counter() - start,
+                "elements": timer.records,
+                "exceptions": [e.message for e in app.exception],
+                "rss_bytes": _current_rss_bytes(),
+                "peak_rss_bytes": _peak_rss_bytes(),
+            })
+    return result
+
+
+def run(pages, warm_runs=1, timeout=300):
+    """Render every page in a fresh interpreter so RSS and caches start clean."""
+    results = []
+    for page in pages:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.page_render", "--child", page,
+             "--warm-runs", str(warm_runs), "--timeout", str(timeout)],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            result = {"page": page, "error": proc.stderr.strip().splitlines()[-1:]}
+        else:
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+        results.append(result)
+
+        for r in result.get("runs", []):
+            status = "; ".join(r["exceptions"]) or "ok"
+            print(f"{page:<40} {r['cache']:<5} {r['seconds']:8.3f}s  "
+                  f"{r['peak_rss_bytes'] / 2**20:7.1f} MiB  {status[:60]}")
+        if "error" in result:
+            print(f"{page:<40} failed: {result['error']}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", nargs="+", help="page scripts relative to the repo root (default: all reports)")
+    parser.add_argument("--warm-runs", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--out", default="build/page_render.json")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = render_page(args.child, warm_runs=args.warm_runs, timeout=args.timeout)
+        print(json.dumps(result))
+        return
+
+    from benchmarks.run_benchmarks import environment
+
+    results = run(args.pages or discover_pages(), warm_runs=args.warm_runs, timeout=args.timeout)
+    out = os.path.join(ROOT, args.out) if not os.path.isabs(args.out) else args.out
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    print(f"results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
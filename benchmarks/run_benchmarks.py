@@ -0,0 +1,186 @@
+"""
+Scaling benchmarks for loading, normalization, chart builders and analysis.
+
+Times (best/median of `--repeat` runs) and peak traced memory of every stage
+at every synthetic dataset size, written as JSON:
+
+    python -m benchmarks.run_benchmarks --sizes 1000 10000 --out build/bench.json
+    python -m benchmarks.run_benchmarks --compare build/bench_old.json build/bench.json
+"""
+import argparse
+import datetime
+import inspect
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from importlib import metadata
+
+import pandas as pd
+
+from benchmarks.synthetic import SCHEMA_2024, generate_citations, write_workbook
+from utils import analysis, charts, disk_cache
+from utils.data_loader import normalize_citation_data, read_workbook
+from utils.network import build_network
+
+YEAR = 2025
+ALL_MONTHS = tuple(range(1, 13))
+
+# Chart builders that add one trace per document get skipped above these sizes
+ROW_LIMITS = {
+    "citation_stack": 20_000,
+    "radar_chart": 20_000,
+}
+
+
+def _months(data):
+    names = data["date_of_publication"].dt.strftime("%B").dropna().unique()
+    return " - ".join(sorted(names, key=lambda m: pd.to_datetime(m, format="%B").month))
+
+
+def _stages(raw, data, workbook):
+    months = _months(data)
+    # the analysis steps are written against the 2024 workbooks
+    data_2024 = normalize_citation_data(raw.rename(columns=SCHEMA_2024))
+    stages = {
+        "normalize": lambda: normalize_citation_data(raw.copy()),
+        "total_citations_trend": lambda: charts.total_citations_trend(data, months, YEAR, *ALL_MONTHS),
+        "output_type_bar_chart": lambda: charts.output_type_bar_chart(data, YEAR),
+        "sunburst_chart": lambda: charts.sunburst_chart(data, months, YEAR),
+        "trend_line_chart": lambda: charts.trend_line_chart(data, months, YEAR, *ALL_MONTHS),
+        "radar_chart": lambda: charts.radar_chart(data, months, YEAR),
+        "annual_bar": lambda: charts.annual_bar(data, YEAR),
+        "citation_stack": lambda: charts.citation_stack(data, months=months, year=YEAR),
+        "network_chart": lambda: charts.network_chart(*inspect.unwrap(build_network)(data, kind="author")),
+        "normalize_and_analyze": lambda: analysis.normalize_and_analyze(
+            data_2024, "ranking/weight", ["type_of_eige's_output_cited_agg"]
+        ),
+    }
+    if workbook is not None:
+        stages = {"load": lambda: read_workbook(workbook), **stages}
+    return stages
+
+
+def measure(func, repeat):
+    """Run `func` `repeat` times; return timings and the peak traced allocation."""
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    seconds.sort()
+    return {
+        "seconds": seconds,
+        "best": seconds[0],
+        "median": seconds[len(seconds) // 2],
+        "peak_bytes": peak,
+    }
+
+
+def run(sizes, repeat=3, max_excel_rows=100_000, stages=None, workdir=None):
+    disk_cache.ENABLED = False  # time the builders, not cache reads
+    results = []
+    workdir = workdir or tempfile.mkdtemp(prefix="citation-bench-")
+
+    for size in sizes:
+        raw = generate_citations(size, year=YEAR)
+        workbook = None
+        if size <= max_excel_rows:
+            workbook = write_workbook(raw, os.path.join(workdir, f"{YEAR}_{size}.xlsx"))
+        data = normalize_citation_data(raw.copy())
+
+        for name, func in _stages(raw, data, workbook).items():
+            if stages and name not in stages:
+                continue
+            entry = {"size": size, "stage": name}
+            if size > ROW_LIMITS.get(name, float("inf")):
+                entry["skipped"] = f"more than {ROW_LIMITS[name]} rows"
+            else:
+                try:
+                    entry.update(measure(func, repeat))
+                except Exception as exc:  # measure the other stages, then fail the run (main)
+                    entry["error"] = repr(exc)
+            results.append(entry)
+            print(f"{size:>9} {name:<24} {entry.get('best', entry.get('skipped') or 'ERROR ' + entry.get('error', ''))}")
+
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    packages = {}
+    for name in ["pandas", "numpy", "plotly", "openpyxl", "scipy", "scikit-learn", "streamlit"]:
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "packages": packages,
+    }
+
+
+def compare(old_path, new_path):
+    """Print the best-time ratio new/old for every (size, stage) present in both runs."""
+    def load(path):
+        with open(path) as f:
+            return {(r["size"], r["stage"]): r for r in json.load(f)["results"] if "best" in r}
+
+    old, new = load(old_path), load(new_path)
+    for key in sorted(old.keys() & new.keys()):
+        ratio = new[key]["best"] / old[key]["best"] if old[key]["best"] else float("inf")
+        print(f"{key[0]:>9} {key[1]:<24} {old[key]['best']:.4f}s -> {new[key]['best']:.4f}s  x{ratio:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-excel-rows", type=int, default=100_000,
+                        help="skip the workbook load stage above this size (openpyxl is slow)")
+    parser.add_argument("--stages", nargs="+", help="only run these stages")
+    parser.add_argument("--out", default="build/benchmarks.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = run(args.sizes, repeat=args.repeat, max_excel_rows=args.max_excel_rows, stages=args.stages)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    print(f"results written to {args.out}")
+
+    errors = [r for r in results if "error" in r]
+    if errors:
+        raise SystemExit(
+            f"{len(errors)} stage(s) failed:\n"
+            + "\n".join(f"  {r['size']:>9} {r['stage']}: {r['error']}" for r in errors)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Synthetic citation monitoring data with the exact schema of
+`data/2025_data/2025Q*.xlsx` (and the matching `*_map.xlsx` geo workbooks).
+
+    python -m benchmarks.synthetic --rows 1000 100000 --out build/synthetic
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Column headers exactly as they appear in the quarterly workbooks
+COLUMNS = [
+    "date of publication",
+    "name of the document citing EIGE",
+    "URL of the document citing EIGE",
+    "name of the author/organisation citing EIGE",
+    "name of the institution citing EIGE",
+    "name of the journal citing EIGE",
+    "EIGE's output cited",
+    "type of EIGE's output cited",
+    "year of publication of EIGE's output cited",
+    "topic",
+    "impact factor of the journal: 1 respectable; 2 strong; 3 very strong (using free version of scopus)",
+    "number of citations (using google scholar)",
+    "location of the citation: 3 body of the article; 2 introduction; 1 bibliography/reference",
+    "category of mention: 1 positive; 0 neutral; -1 negative",
+    "number of mentions in social media using altmetric",
+    "ranking/weight",
+    "SOURCE",
+]
+GEO_COLUMNS = ["location", "latitude", "longitude"]
+# The 2024 workbooks name the institution column differently (utils.analysis expects it)
+SCHEMA_2024 = {"name of the institution citing EIGE": "name of the institution"}
+
+# Observed shares in the 2025 workbooks
+OUTPUT_TYPES = {
+    "Report": 0.34, None: 0.18, "Web section, index": 0.11, "Thesaurus": 0.08,
+    "Toolkit": 0.07, "General reference": 0.06, "Gender Statistics database": 0.04,
+    "Web section, GM": 0.03, "Factsheet": 0.03, "Research note": 0.02,
+    "Web section, BPfA": 0.02, "Web section, GBV": 0.02,
+}
+OUTPUTS = {
+    "Report": ["Gender in health", "Gender equality and economic independence", "Gender pay gap report"],
+    "Web section, index": ["Gender Equality Index", "Gender Equality Index 2024: Sustaining Momentum on a Fragile Path"],
+    "Thesaurus": ["Glossary & Thesaurus"],
+    "Toolkit": ["Gender Equality in Academia and Research. GEAR tool", "Gender impact assessment toolkit"],
+    "General reference": ["General reference to EIGE's work"],
+    "Gender Statistics database": ["Gender statistics database"],
+    "Web section, GM": ["Gender mainstreaming"],
+    "Factsheet": ["Gender Equality Index factsheet"],
+    "Research note": ["Gender gaps in care research note"],
+    "Web section, BPfA": ["Beijing Platform for Action"],
+    "Web section, GBV": ["Gender-based violence"],
+}
+TOPICS = [
+    "Gender mainstreaming and funding", "Thriving in a gender-equal economy",
+    "Leading equally throughout society", "Being free from violence and stereotypes",
+    "Promoting gender equality and women’s empowerment across the world", None,
+]
+TOPIC_P = [0.27, 0.17, 0.15, 0.15, 0.10, 0.16]
+SOURCES = ["Google Scholar", "Scite", "Google", None]
+SOURCE_P = [0.33, 0.2, 0.15, 0.32]
+# Relative publication volume per month (more in spring and autumn)
+MONTH_P = np.array([8, 9, 10, 9, 8, 6, 5, 5, 8, 10, 11, 11], dtype=float)
+
+WORDS = (
+    "gender equality women men care work labour market violence policy europe "
+    "analysis evidence leadership health education digital gap pay index rural "
+    "academic research social inclusion mainstreaming budgeting stereotypes "
+    "migration family employment public sector survey youth climate energy "
+    "transport poverty income pension time use decision making representation"
+).split()
+FIRST_NAMES = "Anna Maria Juan Eva Luca Sofia Jan Ines Marta Tomas Elena Pieter Olga Nina Marek Laura".split()
+SURNAMES = (
+    "Garcia Novak Rossi Jensen Kowalski Muller Silva Dubois Horvat Nielsen Popescu "
+    "Ivanova Schmidt Fernandez Bianchi Virtanen Papadopoulos Costa Martin Bauer"
+).split()
+CITIES = [
+    ("Madrid", 40.42, -3.70), ("Paris", 48.86, 2.35), ("Berlin", 52.52, 13.40),
+    ("Rome", 41.90, 12.50), ("Warsaw", 52.23, 21.01), ("Lisbon", 38.72, -9.14),
+    ("Vienna", 48.21, 16.37), ("Stockholm", 59.33, 18.07), ("Helsinki", 60.17, 24.94),
+    ("Athens", 37.98, 23.73), ("Dublin", 53.35, -6.26), ("Prague", 50.08, 14.44),
+    ("Toronto", 43.65, -79.38), ("Nairobi", -1.29, 36.82), ("Sydney", -33.87, 151.21),
+]
+
+
+def _pick(rng, values, p, size):
+    idx = rng.choice(len(values), size=size, p=np.asarray(p) / np.sum(p))
+    return np.asarray(values, dtype=object)[idx]
+
+
+def generate_citations(n_rows, year=2025, seed=0, schema=2025):
+    """
+    Raw citation rows (unnormalized headers, mixed date formats) for `year`,
+    with the headers of the 2025 (or `schema=2024`) workbooks.
+
+    Documents have 1+ mentions (geometric, ~1.5 on average as in the real
+    data); journals, institutions and authors are drawn from pools that
+    scale with the number of documents.
+    """
+    rng = np.random.default_rng(seed)
+
+    mentions = rng.geometric(0.65, size=n_rows)
+    n_docs = int(np.searchsorted(np.cumsum(mentions), n_rows) + 1)
+    doc_of_row = np.repeat(np.arange(n_docs), mentions[:n_docs])[:n_rows]
+
+    n_journals = max(5, int(n_docs * 0.8))
+    n_institutions = max(10, int(n_docs * 0.9))
+    n_authors = max(20, int(n_docs * 2.5))
+
+    # ---------- document level ----------
+    words = np.array(WORDS, dtype=object)
+    title_len = rng.integers(6, 13, size=n_docs)
+    title_words = rng.integers(0, len(words), size=(n_docs, 12))
+    titles = [
+        " ".join(words[title_words[i, :title_len[i]]]).capitalize() + f" ({i})"
+        for i in range(n_docs)
+    ]
+    urls = [f"https://doi.org/10.0000/synthetic.{year}.{i}" for i in range(n_docs)]
+
+    author_pool = [
+        f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {SURNAMES[(i // len(FIRST_NAMES)) % len(SURNAMES)]}-{i}"
+        for i in range(n_authors)
+    ]
+    authors_per_doc = rng.integers(1, 7, size=n_docs)
+    author_draws = rng.zipf(1.6, size=(n_docs, 6)) % n_authors
+    authors = [
+        ", ".join(author_pool[a] for a in author_draws[i, :authors_per_doc[i]])
+        for i in range(n_docs)
+    ]
+
+    inst_city = rng.integers(0, len(CITIES), size=n_institutions)
+    institution_pool = [
+        f"University of {CITIES[c][0]} {i}" if i % 4 else f"Institute of Social Research {i}, {CITIES[c][0]}"
+        for i, c in enumerate(inst_city)
+    ]
+    institutions = np.asarray(institution_pool, dtype=object)[rng.zipf(1.4, size=n_docs) % n_institutions]
+    journals = np.asarray(
+        [f"Journal of {WORDS[i % len(WORDS)].title()} Studies {i}" for i in range(n_journals)], dtype=object
+    )[rng.zipf(1.3, size=n_docs) % n_journals]
+
+    month = rng.choice(12, size=n_docs, p=MONTH_P / MONTH_P.sum()) + 1
+    day = rng.integers(1, 29, size=n_docs)
+    dates = pd.to_datetime({"year": np.full(n_docs, year), "month": month, "day": day})
+    # the workbooks mix real dates with "dd.mm.yyyy" strings
+    as_text = rng.random(n_docs) < 0.7
+    dates = np.where(as_text, dates.dt.strftime("%d.%m.%Y"), dates.dt.to_pydatetime())
+
+    impact = np.where(rng.random(n_docs) < 0.7, np.nan, rng.integers(1, 4, size=n_docs))
+    citations = np.where(rng.random(n_docs) < 0.2, np.nan, rng.geometric(0.5, size=n_docs))
+    altmetric = np.where(rng.random(n_docs) < 0.35, np.nan, rng.poisson(0.4, size=n_docs))
+    sources = _pick(rng, SOURCES, SOURCE_P, n_docs)
+
+    # ---------- mention level ----------
+    types = _pick(rng, list(OUTPUT_TYPES), list(OUTPUT_TYPES.values()), n_rows)
+    outputs = np.array([
+        OUTPUTS[t][rng.integers(len(OUTPUTS[t]))] if t is not None else None for t in types
+    ], dtype=object)
+    output_year = np.where(pd.isna(types), np.nan, rng.integers(2013, year + 1, size=n_rows))
+    topics = _pick(rng, TOPICS, TOPIC_P, n_rows)
+    location = np.where(rng.random(n_rows) < 0.2, np.nan, rng.choice([3, 2, 1], size=n_rows, p=[0.65, 0.3, 0.05]))
+    category = np.where(np.isnan(location), np.nan, rng.choice([1, 0, -1], size=n_rows, p=[0.96, 0.03, 0.01]))
+
+    d = doc_of_row
+    weight = (
+        0.3 * np.nan_to_num(citations[d]) + 0.2 * np.nan_to_num(impact[d])
+        + 0.2 * np.nan_to_num(altmetric[d]) + 0.15 * np.nan_to_num(location)
+        + 0.15 * np.nan_to_num(category)
+    ).round(2)
+    weight = np.where(rng.random(n_rows) < 0.15, np.nan, weight)
+
+    data = pd.DataFrame(dict(zip(COLUMNS, [
+        dates[d], np.asarray(titles, dtype=object)[d], np.asarray(urls, dtype=object)[d],
+        np.asarray(authors, dtype=object)[d], institutions[d], journals[d],
+        outputs, types, output_year, topics,
+        impact[d], citations[d], location, category, altmetric[d], weight, sources[d],
+    ])))
+    return data.rename(columns=SCHEMA_2024) if schema == 2024 else data
+
+
+def generate_geo(citations, seed=0):
+    """Map workbook rows (location, latitude, longitude) for the citing institutions."""
+    rng = np.random.default_rng(seed)
+    names = pd.unique(citations["name of the institution citing EIGE"].dropna())
+    city = {c[0]: c for c in CITIES}
+    rows = []
+    for name in names:
+        _, lat, lon = next((city[c] for c in city if c in name), CITIES[0])
+        rows.append((name, lat + rng.normal(0, 0.3), lon + rng.normal(0, 0.3)))
+    return pd.DataFrame(rows, columns=GEO_COLUMNS)
+
+
+def write_workbook(data, path):
+    """Write with xlsxwriter in constant-memory mode so 1M rows stay feasible."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with pd.ExcelWriter(path, engine="xlsxwriter", engine_kwargs={"options": {"constant_memory": True}}) as writer:
+        data.to_excel(writer, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="build/synthetic")
+    args = parser.parse_args(argv)
+
+    for n in args.rows:
+        data = generate_citations(n, year=args.year, seed=args.seed)
+        path = write_workbook(data, os.path.join(args.out, f"{args.year}_{n}.xlsx"))
+        write_workbook(generate_geo(data, seed=args.seed), os.path.join(args.out, f"{args.year}_{n}_map.xlsx"))
+        print(f"{path}: {len(data)} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 import streamlit as st
-from io import BytesIO
-from docx import Document
 import pandas as pd
-from utils.data_loader import get_data,load_geospatial_data
-from utils.charts import output_type_bar_chart, sunburst_chart, trend_line_chart, citation_stack, radar_chart, scatterplot
+from utils.data_loader import get_shared_data
+from utils.charts import output_type_bar_chart, sunburst_chart, trend_line_chart, citation_stack, radar_chart
+from utils.instrumentation import start_page, section, finish_page
+from utils import comparisons, countries, downloads, geo, warmup
+from utils.filters import sidebar_filters
+
+start_page("Q1 2024 Report")
+warmup.start(current="2024Q1")
 
 # Sidebar navigation using native hamburger menu
 st.sidebar.image("./data/b&s_logo.png")
@@ -14,14 +18,17 @@ st.sidebar.image("./data/pil_logo.png")
 file_urls = ["https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/data/Q12024_13012025.xlsx"]
 geo_url =  ['https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/data/2024Q1_map.xlsx']                      
 
-# Fetch data using the modified get_data function
-data = get_data(file_urls)
-geo_data = load_geospatial_data(geo_url)
+# Fetch data: one read-only frame shared by all sessions
+data = get_shared_data(file_urls)
+data, filtered = sidebar_filters(data, file_urls)
+view = data if filtered else None  # the cached per-dataset tables serve the page until a filter is set
+section("Map")
+geo_data = geo.citation_points(file_urls, geo_url, view=view)
 
 st.header("Analysis")
 
 #------EXTRACT DATE-------
-data["month"] = data["date_of_publication"].dt.strftime('%B')
+section("EXTRACT DATE")
 #group by year and a month
 # Get unique months, ignoring NaN, and sort them in calendar order
 unique_months = sorted(
@@ -34,6 +41,7 @@ formatted_months = " - ".join(unique_months)
 formatted_months = str(formatted_months)
 
 #-----INTRO
+section("INTRO")
 st.markdown("""
 This section presents the findings and analysis of the quarterly reports (January-March 2024).
             
@@ -45,10 +53,13 @@ The presentation is organised as follows:
 
 """)
 #-----------3.1 NUMBER OF MENTIONS
+section("3.1 NUMBER OF MENTIONS")
 st.subheader("3.1 Number of mentions")
 st.markdown("""
 In general, the number of mentions to EIGE (15) by academia seems limited when compared to the number of mentions to EIGE made by other institutions. However, due to the nature of the academic publications, the ‘rhythm’ of publishing in general is considerably slower and it is not possible to compare them with other types of publications that do not have such a lengthy and controlled procedure.
             """)
+# Changes on the previous periods, generated from the cached comparisons
+comparisons.comparison_section(2024, 1)
 
 st.markdown("""
     <div style="background-color: #949494; color: white; padding: 10px; border-radius: 8px;">
@@ -62,6 +73,7 @@ The 15 citations identified correspond to 10 different articles, which means tha
 """)
 
 #----------3.2 EIGE's output cited
+section("3.2 EIGE's output cited")
 st.subheader("3.2 EIGE's output cited")
 
 st.markdown("""
@@ -128,7 +140,10 @@ st.write(data[selected_columns].drop_duplicates().dropna().rename(columns={
 st.markdown("""
 The academic publications have been prepared by 34 different authors. Most of them belong to different EU universities (except for one research institution in Mexico, one in the United Kingdom, and two in Australia). There are neither any repeated authors nor repeated universities.
             """)
-st.map(data=geo_data, size=100)
+geo.map_section(geo_data, weights="mentions", label="mentions")
+section("Countries")
+st.subheader("Countries of institutions citing EIGE")
+countries.country_section(file_urls, geo_url, view=view)
 
 st.markdown("""
 The articles citing to EIGE have been published in 9 different journals, most of them from the EU (7).
@@ -163,38 +178,27 @@ While the impact metrics described above provide us with a micro view on the aca
 
 
 #-----DOWNLOAD
-# Save the reoport
-# Path to your existing .docx file
-doc_file_path = "data/2025-01-15 2024 report.docx"
-# Open the file in binary mode
-with open(doc_file_path, "rb") as file:
-    file_data = file.read()
-
-# Path to your existing Excel file
-excel_file_path = "data/Q12024_13012025.xlsx"
-# Open the Excel file in binary mode
-with open(excel_file_path, "rb") as file:
-    excel_data = file.read()
-
-
+section("DOWNLOAD")
 #two cols
 col1, col2 = st.columns(2)
 
 with col1:
-        # Create a report download button
-    st.download_button(
-        label="Download the Q1 2024 report",
-        data=file_data,
-        file_name="Q12024_report.docx",
-        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        type="primary"
+    # Report download button: the file is read only when clicked
+    downloads.file_button(
+        "Download the Q1 2024 report", "data/2025-01-15 2024 report.docx",
+        file_name="Q12024_report.docx", type="primary"
     )
 with col2:
-    # Create data download button
-    st.download_button(
-        label="Download the monitoring data",
-        data=excel_data,
-        file_name="Q12024_13012025.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        type="primary"
-    )
\ No newline at end of file
+    # Data download button
+    downloads.file_button(
+        "Download the monitoring data", "data/Q12024_13012025.xlsx",
+        file_name="Q12024_13012025.xlsx", type="primary"
+    )
+
+# Word report generated from the aggregates and charts of the whole report
+downloads.report_button("Generate the Q1 2024 Word report from the current data", "2024Q1", view=view)
+
+# Exports of the data shown on the page (sidebar filters applied)
+downloads.export_buttons(data, "Q12024_13012025")
+
+finish_page()
@@ -1,9 +1,13 @@
 import streamlit as st
-from io import BytesIO
-from docx import Document
 import pandas as pd
-from utils.data_loader import get_data,load_geospatial_data
-from utils.charts import output_type_bar_chart, sunburst_chart, trend_line_chart, citation_stack, radar_chart, scatterplot
+from utils.data_loader import get_shared_data
+from utils.charts import output_type_bar_chart, sunburst_chart, trend_line_chart, citation_stack, radar_chart
+from utils.instrumentation import start_page, section, finish_page
+from utils import comparisons, countries, downloads, geo, warmup
+from utils.filters import sidebar_filters
+
+start_page("Q2 2024 Report")
+warmup.start(current="2024Q2")
 
 # Sidebar navigation using native hamburger menu
 st.sidebar.image("./data/b&s_logo.png")
@@ -14,13 +18,15 @@ st.sidebar.image("./data/pil_logo.png")
 file_urls = ["https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/data/2024Q2_29012025.xlsx"]
 geo_url =  ['https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/data/2024Q2_map.xlsx']                     
 
-# Fetch data using the modified get_data function
-data = get_data(file_urls)
+# Fetch data: one read-only frame shared by all sessions
+data = get_shared_data(file_urls)
+data, filtered = sidebar_filters(data, file_urls)
+view = data if filtered else None  # the cached per-dataset tables serve the page until a filter is set
 
 st.header("Analysis")
 
 #------EXTRACT DATE-------
-data["month"] = data["date_of_publication"].dt.strftime('%B')
+section("EXTRACT DATE")
 #group by year and a month
 # Get unique months, ignoring NaN, and sort them in calendar order
 unique_months = sorted(
@@ -31,6 +37,7 @@ unique_months = sorted(
 formatted_months = " - ".join(unique_months)
 
 #-----INTRO
+section("INTRO")
 
 st.markdown("""
 This section presents the findings and analysis of the quarterly reports (April-June 2024).
@@ -43,12 +50,15 @@ The presentation is organised as follows:
 
 """)
 #-----------3.1 NUMBER OF MENTIONS
+section("3.1 NUMBER OF MENTIONS")
 st.subheader("3.1 Number of mentions")
 
 st.markdown("""
-In general, the number of mentions to EIGE (17) by academia seems limited when compared to the number of mentions to EIGE made by other institutions.  However, it has slightly increased when compared with Q1 (15).
+In general, the number of mentions to EIGE (17) by academia seems limited when compared to the number of mentions to EIGE made by other institutions.
 The 17 citations identified correspond to eight different articles, including one article with seven citations to EIGE.
             """)
+# Changes on the previous periods, generated from the cached comparisons
+comparisons.comparison_section(2024, 2)
 
 st.markdown("""
     <div style="background-color: #949494; color: white; padding: 10px; border-radius: 8px;">
@@ -62,6 +72,7 @@ st.plotly_chart(citation_stack(data, formatted_months, 2024))
 #""")
 
 #----------3.2 EIGE's output cited
+section("3.2 EIGE's output cited")
 st.subheader("3.2 EIGE's output cited")
 
 st.markdown("""
@@ -125,8 +136,12 @@ There are neither any repeated authors nor repeated universities.
 The following map shows the location of the institutions that cite EIGE’s outputs.
 """)
 
-geo_data = load_geospatial_data(geo_url)
-st.map(data=geo_data, size=100)
+section("Map")
+geo_data = geo.citation_points(file_urls, geo_url, view=view)
+geo.map_section(geo_data, weights="mentions", label="mentions")
+section("Countries")
+st.subheader("Countries of institutions citing EIGE")
+countries.country_section(file_urls, geo_url, view=view)
 
 st.markdown("""
 The articles citing EIGE have been published in eight different journals, most of them from the EU (3).""")
@@ -176,38 +191,27 @@ with st.container():
     )
 
 #-----DOWNLOAD
-# Save the reoport
-# Path to your existing .docx file
-doc_file_path = "data/2025-02-07_Q22024_report.docx"
-# Open the file in binary mode
-with open(doc_file_path, "rb") as file:
-    file_data = file.read()
-
-# Path to your existing Excel file
-excel_file_path = "data/2024Q2_29012025.xlsx"
-# Open the Excel file in binary mode
-with open(excel_file_path, "rb") as file:
-    excel_data = file.read()
-
-
+section("DOWNLOAD")
 #two cols
 col1, col2 = st.columns(2)
 
 with col1:
-        # Create a report download button
-    st.download_button(
-        label="Download the Q2 2024 report",
-        data=file_data,
-        file_name="Q2_2024_report.docx",
-        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        type="primary"
+    # Report download button: the file is read only when clicked
+    downloads.file_button(
+        "Download the Q2 2024 report", "data/2025-02-07_Q22024_report.docx",
+        file_name="Q2_2024_report.docx", type="primary"
     )
 with col2:
-    # Create data download button
-    st.download_button(
-        label="Download the monitoring data",
-        data=excel_data,
-        file_name="2024Q2_29012025.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        type="primary"
-    )
\ No newline at end of file
+    # Data download button
+    downloads.file_button(
+        "Download the monitoring data", "data/2024Q2_29012025.xlsx",
+        file_name="2024Q2_29012025.xlsx", type="primary"
+    )
+
+# Word report generated from the aggregates and charts of the whole report
+downloads.report_button("Generate the Q2 2024 Word report from the current data", "2024Q2", view=view)
+
+# Exports of the data shown on the page (sidebar filters applied)
+downloads.export_buttons(data, "2024Q2_29012025")
+
+finish_page()
@@ -1,9 +1,13 @@
 import streamlit as st
-from io import BytesIO
-from docx import Document
 import pandas as pd
-from utils.data_loader import get_data,load_geospatial_data
-from utils.charts import output_type_bar_chart, sunburst_chart, trend_line_chart, citation_stack, radar_chart, scatterplot
+from utils.data_loader import get_shared_data
+from utils.charts import output_type_bar_chart, sunburst_chart, trend_line_chart, citation_stack, radar_chart
+from utils.instrumentation import start_page, section, finish_page
+from utils import comparisons, countries, downloads, geo, warmup, weights
+from utils.filters import sidebar_filters
+
+start_page("Q3 2024 Report")
+warmup.start(current="2024Q3")
 
 # Sidebar navigation using native hamburger menu
 st.sidebar.image("./data/b&s_logo.png")
@@ -14,13 +18,15 @@ st.sidebar.image("./data/pil_logo.png")
 file_urls = ["https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/data/2024Q3_03022025.xlsx"]
 geo_url =  ['https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/data/2024Q3map.xlsx']                     
 
-# Fetch data using the modified get_data function
-data = get_data(file_urls)
+# Fetch data: one read-only frame shared by all sessions
+data = get_shared_data(file_urls)
+data, filtered = sidebar_filters(data, file_urls)
+view = data if filtered else None  # the cached per-dataset tables serve the page until a filter is set
 
 st.header("Analysis")
 
 #------EXTRACT DATE-------
-data["month"] = data["date_of_publication"].dt.strftime('%B')
+section("EXTRACT DATE")
 #group by year and a month
 # Get unique months, ignoring NaN, and sort them in calendar order
 unique_months = sorted(
@@ -31,6 +37,7 @@ unique_months = sorted(
 formatted_months = " - ".join(unique_months)
 
 #------INTRO-----------
+section("INTRO")
 st.write(f"This section presents the findings and analysis of the quarterly reports {formatted_months} 2024.")
             
 st.markdown("""
@@ -42,9 +49,12 @@ The presentation is organised as follows:
 
 """)
 #-----------3.1 NUMBER OF MENTIONS
+section("3.1 NUMBER OF MENTIONS")
 st.subheader("3.1 Number of mentions")
 
-st.write("In general, the number of mentions to EIGE (12) by academia seems limited when compared to the number of mentions to EIGE made by other institutions. It has slightly decreased when compared with Q2 (17). The 12 citations identified correspond to ten different articles, including one article with two citations to EIGE.")
+st.write("In general, the number of mentions to EIGE (12) by academia seems limited when compared to the number of mentions to EIGE made by other institutions. The 12 citations identified correspond to ten different articles, including one article with two citations to EIGE.")
+# Changes on the previous periods, generated from the cached comparisons
+comparisons.comparison_section(2024, 3)
 
 st.markdown("""
     <div style="background-color: #949494; color: white; padding: 10px; border-radius: 8px;">
@@ -54,12 +64,14 @@ st.markdown("""
 st.plotly_chart(citation_stack(data, formatted_months, 2024))
 
 #----------3.2 EIGE's output cited
+section("3.2 EIGE's output cited")
 st.subheader("3.2 EIGE's output cited")
 st.markdown("""
 The academic articles identified refer to six different EIGE’s outputs (reports, good practice, thesaurus, web sections (index and GBV), gender statistics database, and general reference to EIGE). The most frequently used output in Q3  is a report (4 citations). 
 When compared to the previous monitoring period (Q2) it is worth noting the decrease in the citations to EIGE’s web section – index and gender statistics database.
 """)
 #------MOST FREQUENT OUTPUT TYPE
+section("MOST FREQUENT OUTPUT TYPE")
 st.markdown("""
     <div style="background-color: #949494; color: white; padding: 10px; border-radius: 8px;">
         💡 Use the legend on the right side of the graph to remove or add the elements.
@@ -116,11 +128,16 @@ st.markdown("""
 The following map shows the location of the institutions that cite EIGE’s outputs.
 """)
 
-geo_data = load_geospatial_data(geo_url)
+section("Map")
+geo_data = geo.citation_points(file_urls, geo_url, view=view)
 st.write(f"**Figure 6. Location of institutions that cited EIGE, {formatted_months}, 2024**")
-st.map(data=geo_data, size=100)
+geo.map_section(geo_data, weights="mentions", label="mentions")
+section("Countries")
+st.subheader("Countries of institutions citing EIGE")
+countries.country_section(file_urls, geo_url, view=view)
 
 #-------SPLIT BY AUTHOR
+section("SPLIT BY AUTHOR")
 # Split the 'name_of_the_author/organisation_citing_eige' by commas
 split_values = data["name_of_the_author/organisation_citing_eige"].str.split(",", expand=True)
 # Stack the resulting DataFrame to get a single column of values
@@ -131,6 +148,7 @@ value_counts = stacked_values.value_counts()
 repeating_values = value_counts[value_counts > 1]
 
 #--------SPLIT BY UNIVERSITY
+section("SPLIT BY UNIVERSITY")
 # Split the 'name_of_the_universities' column by commas
 split_values_universities = data["name_of_the_institution"].str.split(",", expand=True)
 # Stack the resulting DataFrame to get a single column of university names
@@ -185,54 +203,44 @@ st.subheader("3.4.1 Impact ranking")
 st.markdown("While the impact metrics described above provide us with a micro view on the academic and social impact of the articles citing EIGE, it does not allow us to conduct a less granular analysis. To ensure comparability between the articles, we attributed a weight to each metric: 0,3 for number of citations, 0,2 for the impact factor and the altmetric, and 0,15 for location and category of the citation. ")
 with st.container():
     st.dataframe(
-        data[[
+        # the computed impact weight, the one the radar chart above ranks by
+        weights.with_weights(data)[[
             'location_of_the_citation:_3_body_of_the_article;_2_introduction;_1_bibliography/reference', 
             'impact_factor_of_the_journal:_1_respectable;_2_strong;_3_very_strong_(using_free_version_of_scopus)',
             'number_of_mentions_in_social_media_using_altmetric',
-            'ranking/weight'
+            'weight'
         ]]
         .rename(columns={
             'location_of_the_citation:_3_body_of_the_article;_2_introduction;_1_bibliography/reference': 'Location of the citation',
             'impact_factor_of_the_journal:_1_respectable;_2_strong;_3_very_strong_(using_free_version_of_scopus)': 'Impact factor',
             'number_of_mentions_in_social_media_using_altmetric': 'Altmetric',
-            'ranking/weight':'Weight'
+            'weight':'Weight'
         }),
         use_container_width=True  #
     )
 
 #-----DOWNLOAD
-# Save the reoport
-# Path to your existing .docx file
-doc_file_path = "data/2025-02-010_Q32024_report.docx"
-# Open the file in binary mode
-with open(doc_file_path, "rb") as file:
-    file_data = file.read()
-
-# Path to your existing Excel file
-excel_file_path = "data/2024Q3_03022025.xlsx"
-# Open the Excel file in binary mode
-with open(excel_file_path, "rb") as file:
-    excel_data = file.read()
-
-
+section("DOWNLOAD")
 #two cols
 col1, col2 = st.columns(2)
 
 with col1:
-        # Create a report download button
-    st.download_button(
-        label="Download the Q3 2024 report",
-        data=file_data,
-        file_name="Q3_2024_report.docx",
-        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        type="primary"
+    # Report download button: the file is read only when clicked
+    downloads.file_button(
+        "Download the Q3 2024 report", "data/2025-02-010_Q32024_report.docx",
+        file_name="Q3_2024_report.docx", type="primary"
     )
 with col2:
-    # Create data download button
-    st.download_button(
-        label="Download the monitoring data",
-        data=excel_data,
-        file_name="2024Q3_03022025.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        type="primary"
-    )
\ No newline at end of file
+    # Data download button
+    downloads.file_button(
+        "Download the monitoring data", "data/2024Q3_03022025.xlsx",
+        file_name="2024Q3_03022025.xlsx", type="primary"
+    )
+
+# Word report generated from the aggregates and charts of the whole report
+downloads.report_button("Generate the Q3 2024 Word report from the current data", "2024Q3", view=view)
+
+# Exports of the data shown on the page (sidebar filters applied)
+downloads.export_buttons(data, "2024Q3_03022025")
+
+finish_page()
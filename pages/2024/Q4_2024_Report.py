@@ -1,9 +1,13 @@
 import streamlit as st
-from io import BytesIO
-from docx import Document
 import pandas as pd
-from utils.data_loader import get_data,load_geospatial_data
-from utils.charts import output_type_bar_chart, sunburst_chart, trend_line_chart, citation_stack, radar_chart, scatterplot
+from utils.data_loader import get_shared_data
+from utils.charts import output_type_bar_chart, sunburst_chart, trend_line_chart, citation_stack, radar_chart
+from utils.instrumentation import start_page, section, finish_page
+from utils import comparisons, countries, downloads, geo, rollups, warmup, weights
+from utils.filters import sidebar_filters
+
+start_page("Q4 2024 Report")
+warmup.start(current="2024Q4")
 
 # Sidebar navigation using native hamburger menu
 st.sidebar.image("./data/b&s_logo.png")
@@ -14,11 +18,13 @@ st.sidebar.image("./data/pil_logo.png")
 file_urls = ["https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/data/2024Q4_20250203.xlsx"]
 geo_url =  ['https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/data/2024Q4map.xlsx']                     
 
-# Fetch data using the modified get_data function
-data = get_data(file_urls)
+# Fetch data: one read-only frame shared by all sessions
+data = get_shared_data(file_urls)
+data, filtered = sidebar_filters(data, file_urls)
+view = data if filtered else None  # the cached per-dataset tables serve the page until a filter is set
 
 #------EXTRACT DATE-------
-data["month"] = data["date_of_publication"].dt.strftime('%B')
+section("EXTRACT DATE")
 #group by year and a month
 # Get unique months, ignoring NaN, and sort them in calendar order
 unique_months = sorted(
@@ -32,6 +38,7 @@ st.header("Analysis")
 
 
 #------INTRO-----------
+section("INTRO")
 st.write(f"This section presents the findings and analysis of the quarterly reports {formatted_months} 2024.")
             
 st.markdown("""
@@ -43,9 +50,11 @@ The presentation is organised as follows:
 
 """)
 #-----------3.1 NUMBER OF MENTIONS
+section("3.1 NUMBER OF MENTIONS")
 st.subheader("3.1 Number of mentions")
+# Changes on the previous periods, generated from the cached comparisons
+comparisons.comparison_section(2024, 4)
 st.markdown("""
-In general, the number of mentions to EIGE (22) by academia in Q4 seems to be higher than in previous quarters Q2 (17), Q3 (12).
 The 22 citations identified correspond to fourteen different articles, including one article with eight, and one article with two citations to EIGE.
 """)
 st.markdown("""
@@ -60,6 +69,7 @@ st.plotly_chart(citation_stack(data, formatted_months, 2024))
 #""")
 
 #----------3.2 EIGE's output cited
+section("3.2 EIGE's output cited")
 st.subheader("3.2 EIGE's output cited")
 
 st.markdown("""
@@ -69,6 +79,7 @@ st.markdown("""
 When compared to the previous monitoring period (Q3) it is worth noting that a wider variety of EIGE outputs was cited.  """)
 
 #------MOST FREQUENT OUTPUT TYPE
+section("MOST FREQUENT OUTPUT TYPE")
 # Get the most frequent type and its count
 most_frequent_type = data["type_of_eige's_output_cited"].value_counts().idxmax()
 count = data["type_of_eige's_output_cited"].value_counts().max()
@@ -106,7 +117,7 @@ st.subheader("3.3 Documents citing EIGE")
 st.markdown("""
 Due to the nature of the academic publications monitored, it is not surprising to find that this type of documents are all research articles (except for one report on the OSF Platform, and one reference entry in an encyclopaedia). For Q4 we have not identified any books or monographs. """)
 
-st.write(f"The articles appeared in {data['name_of_the_journal_citing_eige'].nunique()} different journals.")
+st.write(f"The articles appeared in {rollups.distinct_count(file_urls, 'journals', view=view)} different journals.")
 
 st.markdown("""
     <div style="background-color: #949494; color: white; padding: 10px; border-radius: 8px;">
@@ -130,11 +141,16 @@ The academic publications have been prepared by 42 different authors in thirteen
 With the exception of one research institution in Canada, Turkey, and the UK, all the authors belong to different EU universities in Sweden, Finland, Belgium, Germany (2), Austria, Spain (2), Italy (4), and Cyprus.
  """)
 
-geo_data = load_geospatial_data(geo_url)
+section("Map")
+geo_data = geo.citation_points(file_urls, geo_url, view=view)
 st.write(f"**Figure 6. Location of institutions that cited EIGE, {formatted_months}, 2024**")
-st.map(data=geo_data, size=100)
+geo.map_section(geo_data, weights="mentions", label="mentions")
+section("Countries")
+st.subheader("Countries of institutions citing EIGE")
+countries.country_section(file_urls, geo_url, view=view)
 
 #-------SPLIT BY AUTHOR
+section("SPLIT BY AUTHOR")
 # Split the column by commas
 split_values = data["name_of_the_author/organisation_citing_eige"].str.split(",", expand=True)
 # Remove leading/trailing spaces
@@ -149,6 +165,7 @@ value_counts = stacked_values.value_counts()
 repeating_values = value_counts[value_counts > 1]
 
 #--------SPLIT BY UNIVERSITY
+section("SPLIT BY UNIVERSITY")
 # Split the 'name_of_the_universities' column by commas
 split_values_universities = data["name_of_the_institution"].str.split(",", expand=True)
 # Stack the resulting DataFrame to get a single column of university names
@@ -202,17 +219,18 @@ st.subheader("3.4.1 Impact ranking")
 st.markdown("While the impact metrics described above provide us with a micro view on the academic and social impact of the articles citing EIGE, it does not allow us to conduct a less granular analysis. To ensure comparability between the articles, we attributed a weight to each metric: 0,3 for number of citations, 0,2 for the impact factor and the altmetric, and 0,15 for location and category of the citation. ")
 with st.container():
     st.dataframe(
-        data[[
+        # the computed impact weight, the one the radar chart above ranks by
+        weights.with_weights(data)[[
             'location_of_the_citation:_3_body_of_the_article;_2_introduction;_1_bibliography/reference', 
             'impact_factor_of_the_journal:_1_respectable;_2_strong;_3_very_strong_(using_free_version_of_scopus)',
             'number_of_mentions_in_social_media_using_altmetric',
-            'ranking/weight'
+            'weight'
         ]]
         .rename(columns={
             'location_of_the_citation:_3_body_of_the_article;_2_introduction;_1_bibliography/reference': 'Location of the citation',
             'impact_factor_of_the_journal:_1_respectable;_2_strong;_3_very_strong_(using_free_version_of_scopus)': 'Impact factor',
             'number_of_mentions_in_social_media_using_altmetric': 'Altmetric',
-            'ranking/weight':'Weight'
+            'weight':'Weight'
         }),
         use_container_width=True  #
     )
@@ -222,38 +240,27 @@ While the impact metrics described above provide us with a micro view on the aca
 """)
 
 #-----DOWNLOAD
-# Save the reoport
-# Path to your existing .docx file
-doc_file_path = "data/2025-02-012_Q42024_report.docx"
-# Open the file in binary mode
-with open(doc_file_path, "rb") as file:
-    file_data = file.read()
-
-# Path to your existing Excel file
-excel_file_path = "data/2024Q4_20250203.xlsx"
-# Open the Excel file in binary mode
-with open(excel_file_path, "rb") as file:
-    excel_data = file.read()
-
-
+section("DOWNLOAD")
 #two cols
 col1, col2 = st.columns(2)
 
 with col1:
-        # Create a report download button
-    st.download_button(
-        label="Download the Q4 2024 report",
-        data=file_data,
-        file_name="Q42024_report.docx",
-        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        type="primary"
+    # Report download button: the file is read only when clicked
+    downloads.file_button(
+        "Download the Q4 2024 report", "data/2025-02-012_Q42024_report.docx",
+        file_name="Q42024_report.docx", type="primary"
     )
 with col2:
-    # Create data download button
-    st.download_button(
-        label="Download the monitoring data",
-        data=excel_data,
-        file_name="2024Q4_data.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        type="primary"
-    )
\ No newline at end of file
+    # Data download button
+    downloads.file_button(
+        "Download the monitoring data", "data/2024Q4_20250203.xlsx",
+        file_name="2024Q4_data.xlsx", type="primary"
+    )
+
+# Word report generated from the aggregates and charts of the whole report
+downloads.report_button("Generate the Q4 2024 Word report from the current data", "2024Q4", view=view)
+
+# Exports of the data shown on the page (sidebar filters applied)
+downloads.export_buttons(data, "2024Q4_data")
+
+finish_page()
@@ -1,17 +1,28 @@
 import streamlit as st
 import pandas as pd
-from utils.data_loader import get_data, load_geospatial_data
-from utils.charts import total_citations_trend, annual_bar, output_type_bar_chart, sunburst_chart, trend_line_chart, radar_chart
+from utils.data_loader import get_shared_data
+from utils.charts import total_citations_trend, annual_bar, output_type_bar_chart, sunburst_chart, trend_line_chart, radar_chart, network_chart
+from utils.network import build_network, most_connected
+from utils.instrumentation import start_page, section, finish_page
+from utils import comparisons, countries, downloads, geo, query, warmup
+from utils.filters import sidebar_filters
+from utils import rollups, weights
+from utils.aggregates import top_impact
+
+start_page("2024 Annual Report")
+warmup.start(current="2024")
 
 # -----------------------------
 # Sidebar / Branding
 # -----------------------------
+section("Sidebar / Branding")
 st.sidebar.image("./data/b&s_logo.png")
 st.sidebar.image("./data/pil_logo.png")
 
 # -----------------------------
 # Load Data
 # -----------------------------
+section("Load Data")
 file_urls = ["https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/data/ALLQ2024_upd.xlsx"]
 geo_url = [
     "https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/data/2024Q1_map.xlsx",
@@ -20,14 +31,14 @@ geo_url = [
     "https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/data/2024Q4map.xlsx"
 ]
 
-data = get_data(file_urls)
+data = get_shared_data(file_urls)
+data, filtered = sidebar_filters(data, file_urls)
+view = data if filtered else None  # the cached per-dataset tables serve the page until a filter is set
 
 # -----------------------------
 # Extract months & quarters dynamically
 # -----------------------------
-data["date_of_publication"] = pd.to_datetime(data["date_of_publication"], errors="coerce")
-data["month"] = data["date_of_publication"].dt.strftime('%B')
-data["quarter"] = data["date_of_publication"].dt.quarter.apply(lambda x: f"Q{x}")
+section("Extract months & quarters dynamically")
 
 unique_months = sorted(
     data["month"].dropna().unique(),
@@ -38,6 +49,7 @@ formatted_months = " - ".join(unique_months)
 # -----------------------------
 # Intro
 # -----------------------------
+section("Intro")
 st.header("2024 Annual Report: Analysis")
 st.markdown("""
 This report summarizes the findings for 2024.  
@@ -52,35 +64,17 @@ This report summarizes the findings for 2024.
 # -----------------------------
 # 1. Total Mentions and Publications
 # -----------------------------
+section("1. Total Mentions and Publications")
 st.subheader("1. Total Mentions and Publications")
-quarter_summary = (
-    data.groupby("quarter")
-        .agg({
-            "name_of_the_document_citing_eige": "nunique",
-            "type_of_eige's_output_cited": "count"
-        })
-        .rename(columns={
-            "name_of_the_document_citing_eige": "Number of publications",
-            "type_of_eige's_output_cited": "Number of mentions"
-        })
-)
-
-# Ensure Q1–Q4 order
-quarters_order = ["Q1","Q2","Q3","Q4"]
-quarter_summary = quarter_summary.reindex(quarters_order, fill_value=0)
-
-# Add total row
-total_row = pd.DataFrame({
-    "Number of publications": [quarter_summary["Number of publications"].sum()],
-    "Number of mentions": [quarter_summary["Number of mentions"].sum()]
-}, index=["Total 2024"])
-
-summary_df = pd.concat([quarter_summary, total_row])
+summary_df = rollups.quarter_summary(file_urls, 2024, view=view)
 st.dataframe(summary_df, use_container_width=True)
+# Changes on the previous year, generated from the cached comparisons
+comparisons.comparison_section(2024)
 
 # -----------------------------
 # 2. EIGE's Output Cited
 # -----------------------------
+section("2. EIGE's Output Cited")
 st.subheader("2. EIGE's Output Cited")
 st.markdown("""
 The academic articles refer to different EIGE outputs: reports, factsheets, research notes, thesaurus, web sections (BPfA, GM, GBV), gender statistics database, and general reference to EIGE.  
@@ -89,14 +83,17 @@ Figures below show outputs mentioned in 2024, trends per quarter, and trends per
 
 st.plotly_chart(annual_bar(data, 2024))
 
-most_frequent_type = data["type_of_eige's_output_cited"].value_counts().idxmax()
-count = data["type_of_eige's_output_cited"].value_counts().max()
+# Mentions per output type from the query layer (filtered rows are counted directly)
+output_counts = query.output_type_counts(file_urls, view=view)
+most_frequent_type = output_counts.idxmax()
+count = output_counts.max()
 st.write(f"Most frequent output type: **{most_frequent_type}**, appearing {count} times.")
 
 #----- TREND LINE-------
 # -----------------------------
 # Trend Line Chart (Annual)
 # -----------------------------
+section("Trend Line Chart (Annual)")
 # automatically get all months present in the data
 months_names = data['date_of_publication'].dt.strftime('%B').dropna().unique()
 months_names_sorted = sorted(months_names, key=lambda x: pd.to_datetime(x, format='%B'))
@@ -124,14 +121,20 @@ st.plotly_chart(sunburst_chart(data, formatted_months, 2024))
 # -----------------------------
 # 3. Documents Citing EIGE
 # -----------------------------
+section("3. Documents Citing EIGE")
 st.subheader("3. Documents Citing EIGE")
 st.markdown("""
 Most documents are research articles. Authors belong to multiple universities globally, mostly EU-based.
 """)
 
-geo_data = load_geospatial_data(geo_url)
-st.map(data=geo_data, size=100)
+section("Map")
+geo_data = geo.citation_points(file_urls, geo_url, view=view)
+geo.map_section(geo_data, weights="mentions", label="mentions")
+section("Countries")
+st.subheader("Countries of institutions citing EIGE")
+countries.country_section(file_urls, geo_url, view=view)
 
+section("Repeating authors and universities")
 # Repeat authors & universities
 authors = data["name_of_the_author/organisation_citing_eige"].str.split(",", expand=True).stack().str.strip()
 authors = authors[authors.str.len() > 2].value_counts()
@@ -148,34 +151,41 @@ with col2:
     st.write("Repeating Authors:")
     st.write(repeating_authors)
 
+section("Networks")
+# Co-authorship and co-institution networks
+author_nodes, author_edges = build_network(data, kind="author")
+institution_nodes, institution_edges = build_network(data, kind="institution")
+
+st.plotly_chart(network_chart(author_nodes, author_edges, title="Co-authorship network, 2024"))
+
+st.write("Most connected institutions:")
+st.dataframe(most_connected(institution_nodes), use_container_width=True)
+
 # -----------------------------
 # 4. Impact Evaluation
 # -----------------------------
+section("4. Impact Evaluation")
 st.subheader("4. Impact Evaluation")
 st.markdown("""
 Impact evaluation uses four metrics: number of citations, impact factor, sentiment, and location of the citation.  
 """)
-st.plotly_chart(radar_chart(data, formatted_months, 2024))
+impact_weights, normalization = weights.weight_controls(key="weights_2024")
+st.plotly_chart(radar_chart(data, formatted_months, 2024, weights=impact_weights, normalization=normalization))
+# the workbook's hand-typed weights, checked against the methodology's formula
+check = weights.validate(data)
+st.caption(
+    f"{int(check['matches'].sum())} of {int(check['stored'].notna().sum())} weights recorded in the workbook "
+    f"match the methodology (within {weights.TOLERANCE}); the rankings use the computed weights."
+)
 
 # -----------------------------
 # 5. Impact Ranking
 # -----------------------------
+section("5. Impact Ranking")
 st.subheader("Top-5 of Most Impactful Articles")
 
-top5_df = (
-    data[["name_of_the_document_citing_eige", "ranking/weight"]]
-    .rename(columns={
-        "name_of_the_document_citing_eige": "Document citing EIGE",
-        "ranking/weight": "Weight"
-    })
-    .sort_values(by="Weight", ascending=False)  # top weights first
-    .head(5)  # take only top 5
-    .reset_index(drop=True)  # reset index to 0-based first
-)
-
-# create 1-based numbering
-top5_df.index = top5_df.index + 1
-top5_df.index.name = "Rank"
+# ranked by the weights computed from the impact metrics, with the weighting chosen above
+top5_df = top_impact(data, n=5, weights=impact_weights, normalization=normalization)
 
 st.dataframe(top5_df, use_container_width=True)
 
@@ -183,19 +193,16 @@ st.dataframe(top5_df, use_container_width=True)
 # -----------------------------
 # Download Section
 # -----------------------------
+section("Download Section")
 st.subheader("Download Report / Data")
-doc_file_path = "data/2024_report.docx"
-excel_file_path = "data/ALLQ2024_upd.xlsx"
-
-with open(doc_file_path, "rb") as f:
-    doc_bytes = f.read()
-with open(excel_file_path, "rb") as f:
-    excel_bytes = f.read()
-
 col1, col2 = st.columns(2)
 with col1:
-    st.download_button("Download 2024 Report", doc_bytes, "2024_report.docx",
-                       "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+    downloads.file_button("Download 2024 Report", "data/2024_report.docx", file_name="2024_report.docx")
 with col2:
-    st.download_button("Download Monitoring Data", excel_bytes, "2024_data.xlsx",
-                       "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    downloads.file_button("Download Monitoring Data", "data/ALLQ2024_upd.xlsx", file_name="2024_data.xlsx")
+# Word report generated from the aggregates and charts of the whole report
+downloads.report_button("Generate the 2024 Word report from the current data", "2024", view=view)
+st.caption("Export the data shown on this page (sidebar filters applied):")
+downloads.export_buttons(data, "2024_data")
+
+finish_page()
@@ -1,18 +1,29 @@
 import streamlit as st
 import pandas as pd
-import re
-from utils.data_loader import get_data, load_geospatial_data
-from utils.charts import  total_citations_trend, annual_bar, output_type_bar_chart, sunburst_chart, trend_line_chart, radar_chart
+from utils.data_loader import get_shared_data
+from utils.charts import  total_citations_trend, annual_bar, output_type_bar_chart, sunburst_chart, trend_line_chart, radar_chart, network_chart
+from utils.network import build_network, most_connected, split_authors, split_institutions
+from utils.instrumentation import start_page, section, finish_page
+from utils import comparisons, countries, downloads, geo, query, warmup
+from utils.filters import sidebar_filters
+from utils import rollups, weights
+from utils.aggregates import top_impact
+from utils.catalog import REPORTS, data_urls
+
+start_page("2025 Annual Report")
+warmup.start(current="2025")
 
 # -----------------------------
 # Sidebar / Branding
 # -----------------------------
+section("Sidebar / Branding")
 st.sidebar.image("./data/b&s_logo.png")
 st.sidebar.image("./data/pil_logo.png")
 
 # -----------------------------
 # Load Data
 # -----------------------------
+section("Load Data")
 file_urls = ["https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/data/2025_data/2025_all.xlsx"]
 geo_url = [
     "https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/data/2025_maps/2025Q1_map.xlsx",
@@ -21,55 +32,24 @@ geo_url = [
     "https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/data/2025_maps/2025Q4_map.xlsx"
 ]
 
-data = get_data(file_urls)
+data = get_shared_data(file_urls)
+data, filtered = sidebar_filters(data, file_urls)
+view = data if filtered else None  # the cached per-dataset tables serve the page until a filter is set
 
 # -----------------------------
-# Extract months & quarters dynamically
+# Quarter summary
 # -----------------------------
-# First, ensure date column is datetime
-data['date_of_publication'] = pd.to_datetime(data['date_of_publication'], errors='coerce')
-
-# Map months to quarters
-month_to_quarter = {
-    1: 'Q1', 2: 'Q1', 3: 'Q1',
-    4: 'Q2', 5: 'Q2', 6: 'Q2',
-    7: 'Q3', 8: 'Q3', 9: 'Q3',
-    10:'Q4', 11:'Q4', 12:'Q4'
-}
-data['quarter'] = data['date_of_publication'].dt.month.map(month_to_quarter)
-
-# Aggregate number of publications and mentions per quarter
-quarter_summary = (
-    data.groupby('quarter')
-        .agg({
-            'name_of_the_document_citing_eige': 'nunique',  # publications
-            "type_of_eige's_output_cited": 'count'          # mentions
-        })
-        .rename(columns={
-            'name_of_the_document_citing_eige': 'Number of publications',
-            "type_of_eige's_output_cited": 'Number of mentions'
-        })
-)
-
-# Ensure Q1–Q4 order
-quarters_order = ["Q1","Q2","Q3","Q4"]
-quarter_summary = quarter_summary.reindex(quarters_order, fill_value=0)
-
-# Add total row
-total_row = pd.DataFrame({
-    "Number of publications": [quarter_summary["Number of publications"].sum()],
-    "Number of mentions": [quarter_summary["Number of mentions"].sum()]
-}, index=["Total 2025"])
-
-# Combine
-summary_df = pd.concat([quarter_summary, total_row])
+section("Quarter summary")
+# Quarter summary merged from the cached quarterly rollups,
+# rolled up from the filtered rows once a sidebar filter is set
+summary_df = rollups.quarter_summary(file_urls, 2025, view=view)
+quarter_summary = summary_df.loc[["Q1", "Q2", "Q3", "Q4"]]
 
 #Format months
 # -----------------------------
 # Extract months & quarters dynamically
 # -----------------------------
-data["date_of_publication"] = pd.to_datetime(data["date_of_publication"], errors="coerce")
-data["month"] = data["date_of_publication"].dt.strftime('%B')
+section("Extract months & quarters dynamically")
 
 unique_months = sorted(
     data["month"].dropna().unique(),
@@ -81,6 +61,7 @@ formatted_months = " - ".join(unique_months)
 # -----------------------------
 # Intro
 # -----------------------------
+section("Intro")
 st.header("2025 Annual Report: Analysis")
 st.markdown("""
 This report summarizes the findings for 2025.  
@@ -95,6 +76,7 @@ This report summarizes the findings for 2025.
 # -----------------------------
 # 1. Total Mentions and Publications
 # -----------------------------
+section("1. Total Mentions and Publications")
 st.subheader("1. Total Mentions and Publications")
 
 st.dataframe(summary_df, use_container_width=True)
@@ -115,6 +97,8 @@ The **{most_active_quarter}** has been the most active quarter both in terms of
 """
 
 st.markdown(summary_text)
+# Changes on 2024, generated from the cached comparisons
+comparisons.comparison_section(2025)
 #-------------------------------
 #1.1 CITATION TREND --------------
 # Total citations trend line
@@ -129,15 +113,9 @@ st.plotly_chart(total_citations_trend(data, formatted_months, 2025, *range(1,13)
 # -----------------------------
 # Dynamic document summary
 # -----------------------------
-data_copy = data.copy()
-data_copy['date_of_publication'] = pd.to_datetime(data_copy['date_of_publication'], errors='coerce')
-data_copy['month'] = data_copy['date_of_publication'].dt.strftime('%B')
-
+section("Dynamic document summary")
 # Count unique documents per month
-monthly_docs = data_copy.groupby('month')['name_of_the_document_citing_eige'].nunique()
-monthly_docs = monthly_docs.reindex(
-    sorted(monthly_docs.index, key=lambda m: pd.to_datetime(m, format='%B'))
-)
+monthly_docs = rollups.monthly_documents(file_urls, view=view)
 
 # Helper to format month lists nicely
 fmt = lambda lst: lst[0] if len(lst) == 1 else " and ".join(lst) if len(lst) == 2 else ", ".join(lst[:-1]) + ", and " + lst[-1]
@@ -155,12 +133,16 @@ Overall, **{total_docs} publications** cited EIGE in 2025.
 """
 
 st.markdown(summary_text)
+# Distinct publications over every annual workbook: a merge of their year sketches, no rescan
+annual_sources = [data_urls(rid) for rid, report in REPORTS.items() if report["quarter"] is None]
+st.markdown(f"Since the monitoring began, **{rollups.distinct_across(annual_sources)} different publications** have cited EIGE.")
 #--------------------------------
 
 
 # -----------------------------
 # 2. EIGE's Output Cited
 # -----------------------------
+section("2. EIGE's Output Cited")
 st.subheader("2. EIGE's Output Cited")
 st.markdown("""
 The academic articles refer to different EIGE outputs: reports, factsheets, research notes, thesaurus, web sections (BPfA, GM, GBV), gender statistics database, and general reference to EIGE.  
@@ -169,11 +151,10 @@ Figures below show outputs mentioned in 2025, trends per quarter, and trends per
 
 st.plotly_chart(annual_bar(data, 2025))
 
-most_frequent_type = data["type_of_eige's_output_cited"].value_counts().idxmax()
-count = data["type_of_eige's_output_cited"].value_counts().max()
-
-# Count occurrences of EIGE outputs
-output_counts = data["type_of_eige's_output_cited"].value_counts()
+# Count occurrences of EIGE outputs (query layer; filtered rows are counted directly)
+output_counts = query.output_type_counts(file_urls, view=view)
+most_frequent_type = output_counts.idxmax()
+count = output_counts.max()
 
 # Top 2 outputs
 top_outputs = output_counts.head(2)
@@ -202,6 +183,7 @@ st.markdown(dynamic_paragraph)
 # -----------------------------
 # Trend Line Chart (Annual)
 # -----------------------------
+section("Trend Line Chart (Annual)")
 # automatically get all months present in the data
 months_names = data['date_of_publication'].dt.strftime('%B').dropna().unique()
 months_names_sorted = sorted(months_names, key=lambda x: pd.to_datetime(x, format='%B'))
@@ -229,34 +211,25 @@ st.plotly_chart(sunburst_chart(data, formatted_months, 2025))
 # -----------------------------
 # 3. Documents Citing EIGE
 # -----------------------------
+section("3. Documents Citing EIGE")
 st.subheader("3. Documents Citing EIGE")
 st.markdown("""
 Most documents are research articles. Authors belong to multiple universities globally, mostly EU-based.
 """)
 
-geo_data = load_geospatial_data(geo_url)
-st.map(data=geo_data, size=100)
+section("Map")
+geo_data = geo.citation_points(file_urls, geo_url, view=view)
+geo.map_section(geo_data, weights="mentions", label="mentions")
+section("Countries")
+st.subheader("Countries of institutions citing EIGE")
+countries.country_section(file_urls, geo_url, view=view)
 
 
+section("Repeating authors and universities")
 # Authors
 if 'name_of_the_author/organisation_citing_eige' in data.columns:
-    author_series = data['name_of_the_author/organisation_citing_eige']
-
-    # Split by comma, strip whitespace, explode
-    author_split = author_series.apply(lambda x: [a.strip() for a in str(x).split(",")]).explode()
-
-    # Filter: remove very short names (<4 chars)
-    author_filtered = author_split[author_split.str.len() > 4]
-
-    # Regex for initials-only patterns like: J. C., A.-Q., B.-M.
-    # Explanation:
-    # ^[A-Z](?:\.|\.-[A-Z]\.)?(?:\s[A-Z](?:\.|\.-[A-Z]\.)?)*$ 
-    # - Starts with a capital letter, followed by . or .-X.
-    # - Optional repeats separated by spaces
-    initials_pattern = re.compile(r'^[A-Z](?:\.|\.-[A-Z]\.)(?:\s[A-Z](?:\.|\.-[A-Z]\.))*$', re.I)
-
-    # Remove any author matching the pattern
-    author_filtered = author_filtered[~author_filtered.str.match(initials_pattern)]
+    # Split by comma, drop short names and initials-only fragments
+    author_filtered = split_authors(data['name_of_the_author/organisation_citing_eige'])
 
     # Count occurrences
     author_counts = author_filtered.value_counts()
@@ -272,19 +245,9 @@ else:
     repeating_authors_display = pd.DataFrame(columns=['Author', 'Count'])
 
 
-# Stop words (countries, cities, etc.)
-stop_words = ['spain', 'zgreb', 'norway', 'bergen', 'canada', 'gdansk']
-
 if 'name_of_the_institution_citing_eige' in data.columns:
-    uni_series = data['name_of_the_institution_citing_eige']
-    # Split by comma, strip whitespace, explode
-    uni_split = uni_series.apply(lambda x: [u.strip() for u in str(x).split(",")]).explode()
-    # Lowercase for filtering
-    uni_lower = uni_split.str.lower()
-    # Remove stopwords and anything very short (<3 chars)
-    uni_filtered = uni_split[~uni_lower.isin(stop_words) & (uni_split.str.len() > 2)]
-    # Optional: keep only names that contain 'university' or 'college' or 'institute'
-    uni_filtered = uni_filtered[uni_filtered.str.lower().str.contains('university|college|institute')]
+    # Split by comma/semicolon, keep universities, colleges and institutes
+    uni_filtered = split_institutions(data['name_of_the_institution_citing_eige'])
     # Count occurrences
     counts = uni_filtered.value_counts()
     # Only repeating
@@ -312,34 +275,44 @@ with col2:
         st.info("No repeating authors found or column missing.")
     else:
         st.dataframe(repeating_authors_display)
+
+section("Networks")
+# Co-authorship and co-institution networks
+author_nodes, author_edges = build_network(data, kind="author")
+institution_nodes, institution_edges = build_network(data, kind="institution")
+
+st.plotly_chart(network_chart(author_nodes, author_edges, title="Co-authorship network, 2025"))
+
+st.write("Most connected institutions:")
+if institution_nodes.empty:
+    st.info("No institution network found or column missing.")
+else:
+    st.dataframe(most_connected(institution_nodes), use_container_width=True)
 # -----------------------------
 # 4. Impact Evaluation
 # -----------------------------
+section("4. Impact Evaluation")
 st.subheader("4. Impact Evaluation")
 st.markdown("""
 Impact evaluation uses four metrics: number of citations, impact factor, sentiment, and location of the citation.  
 """)
-st.plotly_chart(radar_chart(data, formatted_months, 2025))
+impact_weights, normalization = weights.weight_controls(key="weights_2025")
+st.plotly_chart(radar_chart(data, formatted_months, 2025, weights=impact_weights, normalization=normalization))
+# the workbook's hand-typed weights, checked against the methodology's formula
+check = weights.validate(data)
+st.caption(
+    f"{int(check['matches'].sum())} of {int(check['stored'].notna().sum())} weights recorded in the workbook "
+    f"match the methodology (within {weights.TOLERANCE}); the rankings use the computed weights."
+)
 
 # -----------------------------
 # 5. Impact Ranking
 # -----------------------------
+section("5. Impact Ranking")
 st.subheader("Top-5 of Most Impactful Articles")
 
-top5_df = (
-    data[["name_of_the_document_citing_eige", "ranking/weight"]]
-    .rename(columns={
-        "name_of_the_document_citing_eige": "Document citing EIGE",
-        "ranking/weight": "Weight"
-    })
-    .sort_values(by="Weight", ascending=False)  # top weights first
-    .head(5)  # take only top 5
-    .reset_index(drop=True)  # reset index to 0-based first
-)
-
-# create 1-based numbering
-top5_df.index = top5_df.index + 1
-top5_df.index.name = "Rank"
+# ranked by the weights computed from the impact metrics, with the weighting chosen above
+top5_df = top_impact(data, n=5, weights=impact_weights, normalization=normalization)
 
 st.dataframe(top5_df, use_container_width=True)
 
@@ -347,19 +320,15 @@ st.dataframe(top5_df, use_container_width=True)
 # -----------------------------
 # Download Section
 # -----------------------------
+section("Download Section")
 st.subheader("Download Report / Data")
-doc_file_path = "data/2024_report.docx"
-excel_file_path = "data/2025_data/2025_all.xlsx"
-
-with open(doc_file_path, "rb") as f:
-    doc_bytes = f.read()
-with open(excel_file_path, "rb") as f:
-    excel_bytes = f.read()
-
 col1, col2 = st.columns(2)
 with col1:
-    st.download_button("Download 2024 Report", doc_bytes, "2024_report.docx",
-                       "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+    downloads.file_button("Download 2024 Report", "data/2024_report.docx", file_name="2024_report.docx")
 with col2:
-    st.download_button("Download Monitoring Data", excel_bytes, "2025_data.xlsx",
-                       "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    downloads.file_button("Download Monitoring Data", "data/2025_data/2025_all.xlsx", file_name="2025_data.xlsx")
+downloads.report_button("Generate the 2025 Word report from the current data", "2025", view=view)
+st.caption("Export the data shown on this page (sidebar filters applied):")
+downloads.export_buttons(data, "2025_data")
+
+finish_page()
@@ -1,29 +1,43 @@
 import streamlit as st
 import pandas as pd
-from utils.data_loader import get_data, load_geospatial_data
+from utils.data_loader import get_shared_data
 from utils.charts import total_citations_trend, output_type_bar_chart, sunburst_chart, trend_line_chart, citation_stack, radar_chart
+from utils.instrumentation import start_page, section, finish_page
+from utils import comparisons, countries, downloads, geo, rollups, warmup, weights
+from utils.filters import sidebar_filters
+from utils.catalog import REPORTS, data_urls, geo_urls
+from utils.aggregates import format_months, documents_table, top_impact
+
+start_page("Q3 2025 Report")
+warmup.start(current="2025Q3")
 
 # ---------- Load data ----------
-file_urls = ["https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/data/2025_data/2025Q3.xlsx"]
-geo_url = ["https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/data/2025_maps/2025Q3_map.xlsx"]
-data = get_data(file_urls)
-unique_articles = data.drop_duplicates(subset="name_of_the_document_citing_eige")
+section("Load data")
+report = REPORTS["2025Q3"]
+file_urls = data_urls("2025Q3")
+geo_url = geo_urls("2025Q3")
+data = get_shared_data(file_urls)
+data, filtered = sidebar_filters(data, file_urls)
+view = data if filtered else None  # the cached per-dataset tables serve the page until a filter is set
 
 # ---------- Months formatting ----------
-data["month"] = data["date_of_publication"].dt.strftime('%B')
-unique_months = sorted([m for m in data["month"].unique() if m], key=lambda x: pd.to_datetime(x, format='%B').month)
-formatted_months = " - ".join(unique_months)
+section("Months formatting")
+formatted_months = format_months(data)
 
 # ---------- Header ----------
+section("Header")
 st.header(f"Q3 2025 Report ({formatted_months})")
 st.write(f"Number of mentions: {len(data)}")
-st.write(f"Number of unique documents: {data['name_of_the_document_citing_eige'].nunique()}")
+st.write(f"Number of unique documents: {rollups.distinct_count(file_urls, 'documents', view=view)}")
+comparisons.comparison_section(report["year"], report["quarter"])
 
 # ---------- Stacked bar ----------
+section("Stacked bar")
 st.subheader("Mentions per document")
 st.plotly_chart(citation_stack(data, months=formatted_months, year=2025))
 
 # ---------- Trend line ----------
+section("Trend line")
 st.subheader("Trend of EIGE output citations")
 # Get sorted months from your data
 months_names = data['date_of_publication'].dt.strftime('%B').dropna().unique()
@@ -36,57 +50,52 @@ st.plotly_chart(trend_line_chart(data, months, 2025))
 
 
 # ---------- Bar chart ----------
+section("Bar chart")
 st.subheader("EIGE Output Type")
 st.plotly_chart(output_type_bar_chart(data, 2025))
 
 # ---------- Sunburst ----------
+section("Sunburst")
 st.subheader("Breakdown by output")
 st.plotly_chart(sunburst_chart(data, formatted_months, 2025))
 
 # ---------- 3.3 Documents citing EIGE ----------
+section("3.3 Documents citing EIGE")
 st.subheader("Documents citing EIGE")
-selected_columns = ['name_of_the_document_citing_eige','name_of_the_journal_citing_eige','name_of_the_institution_citing_eige']
-st.dataframe(unique_articles[selected_columns].drop_duplicates(), use_container_width=True)
+st.dataframe(documents_table(data), use_container_width=True)
 
 # ---------- Map ----------
-geo_data = load_geospatial_data(geo_url)
+section("Map")
+geo_data = geo.citation_points(file_urls, geo_url, view=view)
 st.subheader("Location of institutions citing EIGE")
-st.map(data=geo_data)
+geo.map_section(geo_data, weights="mentions", label="mentions")
+section("Countries")
+st.subheader("Countries of institutions citing EIGE")
+countries.country_section(file_urls, geo_url, view=view)
 
 # ---------- Radar ----------
+section("Radar")
 st.subheader("Impact evaluation of documents citing EIGE")
-st.plotly_chart(radar_chart(data, formatted_months, 2025))
+impact_weights, normalization = weights.weight_controls()
+st.plotly_chart(radar_chart(data, formatted_months, 2025, weights=impact_weights, normalization=normalization))
 
 # ---------- Impact Ranking ----------
+section("Impact Ranking")
 st.subheader("Top-5 of Most Impactful Articles")
 
-top5_df = (
-    data[["name_of_the_document_citing_eige", "ranking/weight"]]
-    .rename(columns={
-        "name_of_the_document_citing_eige": "Document citing EIGE",
-        "ranking/weight": "Weight"
-    })
-    .sort_values(by="Weight", ascending=False)  # top weights first
-    .head(5)  # take only top 5
-    .reset_index(drop=True)  # reset index to 0-based first
-)
-
-# create 1-based numbering
-top5_df.index = top5_df.index + 1
-top5_df.index.name = "Rank"
+top5_df = top_impact(data, n=5, weights=impact_weights, normalization=normalization)
 
 st.dataframe(top5_df, use_container_width=True)
 
 # ---------- Download ----------
-doc_file_path = "data/2025-01-15 2024 report.docx"
-excel_file_path = "data/2025_data/2025Q3.xlsx"
-with open(doc_file_path, "rb") as file: file_data = file.read()
-with open(excel_file_path, "rb") as file: excel_data = file.read()
-
+section("Download")
 col1, col2 = st.columns(2)
 with col1:
-    st.download_button("Download Q3 2025 report", data=file_data, file_name="Q3_2025_report.docx",
-                       mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+    downloads.file_button("Download Q3 2025 report", report["doc"], file_name="Q3_2025_report.docx")
 with col2:
-    st.download_button("Download monitoring data", data=excel_data, file_name="data_Q3_2025.xlsx",
-                       mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
\ No newline at end of file
+    downloads.file_button("Download monitoring data", report["excel"], file_name="data_Q3_2025.xlsx")
+downloads.report_button("Generate the Q3 2025 Word report from the current data", "2025Q3", view=view)
+st.caption("Export the data shown on this page (sidebar filters applied):")
+downloads.export_buttons(data, "data_Q3_2025")
+
+finish_page()
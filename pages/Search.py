@@ -0,0 +1,53 @@
+import json
+import time
+
+import streamlit as st
+from utils import search
+from utils.instrumentation import start_page, section, finish_page
+from utils import warmup
+
+start_page("Search")
+warmup.start()
+
+# Sidebar navigation using native hamburger menu
+st.sidebar.image("./data/b&s_logo.png")
+st.sidebar.image("./data/pil_logo.png")
+
+# ---------- Index ----------
+section("Index")
+sources = search.default_sources()
+index = search.get_index(json.dumps(search.index_meta(sources), sort_keys=True))
+
+# ---------- Search ----------
+section("Search")
+st.header("Search citations")
+st.markdown("""
+Find the documents citing EIGE by title, journal, institution, author or the EIGE output cited.
+Words are matched as prefixes, so *univ valen* finds *University of Valencia*.
+""")
+
+query = st.text_input("Search", placeholder="e.g. gender equality index, Tilburg, Sociology")
+years = st.multiselect("Year", sorted(index["records"]["year"].dropna().unique()))
+
+if query:
+    start = time.perf_counter()
+    results = search.search(index, query, limit=100, years=years)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    st.caption(f"{len(results)} documents in {elapsed_ms:.1f} ms")
+    st.dataframe(
+        results.rename(columns={
+            "year": "Year",
+            "document": "Document citing EIGE",
+            "journal": "Journal",
+            "institution": "Institution",
+            "authors": "Authors",
+            "output": "EIGE's output cited",
+            "weight": "Weight",
+            "score": "Relevance",
+        })[["Year", "Document citing EIGE", "Journal", "Institution", "Authors", "EIGE's output cited", "Weight", "Relevance"]],
+        use_container_width=True,
+        hide_index=True
+    )
+
+finish_page()
@@ -0,0 +1,181 @@
+"""
+Batch export of the report pages.
+
+Every report of the given years is loaded through the same loader as the
+Streamlit pages, its aggregates and figures computed, and the result
+written as static files, one report per worker process:
+
+    build/reports/<report>/report.html       all tables and charts on one page
+    build/reports/<report>/aggregates.json   every number and table
+    build/reports/<report>/figures/*.json    Plotly figure specs
+    build/reports/<report>/figures/*.png|svg only with a local renderer (kaleido)
+    build/reports/<report>/report.docx       Word report, chart images by kaleido
+                                             (their data tables without it)
+
+    python -m scripts.build_reports --year 2024 2025
+    python -m scripts.build_reports --reports 2025Q4 2025 --formats html json --workers 2
+"""
+import argparse
+import html
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FORMATS = ["html", "json", "png", "svg", "docx"]
+IMAGE_FORMATS = ["png", "svg"]
+
+
+def image_renderer_available():
+    return importlib.util.find_spec("kaleido") is not None
+
+
+def _jsonable(value):
+    import pandas as pd
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return json.loads(value.to_json(orient="split", date_format="iso"))
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    return value
+
+
+def render_html(title, aggregates, figures, include_plotlyjs):
+    import pandas as pd
+
+    parts = [f"<h1>{html.escape(title)} ({html.escape(aggregates['months'])})</h1>"]
+    for name, value in aggregates.items():
+        heading = html.escape(name.replace("_", " ").capitalize())
+        if isinstance(value, pd.Series):
+            value = value.to_frame()
+        if isinstance(value, pd.DataFrame):
+            parts.append(f"<h2>{heading}</h2>" + value.to_html(border=0))
+        elif name != "months":
+            parts.append(f"<p><b>{heading}:</b> {html.escape(str(value))}</p>")
+    for i, (name, fig) in enumerate(figures.items()):
+        # plotly.js goes into the page once, before the first figure
+        parts.append(fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs if i == 0 else False))
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{html.escape(title)}</title></head><body>\n" + "\n".join(parts) + "\n</body></html>\n"
+    )
+
+
+# -----------------------------
+# One report (runs in a worker process)
+# -----------------------------
+def build_report(report_id, out_dir, formats, offline=True, image_workers=1):
+    from utils.aggregates import report_aggregates, report_figures
+    from utils.catalog import REPORTS, data_urls
+    from utils.data_loader import get_data
+
+    start = time.perf_counter()
+    report = REPORTS[report_id]
+    annual = report["quarter"] is None
+    data = get_data(data_urls(report_id))
+    aggregates = report_aggregates(data, report["year"], annual=annual)
+    figures = report_figures(data, report["year"], annual=annual)
+
+    report_dir = os.path.join(out_dir, report_id)
+    figures_dir = os.path.join(report_dir, "figures")
+    os.makedirs(figures_dir, exist_ok=True)
+    written = []
+
+    if "json" in formats:
+        path = os.path.join(report_dir, "aggregates.json")
+        with open(path, "w") as f:
+            json.dump({name: _jsonable(v) for name, v in aggregates.items()}, f, indent=2, default=str)
+        written.append(path)
+        for name, fig in figures.items():
+            path = os.path.join(figures_dir, f"{name}.json")
+            fig.write_json(path)
+            written.append(path)
+
+    if "html" in formats:
+        path = os.path.join(report_dir, "report.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(render_html(report["title"], aggregates, figures, include_plotlyjs=True if offline else "cdn"))
+        written.append(path)
+
+    if "docx" in formats:
+        from utils.word_report import report_docx
+
+        path = os.path.join(report_dir, "report.docx")
+        with open(path, "wb") as f:
+            f.write(report_docx(report_id, workers=image_workers, data=data))
+        written.append(path)
+
+    for fmt in [f for f in formats if f in IMAGE_FORMATS]:
+        if not image_renderer_available():
+            break
+        for name, fig in figures.items():
+            path = os.path.join(figures_dir, f"{name}.{fmt}")
+            fig.write_image(path)
+            written.append(path)
+
+    return {
+        "report": report_id,
+        "title": report["title"],
+        "rows": len(data),
+        "documents": int(aggregates["documents"]),
+        "files": [os.path.relpath(p, out_dir) for p in written],
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def build_all(report_ids, out_dir, formats, workers=None, offline=True):
+    """Build `report_ids` in a process pool; failures are reported, not raised."""
+    results = []
+    workers = workers or os.cpu_count() or 1
+    # CPUs left over by the report processes render the Word reports' chart images
+    image_workers = max(1, workers // max(len(report_ids), 1))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(build_report, rid, out_dir, formats, offline, image_workers): rid for rid in report_ids
+        }
+        for future in as_completed(futures):
+            rid = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:  # one broken workbook should not stop the batch
+                result = {"report": rid, "error": repr(exc)}
+            results.append(result)
+            status = result.get("error") or f"{len(result['files'])} files in {result['seconds']:.1f}s"
+            print(f"{rid:<8} {status}")
+    return sorted(results, key=lambda r: report_ids.index(r["report"]))
+
+
+def main(argv=None):
+    from utils.catalog import REPORTS, reports_for_year
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--year", type=int, nargs="+", default=[2024, 2025])
+    parser.add_argument("--reports", nargs="+", choices=list(REPORTS), help="build only these reports")
+    parser.add_argument("--out", default="build/reports")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=FORMATS)
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--online", action="store_true",
+                        help="download the workbooks from GitHub and link plotly.js from its CDN")
+    args = parser.parse_args(argv)
+
+    if not args.online:
+        # read the workbooks of this checkout; workers inherit the environment
+        os.environ.setdefault("CITATION_DATA_DIR", ROOT)
+    if set(args.formats) & set(IMAGE_FORMATS) and not image_renderer_available():
+        print("kaleido is not installed: skipping png/svg export", file=sys.stderr)
+
+    report_ids = args.reports or [rid for year in args.year for rid in reports_for_year(year)]
+    results = build_all(report_ids, args.out, args.formats, workers=args.workers, offline=not args.online)
+
+    os.makedirs(args.out, exist_ok=True)
+    with open(os.path.join(args.out, "index.json"), "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"index written to {os.path.join(args.out, 'index.json')}")
+    return 1 if any("error" in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Offline geocoding of the institutions citing EIGE.
+
+`--seed` builds the local gazetteer (`data/gazetteer.csv`) from the
+hand-made map workbooks. Otherwise every selected report's citation data is
+geocoded against the gazetteer (exact, normalized, prefix, then trigram
+match; no network access) and written as a map workbook in the layout of
+`data/2025_maps/*_map.xlsx`, with the names that could not be resolved
+listed in `unresolved.csv`:
+
+    python -m scripts.geocode --seed
+    python -m scripts.geocode --reports 2025Q1 2025Q2 --out build/maps
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+from utils import geocoder
+from utils.artifacts import ROOT
+from utils.catalog import REPORTS, data_urls
+from utils.data_loader import normalize_geospatial_data, read_workbook
+
+
+def seed(path=geocoder.GAZETTEER_PATH):
+    """Write the gazetteer from every map workbook of the catalog."""
+    relpaths = dict.fromkeys(relpath for report in REPORTS.values() for relpath in report["geo"])
+    frames = [normalize_geospatial_data(read_workbook(os.path.join(ROOT, relpath))) for relpath in relpaths]
+    gazetteer = geocoder.seed_gazetteer(frames)
+    gazetteer.to_csv(path, index=False)
+    print(f"{len(gazetteer)} locations from {len(frames)} map workbooks written to {path}")
+
+
+def build_maps(report_ids, out_dir):
+    from utils.data_loader import get_data
+
+    os.makedirs(out_dir, exist_ok=True)
+    unresolved = []
+    for report_id in report_ids:
+        data = get_data(data_urls(report_id))
+        start = time.perf_counter()
+        geo, missing = geocoder.geo_table(data)
+        elapsed = time.perf_counter() - start
+        path = os.path.join(out_dir, f"{report_id}_map.xlsx")
+        geo.to_excel(path, index=False)
+        unresolved.extend({"report": report_id, "name": name} for name in missing)
+        print(f"{report_id}: {len(geo)} locations, {len(missing)} unresolved, {elapsed * 1000:.1f} ms -> {path}")
+
+    report_path = os.path.join(out_dir, "unresolved.csv")
+    pd.DataFrame(unresolved, columns=["report", "name"]).to_csv(report_path, index=False)
+    print(f"unresolved names written to {report_path}")
+    return unresolved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="rebuild the gazetteer from the map workbooks")
+    parser.add_argument("--reports", nargs="+", choices=list(REPORTS), default=list(REPORTS))
+    parser.add_argument("--out", default="build/maps")
+    args = parser.parse_args(argv)
+
+    if args.seed:
+        seed()
+        return 0
+    build_maps(args.reports, args.out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
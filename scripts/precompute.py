@@ -0,0 +1,111 @@
+"""
+Build-time precompute of the workbooks in `data/`, `data/2025_data` and `data/2025_maps`.
+
+For every workbook the normalized rows are written as a Parquet partition
+(scanned in place by utils.query); citation workbooks also get a month
+rollup with distinct-count sketches (utils.rollups), and the full-text
+search index is rebuilt from the annual workbooks. `manifest.json` records
+the SHA-256 of every workbook and of the normalization code, so the app loads an artifact
+only while both still match and parses the workbook live otherwise:
+
+    python -m scripts.precompute
+    python -m scripts.precompute --out build/artifacts --force
+"""
+import argparse
+import datetime
+import glob
+import os
+import sys
+
+import pandas as pd
+
+from utils import artifacts, rollups, search
+from utils.data_loader import normalize_citation_data, normalize_columns, normalize_geospatial_data, read_workbook
+
+
+def discover_workbooks(root=artifacts.ROOT):
+    paths = []
+    for folder in artifacts.SOURCE_DIRS:
+        paths.extend(sorted(glob.glob(os.path.join(root, folder, "*.xlsx"))))
+    return [os.path.relpath(p, root) for p in paths]
+
+
+def _artifact_paths_exist(entry, out_dir):
+    names = [entry.get(k) for k in ("data", "rollups") if entry.get(k)]
+    return bool(names) and all(os.path.exists(os.path.join(out_dir, n)) for n in names)
+
+
+def precompute_workbook(relpath, out_dir, root=artifacts.ROOT):
+    """Normalize one workbook and write its artifacts; returns its manifest entry."""
+    source = os.path.join(root, relpath)
+    entry = {"sha256": artifacts.file_sha256(source), "size": os.path.getsize(source)}
+
+    raw = read_workbook(source)
+    if {"latitude", "longitude"}.issubset(normalize_columns(raw.copy()).columns):
+        entry["kind"] = "geo"
+        data = normalize_geospatial_data(raw)
+    else:
+        entry["kind"] = "citations"
+        data = normalize_citation_data(raw)
+
+    target = artifacts.partition_dir(relpath, out_dir)
+    data_path = os.path.join(target, "data.parquet")
+    entry["json_columns"] = artifacts.write_partition(data, data_path)
+    # only trust a partition that reads back exactly as the live loader would build it
+    pd.testing.assert_frame_equal(artifacts.read_partition(data_path, entry["json_columns"]), data)
+    entry["data"] = os.path.relpath(data_path, out_dir)
+    entry["rows"] = len(data)
+
+    if entry["kind"] == "citations":
+        path = os.path.join(target, "rollups.parquet")
+        rollups.write_rollup(rollups.month_rollup(data), path)
+        entry["rollups"] = os.path.relpath(path, out_dir)
+    return entry
+
+
+def precompute(out_dir=artifacts.ARTIFACTS_DIR, root=artifacts.ROOT, force=False):
+    fingerprint = artifacts.code_fingerprint()
+    previous = artifacts.read_manifest(out_dir)
+    reusable = previous["files"] if previous and previous.get("code") == fingerprint and not force else {}
+
+    files = {}
+    for relpath in discover_workbooks(root):
+        old = reusable.get(relpath)
+        if old and not old.get("error") and _artifact_paths_exist(old, out_dir) \
+                and old["sha256"] == artifacts.file_sha256(os.path.join(root, relpath)):
+            files[relpath] = old
+            print(f"{relpath:<40} unchanged")
+            continue
+        try:
+            files[relpath] = precompute_workbook(relpath, out_dir, root)
+        except Exception as exc:  # the app falls back to live parsing for this workbook
+            files[relpath] = {"error": repr(exc)}
+        entry = files[relpath]
+        status = entry.get("error") or f"{entry['kind']}, {entry['rows']} rows"
+        print(f"{relpath:<40} {status}")
+
+    manifest = {
+        "version": artifacts.MANIFEST_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "code": fingerprint,
+        "files": files,
+    }
+    artifacts.write_manifest(manifest, out_dir)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=artifacts.ARTIFACTS_DIR)
+    parser.add_argument("--force", action="store_true", help="rebuild unchanged workbooks too")
+    args = parser.parse_args(argv)
+
+    manifest = precompute(args.out, force=args.force)
+    # after the manifest, so the corpus is read from the fresh partitions
+    search.ensure_index(path=os.path.join(args.out, "search"))
+    print(f"manifest written to {artifacts.manifest_path(args.out)}")
+    return 1 if any("error" in e for e in manifest["files"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 import streamlit as st
-from utils.data_loader import get_data
+from utils import disk_cache, warmup
+from utils.instrumentation import start_page, finish_page, enabled
 
 # Set the page configuration
 st.set_page_config(
@@ -8,6 +9,10 @@ st.set_page_config(
     layout="centered"
 )
 
+start_page("Home")
+# load and aggregate every report in the background, so no visitor pays the cold load
+warmup.start()
+
 # Sidebar navigation using native hamburger menu
 st.sidebar.image("./data/b&s_logo.png")
 st.sidebar.image("./data/pil_logo.png")
@@ -37,6 +42,7 @@ This monitoring report is compiled on Streamlit platform using Python programmin
 ### Navigation
 - Methodology and our overall approach is described in detail in the **Methodology** page.
 - Reports are also available from the navigation menu on the left, titled in a format "Qx_YYYY_Report".         
+- The **Search** page finds documents, journals, institutions and authors citing EIGE across all years.
 
 ### Report
 - Most of the charts and graphs in the report have interactive elements. Feel free to explore the data by clicking and hovering on different elements.
@@ -46,3 +52,12 @@ This monitoring report is compiled on Streamlit platform using Python programmin
 - The excel file with monitoring data is available to download at the bottom of each quarterly report.        
             """)
 
+st.page_link("pages/Search.py", label="Search citations", icon=":material/search:")
+
+if enabled():
+    with st.sidebar.expander("Debug: warm-up", expanded=True):
+        st.json(warmup.status())
+    with st.sidebar.expander("Debug: cache hit ratios"):
+        st.json(disk_cache.stats())
+
+finish_page()
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import PCA
+
+from utils import analysis
+
+
+def _frame():
+    rng = np.random.RandomState(0)
+    return pd.DataFrame({
+        "weight": rng.rand(40),
+        "impact_factor": rng.rand(40) * 5,
+        "output_type": rng.choice(["Report", "Toolkit", "Thesaurus"], 40),
+        "category": rng.choice(["Academic", "Policy"], 40),
+    })
+
+
+def test_pca_components_match_the_original_where_it_ran():
+    data = _frame()
+    categorical_columns = ["output_type", "category"]
+    # the original: one-hot encode, then PCA on every column
+    expected = PCA(n_components=1).fit_transform(pd.get_dummies(data, columns=categorical_columns))
+    np.testing.assert_allclose(analysis.combine_categorical_and_pca(data, categorical_columns), expected)
+
+
+def test_pca_after_the_columns_were_encoded():
+    data = pd.get_dummies(_frame(), columns=["output_type", "category"])
+    data.loc[0, "impact_factor"] = np.nan
+    data["institution"] = "University of Zagreb"
+    assert analysis.combine_categorical_and_pca(data, ["output_type", "category"]).shape == (40, 1)
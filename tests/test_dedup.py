@@ -0,0 +1,25 @@
+import pandas as pd
+
+from utils.dedup import AUTHOR_COL, DATE_COL, DOC_COL, assign_document_ids
+
+
+def _citations(rows):
+    return pd.DataFrame(rows, columns=[DOC_COL, AUTHOR_COL, DATE_COL]).assign(
+        **{DATE_COL: lambda frame: pd.to_datetime(frame[DATE_COL])}
+    )
+
+
+def test_id_is_kept_when_a_cluster_gains_a_member():
+    quarter = _citations([
+        ("Gender Equality Index 2023: towards a green transition in transport and energy (full report)",
+         "A. Smith", "2025-02-01"),
+        ("Care work and the labour market", "B. Jones", "2025-03-01"),
+    ])
+    # a later near-duplicate whose normalized title sorts before the original's
+    later = _citations([
+        ("Gender Equality Index 2023 - towards a green transition in transport and energy", "A. Smith", "2025-11-01"),
+    ])
+    before = assign_document_ids(quarter)
+    after = assign_document_ids(pd.concat([quarter, later], ignore_index=True))
+    assert after.iloc[2] == after.iloc[0]
+    assert after.iloc[:2].tolist() == before.tolist()
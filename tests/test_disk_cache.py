@@ -0,0 +1,65 @@
+import itertools
+import threading
+
+from utils import disk_cache
+
+
+def _same_prefix_parts(namespace):
+    """Two different key parts whose entries share a two-character key prefix."""
+    seen = {}
+    for i in itertools.count():
+        prefix = disk_cache.entry_key(namespace, i)[:2]
+        if prefix in seen:
+            return seen[prefix], i
+        seen[prefix] = i
+
+
+def test_nested_cached_with_shared_key_prefix(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(disk_cache, "ENABLED", True)
+    outer, inner = _same_prefix_parts("test")
+    result = {}
+
+    def run():
+        result["value"] = disk_cache.cached(
+            "test", outer, lambda: disk_cache.cached("test", inner, lambda: "inner") + " outer"
+        )
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "nested cached() call deadlocked"
+    assert result["value"] == "inner outer"
+    assert disk_cache.cached("test", outer, lambda: "recomputed") == "inner outer"
+
+
+def test_figures_are_kept_in_memory(tmp_path, monkeypatch):
+    import plotly.graph_objects as go
+
+    monkeypatch.setattr(disk_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(disk_cache, "ENABLED", True)
+    monkeypatch.setattr(disk_cache, "_figures", disk_cache.collections.OrderedDict())
+    calls = []
+
+    @disk_cache.figure
+    def bars(values):
+        calls.append(values)
+        return go.Figure(go.Bar(y=list(values)))
+
+    first = bars((1, 2, 3))
+    reads = []
+    monkeypatch.setattr(disk_cache, "_read", lambda *a: reads.append(a) or (False, None))
+    assert bars((1, 2, 3)) is first
+    assert calls == [(1, 2, 3)] and reads == []
+
+
+def test_eviction_runs_once_enough_was_written(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(disk_cache, "ENABLED", True)
+    monkeypatch.setattr(disk_cache, "EVICT_EVERY_BYTES", 10_000)
+    monkeypatch.setattr(disk_cache, "_written", 0)
+    sweeps = []
+    monkeypatch.setattr(disk_cache, "evict", lambda: sweeps.append(1))
+    for i in range(5):
+        disk_cache.cached("test", i, lambda: b"x" * 3_000)
+    assert len(sweeps) == 1
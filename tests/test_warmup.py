@@ -0,0 +1,32 @@
+import threading
+
+import streamlit as st
+
+from utils import artifacts, disk_cache, warmup
+
+
+def test_warm_reports_against_the_disk_cache(tmp_path, monkeypatch):
+    """Two workers warming a quarterly and an annual report at once: every nested disk cache read completes."""
+    monkeypatch.setenv("CITATION_DATA_DIR", artifacts.ROOT)
+    monkeypatch.setattr(disk_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(disk_cache, "ENABLED", True)
+    monkeypatch.setattr(disk_cache, "_figures", disk_cache.collections.OrderedDict())
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    errors = []
+
+    def warm(report_id):
+        try:
+            warmup.warm_report(report_id)
+        except Exception as exc:
+            errors.append((report_id, exc))
+
+    threads = [threading.Thread(target=warm, args=(rid,), daemon=True) for rid in ("2025Q4", "2025")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=300)
+    assert not any(thread.is_alive() for thread in threads), "warm-up hung"
+    assert errors == []
+    namespaces = {p.name for p in tmp_path.iterdir()}
+    assert {"citations", "comparisons", "figure"} <= namespaces
@@ -0,0 +1,18 @@
+import pandas as pd
+
+from utils import weights
+
+
+def _rows(start, n):
+    return pd.DataFrame({weights.METRICS["citations"]: range(start, start + n)})
+
+
+def test_metric_memo_is_capped(monkeypatch):
+    monkeypatch.setattr(weights, "MEMO_ROWS", 50)
+    monkeypatch.setattr(weights, "_memo", pd.DataFrame(columns=list(weights.METRICS), dtype=float))
+    for start in range(0, 200, 40):
+        matrix = weights.metric_matrix(_rows(start, 40))
+        assert list(matrix[:, 0]) == list(range(start, start + 40))
+    assert len(weights._memo) == 50
+    # a batch larger than the cap is still returned whole
+    assert weights.metric_matrix(_rows(1000, 80)).shape == (80, len(weights.METRICS))
@@ -0,0 +1,32 @@
+import io
+
+import plotly.graph_objects as go
+from docx import Document
+
+from utils import word_report
+
+
+def test_figure_table_by_trace_and_label():
+    fig = go.Figure([
+        go.Bar(name="Report", x=["January", "February"], y=[2, 3]),
+        go.Bar(name="Toolkit", x=["January"], y=[1]),
+    ])
+    table = word_report.figure_table(fig)
+    assert table.loc["Report", "February"] == 3
+    assert table.loc["Toolkit", "January"] == 1
+
+
+def test_figure_table_of_coloured_bars_and_network():
+    bars = go.Figure([go.Bar(name="Report", x=["Report"], y=[25]), go.Bar(name="Toolkit", x=["Toolkit"], y=[4])])
+    assert word_report.figure_table(bars).to_dict() == {"Report": 25, "Toolkit": 4}
+    network = go.Figure([go.Scatter(x=[0.1, 0.5], y=[0.2, 0.9], mode="markers")])
+    assert word_report.figure_table(network) is None
+
+
+def test_unrendered_chart_is_embedded_as_its_data():
+    report = {"title": "Q4 2025 Report", "quarter": 4}
+    aggregates = {"months": "October - December", "mentions": 3, "documents": 2}
+    figures = {"total_citations_trend": go.Figure([go.Scatter(x=["October", "November"], y=[1, 2])])}
+    document = Document(io.BytesIO(word_report.build_document(report, aggregates, figures, {"total_citations_trend": None})))
+    assert any("chart data" in paragraph.text for paragraph in document.paragraphs)
+    assert [cell.text for cell in document.tables[-1].rows[2].cells] == ["November", "2"]
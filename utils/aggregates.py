@@ -0,0 +1,117 @@
+import pandas as pd
+
+from utils.network import build_network, institution_column, most_connected, split_authors, split_institutions
+
+DATE_COL = "date_of_publication"
+DOC_COL = "name_of_the_document_citing_eige"
+JOURNAL_COL = "name_of_the_journal_citing_eige"
+TYPE_COL = "type_of_eige's_output_cited"
+WEIGHT_COL = "ranking/weight"
+QUARTERS = ["Q1", "Q2", "Q3", "Q4"]
+
+
+# -----------------------------
+# Shared page aggregates
+# -----------------------------
+def format_months(data):
+    """Months present in the data in calendar order, e.g. "January - February - March"."""
+    months = data["month"].dropna().unique()
+    return " - ".join(sorted(months, key=lambda m: pd.to_datetime(m, format='%B').month))
+
+
+def quarter_summary(data, year):
+    """Publications and mentions per quarter (Q1–Q4) plus a total row."""
+    from utils import rollups
+
+    return rollups.quarter_table(rollups.materialize(data), year)
+
+
+def monthly_documents(data):
+    """Unique documents per month, in calendar order."""
+    from utils import rollups
+
+    return rollups.month_documents(rollups.materialize(data))
+
+
+def output_type_counts(data):
+    return data[TYPE_COL].value_counts()
+
+
+def top_impact(data, n=5, weights=None, normalization=None):
+    """Top `n` rows by computed impact weight (utils.weights) with 1-based rank, as shown on the report pages."""
+    from utils.weights import compute
+
+    top = (
+        pd.DataFrame({"Document citing EIGE": data[DOC_COL], "Weight": compute(data, weights, normalization)})
+        .sort_values(by="Weight", ascending=False)  # top weights first
+        .head(n)
+        .reset_index(drop=True)
+    )
+    top.index = top.index + 1
+    top.index.name = "Rank"
+    return top
+
+
+def documents_table(data):
+    columns = [c for c in [DOC_COL, JOURNAL_COL, institution_column(data)] if c]
+    return data.drop_duplicates(subset="document_id")[columns].drop_duplicates()
+
+
+def repeating(values):
+    counts = values.value_counts()
+    return counts[counts > 1]
+
+
+# -----------------------------
+# Whole-report bundles (batch export)
+# -----------------------------
+def report_aggregates(data, year, annual=False):
+    """Every number and table a report page shows, keyed by name."""
+    output_counts = output_type_counts(data)
+    aggregates = {
+        "months": format_months(data),
+        "mentions": len(data),
+        "documents": data["document_id"].nunique(),
+        "journals": data[JOURNAL_COL].nunique() if JOURNAL_COL in data.columns else None,
+        "output_types": output_counts,
+        "most_frequent_output_type": output_counts.idxmax() if len(output_counts) else None,
+        "documents_table": documents_table(data),
+        "top_impact": top_impact(data),
+    }
+    if annual:
+        institution_col = institution_column(data)
+        aggregates.update({
+            "quarter_summary": quarter_summary(data, year),
+            "monthly_documents": monthly_documents(data),
+            "repeating_authors": repeating(split_authors(data["name_of_the_author/organisation_citing_eige"])),
+            "repeating_universities": (
+                repeating(split_institutions(data[institution_col])) if institution_col else pd.Series(dtype=int)
+            ),
+            "most_connected_institutions": most_connected(build_network(data, kind="institution")[0]),
+        })
+    return aggregates
+
+
+def report_figures(data, year, annual=False):
+    """Every chart a report page shows, keyed by chart name."""
+    from utils import charts
+
+    months = format_months(data)
+    all_months = range(1, 13)
+    figures = {
+        "trend_line_chart": charts.trend_line_chart(data, months, year, *all_months),
+        "output_type_bar_chart": charts.output_type_bar_chart(data, year),
+        "sunburst_chart": charts.sunburst_chart(data, months, year),
+        "radar_chart": charts.radar_chart(data, months, year),
+    }
+    if annual:
+        figures.update({
+            "total_citations_trend": charts.total_citations_trend(data, months, year, *all_months),
+            "annual_bar": charts.annual_bar(data, year),
+            "network_chart": charts.network_chart(
+                *build_network(data, kind="author"), title=f"Co-authorship network, {year}"
+            ),
+        })
+    else:
+        figures["citation_stack"] = charts.citation_stack(data, months=months, year=year)
+    return figures
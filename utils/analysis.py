@@ -1,10 +1,8 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 import streamlit as st
-from sklearn.preprocessing import MinMaxScaler, LabelEncoder
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
-from sklearn.linear_model import LinearRegression
+
+# matplotlib and scikit-learn take over a second to import; they are only
+# loaded by the steps below that use them.
 
 # Step 1: Drop columns and handle missing data
 def drop_columns_and_handle_missing(data):
@@ -23,6 +21,8 @@ def drop_columns_and_handle_missing(data):
 
 # Step 2: Encode categorical columns
 def encode_categorical_columns(data, categorical_columns):
+    from sklearn.preprocessing import LabelEncoder
+
     # Apply One-Hot Encoding to the specified categorical columns
     data = pd.get_dummies(data, columns=categorical_columns)
 
@@ -42,6 +42,8 @@ def encode_categorical_columns(data, categorical_columns):
 
 # Step 3: Normalize the data
 def normalize_data(data, target_column):
+    from sklearn.preprocessing import MinMaxScaler
+
     scaler = MinMaxScaler()
     
     # Normalize the target column
@@ -55,17 +57,23 @@ def normalize_data(data, target_column):
 
 # Step 4: Combine categorical columns and apply PCA for dimensionality reduction
 def combine_categorical_and_pca(data, categorical_columns):
-    # Apply One-Hot Encoding to the categorical columns
-    data_encoded = pd.get_dummies(data, columns=categorical_columns)
+    from sklearn.decomposition import PCA
+
+    # Apply One-Hot Encoding to the categorical columns (unless step 2 already did)
+    columns = [column for column in categorical_columns if column in data.columns]
+    data_encoded = pd.get_dummies(data, columns=columns)
     
-    # Apply PCA to reduce dimensions to 1 for visualization
+    # Apply PCA to reduce dimensions to 1 for visualization; PCA takes numbers only, without gaps
+    features = data_encoded.select_dtypes(include=['number', 'bool']).astype(float).fillna(0)
     pca = PCA(n_components=1)
-    pca_result = pca.fit_transform(data_encoded)
+    pca_result = pca.fit_transform(features)
     
     return pca_result
 
 # Step 5: Visualize the scatter plot of Normalized Weights vs Combined Categorical Features
 def visualize_combined_scatter(data, target_column, pca_result):
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=(8, 6))
     
     # Plotting the normalized weights vs PCA result on the x-axis
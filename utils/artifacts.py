@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+# Output of `python -m scripts.precompute`, read back by the loaders
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARTIFACTS_DIR = os.environ.get("CITATION_ARTIFACTS_DIR", os.path.join(ROOT, "build", "artifacts"))
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Workbook folders that get precomputed (not recursive)
+SOURCE_DIRS = ["data", "data/2025_data", "data/2025_maps"]
+
+# Artifacts go stale when the normalization (or stored rollup) code changes, not only the workbooks
+NORMALIZATION_MODULES = [
+    "utils/data_loader.py", "utils/dedup.py", "utils/rollups.py", "utils/sketches.py", "utils/network.py",
+]
+
+
+# -----------------------------
+# Hashing
+# -----------------------------
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def modules_fingerprint(modules):
+    """One SHA-256 over the source of `modules` (paths relative to the repo root)."""
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(os.path.join(ROOT, module), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def code_fingerprint():
+    return modules_fingerprint(NORMALIZATION_MODULES)
+
+
+# -----------------------------
+# Manifest
+# -----------------------------
+def manifest_path(out_dir=None):
+    return os.path.join(out_dir or ARTIFACTS_DIR, MANIFEST_NAME)
+
+
+def read_manifest(out_dir=None):
+    """The manifest, or None when it is missing, unreadable or from another version."""
+    try:
+        with open(manifest_path(out_dir)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def write_manifest(manifest, out_dir=None):
+    path = manifest_path(out_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)  # readers never see a half-written manifest
+
+
+def fresh_entry(relpath, data_dir=None, manifest=None, fingerprint=None):
+    """
+    Manifest entry of the workbook at `relpath` (relative to the repo root)
+    if its artifacts match the workbook on disk and the current code, else None.
+    """
+    manifest = manifest if manifest is not None else read_manifest()
+    if manifest is None or manifest.get("code") != (fingerprint or code_fingerprint()):
+        return None
+    entry = manifest["files"].get(relpath)
+    source = os.path.join(data_dir or ROOT, relpath)
+    if entry is None or entry.get("error") or not os.path.exists(source):
+        return None
+    if file_sha256(source) != entry["sha256"]:
+        return None
+    return entry
+
+
+# -----------------------------
+# Parquet partitions
+# -----------------------------
+def partition_dir(relpath, out_dir=None):
+    return os.path.join(out_dir or ARTIFACTS_DIR, os.path.splitext(relpath)[0])
+
+
+def _mixed_columns(data):
+    # hand-typed cells ("2", 2, "1 X user") leave object columns Parquet cannot store
+    return [
+        c for c in data.columns
+        if data[c].dtype == object and data[c].dropna().map(type).nunique() > 1
+    ]
+
+
+def write_partition(data, path):
+    """Write `data` as Parquet; mixed-type columns are stored JSON-encoded. Returns those columns."""
+    json_columns = _mixed_columns(data)
+    encoded = data.copy()
+    for c in json_columns:
+        encoded[c] = encoded[c].map(lambda v: None if pd.isna(v) else json.dumps(v, default=str))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    encoded.to_parquet(path, index=True)
+    return json_columns
+
+
+def read_partition(path, json_columns=()):
+    data = pd.read_parquet(path)
+    for c in json_columns:
+        data[c] = data[c].map(lambda v: json.loads(v) if isinstance(v, str) else float("nan")).astype(object)
+    return data
@@ -0,0 +1,91 @@
+from utils.data_loader import RAW_BASE_URL
+
+# Every report page and the workbooks it is built from (paths relative to the repo root).
+# `doc` and `excel` are the files offered for download on the page.
+REPORTS = {
+    "2024Q1": {
+        "title": "Q1 2024 Report", "year": 2024, "quarter": 1,
+        "data": ["data/Q12024_13012025.xlsx"],
+        "geo": ["data/2024Q1_map.xlsx"],
+        "doc": "data/2025-01-15 2024 report.docx",
+        "excel": "data/Q12024_13012025.xlsx",
+    },
+    "2024Q2": {
+        "title": "Q2 2024 Report", "year": 2024, "quarter": 2,
+        "data": ["data/2024Q2_29012025.xlsx"],
+        "geo": ["data/2024Q2_map.xlsx"],
+        "doc": "data/2025-02-07_Q22024_report.docx",
+        "excel": "data/2024Q2_29012025.xlsx",
+    },
+    "2024Q3": {
+        "title": "Q3 2024 Report", "year": 2024, "quarter": 3,
+        "data": ["data/2024Q3_03022025.xlsx"],
+        "geo": ["data/2024Q3map.xlsx"],
+        "doc": "data/2025-02-010_Q32024_report.docx",
+        "excel": "data/2024Q3_03022025.xlsx",
+    },
+    "2024Q4": {
+        "title": "Q4 2024 Report", "year": 2024, "quarter": 4,
+        "data": ["data/2024Q4_20250203.xlsx"],
+        "geo": ["data/2024Q4map.xlsx"],
+        "doc": "data/2025-02-012_Q42024_report.docx",
+        "excel": "data/2024Q4_20250203.xlsx",
+    },
+    "2024": {
+        "title": "2024 Annual Report", "year": 2024, "quarter": None,
+        "data": ["data/ALLQ2024_upd.xlsx"],
+        "geo": ["data/2024Q1_map.xlsx", "data/2024Q2_map.xlsx", "data/2024Q3map.xlsx", "data/2024Q4map.xlsx"],
+        "doc": "data/2024_report.docx",
+        "excel": "data/ALLQ2024_upd.xlsx",
+    },
+    "2025Q1": {
+        "title": "Q1 2025 Report", "year": 2025, "quarter": 1,
+        "data": ["data/2025_data/2025Q1.xlsx"],
+        "geo": ["data/2025_maps/2025Q1_map.xlsx"],
+        "doc": "data/2025-01-15 2024 report.docx",
+        "excel": "data/2025_data/2025Q1.xlsx",
+    },
+    "2025Q2": {
+        "title": "Q2 2025 Report", "year": 2025, "quarter": 2,
+        "data": ["data/2025_data/2025Q2.xlsx"],
+        "geo": ["data/2025_maps/2025Q2_map.xlsx"],
+        "doc": "data/2025-01-15 2024 report.docx",
+        "excel": "data/2025_data/2025Q2.xlsx",
+    },
+    "2025Q3": {
+        "title": "Q3 2025 Report", "year": 2025, "quarter": 3,
+        "data": ["data/2025_data/2025Q3.xlsx"],
+        "geo": ["data/2025_maps/2025Q3_map.xlsx"],
+        "doc": "data/2025-01-15 2024 report.docx",
+        "excel": "data/2025_data/2025Q3.xlsx",
+    },
+    "2025Q4": {
+        "title": "Q4 2025 Report", "year": 2025, "quarter": 4,
+        "data": ["data/2025_data/2025Q4.xlsx"],
+        "geo": ["data/2025_maps/2025Q4_map.xlsx"],
+        "doc": "data/2025-01-15 2024 report.docx",
+        "excel": "data/2025_data/2025Q4.xlsx",
+    },
+    "2025": {
+        "title": "2025 Annual Report", "year": 2025, "quarter": None,
+        "data": ["data/2025_data/2025_all.xlsx"],
+        "geo": [
+            "data/2025_maps/2025Q1_map.xlsx", "data/2025_maps/2025Q2_map.xlsx",
+            "data/2025_maps/2025Q3_map.xlsx", "data/2025_maps/2025Q4_map.xlsx"
+        ],
+        "doc": "data/2024_report.docx",
+        "excel": "data/2025_data/2025_all.xlsx",
+    },
+}
+
+
+def data_urls(report_id):
+    return [RAW_BASE_URL + path for path in REPORTS[report_id]["data"]]
+
+
+def geo_urls(report_id):
+    return [RAW_BASE_URL + path for path in REPORTS[report_id]["geo"]]
+
+
+def reports_for_year(year):
+    return [rid for rid, report in REPORTS.items() if report["year"] == year]
@@ -1,13 +1,20 @@
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
+from plotly.colors import qualitative
+from utils.disk_cache import figure
+from utils.instrumentation import timed
+from utils.weights import NORMALIZATION, WEIGHTS
 
-colors = px.colors.qualitative.Pastel
+# plotly.express is imported inside the builders that use it, so importing
+# this module (and every page) does not pay for it up front.
+colors = qualitative.Pastel
 
 # -----------------------------
 # 2. bar chart of total citations
 # -----------------------------
+@timed(kind="chart")
+@figure
 def total_citations_trend(
     data,
     months=None,
@@ -20,8 +27,9 @@ def total_citations_trend(
     mode="documents"      → number of documents citing EIGE
     mode="avg_citations"  → average Google Scholar citations per article
     """
+    import plotly.express as px
 
-    data = data.copy()
+    data = data.copy(deep=False)  # copy-on-write: new columns never reach the shared frame
     date_col = 'date_of_publication'
     doc_col = 'name_of_the_document_citing_eige'
     citation_col = 'number_of_citations_(using_google_scholar)'
@@ -107,8 +115,12 @@ def total_citations_trend(
 # -----------------------------
 # Output Type Bar Chart
 # -----------------------------
+@timed(kind="chart")
+@figure
 def output_type_bar_chart(data, year):
-    data = data.copy()
+    import plotly.express as px
+
+    data = data.copy(deep=False)
     data.columns = data.columns.str.strip().str.lower().str.replace(" ", "_")
 
     if "date_of_publication" not in data.columns:
@@ -150,7 +162,7 @@ def output_type_bar_chart(data, year):
         .reset_index(name="count")
     )
 
-    base_palette = px.colors.qualitative.Safe
+    base_palette = qualitative.Safe
     extended_palette = (
         base_palette * ((len(topic_counts) // len(base_palette)) + 1)
     )[:len(topic_counts)]
@@ -181,8 +193,12 @@ def output_type_bar_chart(data, year):
 # -----------------------------
 # Sunburst Chart
 # -----------------------------
-def sunburst_chart(data, months, year, color_palette=px.colors.qualitative.Pastel, height=600):
-    data = data.copy()
+@timed(kind="chart")
+@figure
+def sunburst_chart(data, months, year, color_palette=qualitative.Pastel, height=600):
+    import plotly.express as px
+
+    data = data.copy(deep=False)
     data.columns = data.columns.str.strip().str.lower().str.replace(' ', '_')
     required_columns = ["type_of_eige's_output_cited_agg", "short_labels"]
     missing_columns = [col for col in required_columns if col not in data.columns]
@@ -203,15 +219,19 @@ def sunburst_chart(data, months, year, color_palette=px.colors.qualitative.Paste
 # Trend Line Chart
 # -----------------------------
 
+@timed(kind="chart")
+@figure
 def trend_line_chart(data, months=None, year=None, *args):
     """
     Stacked bar chart: total citations per EIGE output type per month.
     Bars are stacked, but no numbers displayed inside.
     """
+    import plotly.express as px
+
     if len(args) > 12:
         args = args[:12]
 
-    data = data.copy()
+    data = data.copy(deep=False)
     date_col = 'date_of_publication'
     type_col = "type_of_eige's_output_cited"
     citation_col = 'number_of_citations_(using_google_scholar)'
@@ -252,7 +272,7 @@ def trend_line_chart(data, months=None, year=None, *args):
         x='month_str',
         y='total_citations',
         color=type_col,
-        color_discrete_sequence=px.colors.qualitative.Pastel
+        color_discrete_sequence=qualitative.Pastel
     )
     fig.update_layout(
         template="plotly_white",
@@ -268,8 +288,14 @@ def trend_line_chart(data, months=None, year=None, *args):
 # -----------------------------
 # Radar Chart (ordered by weight)
 # -----------------------------
-def radar_chart(data, months, year):
-    data = data.copy()
+@timed(kind="chart")
+@figure
+def radar_chart(data, months, year, weights=WEIGHTS, normalization=NORMALIZATION):
+    """Impact metrics of every document citing EIGE, ordered by the computed weight (see utils.weights)."""
+    from utils.weights import compute
+
+    data = data.copy(deep=False)
+    data["weight"] = compute(data, weights, normalization)
     
     # rename columns for readability
     rename_map = {
@@ -293,14 +319,14 @@ def radar_chart(data, months, year):
         data['sentiment of mention'] = data['sentiment of mention'].map(sentiment_mapping)
 
     categories = [c for c in columns_to_convert if c in data.columns]
-    if 'name_of_the_document_citing_eige' not in data.columns or 'ranking/weight' not in data.columns:
+    if 'name_of_the_document_citing_eige' not in data.columns:
         return go.Figure().update_layout(title="Missing columns", template="plotly_white")
 
     # group by document and compute mean metrics
-    data_grouped = data.groupby(['name_of_the_document_citing_eige', 'ranking/weight'])[categories].mean().reset_index()
+    data_grouped = data.groupby(['name_of_the_document_citing_eige', 'weight'])[categories].mean().reset_index()
     
-    # sort by weight descending
-    data_grouped = data_grouped.sort_values(by='ranking/weight', ascending=False)
+    # sort by computed weight descending
+    data_grouped = data_grouped.sort_values(by='weight', ascending=False)
 
     # build figure
     fig = go.Figure()
@@ -322,11 +348,15 @@ def radar_chart(data, months, year):
 # -----------------------------
 # Annual Bar Chart
 # -----------------------------
+@timed(kind="chart")
+@figure
 def annual_bar(data, year):
     """
     Plot annual bar chart of EIGE outputs cited.
     Expects 'type_of_eige\'s_output_cited' column in data.
     """
+    import plotly.express as px
+
     if "type_of_eige's_output_cited" not in data.columns:
         raise KeyError(f"'type_of_eige\'s_output_cited' column missing. Available: {list(data.columns)}")
     
@@ -344,11 +374,13 @@ def annual_bar(data, year):
 # -----------------------------
 # Citation Stacked Bar
 # -----------------------------
+@timed(kind="chart")
+@figure
 def citation_stack(data, doc_col='name_of_the_document_citing_eige', months='', year=''):
     if data.empty:
         return go.Figure().update_layout(title="No data available", template="plotly_white")
 
-    data = data.copy()
+    data = data.copy(deep=False)
     data.columns = data.columns.str.strip().str.lower().str.replace(' ', '_')
     doc_col = doc_col.lower().replace(' ', '_')
     if doc_col not in data.columns:
@@ -371,3 +403,117 @@ def citation_stack(data, doc_col='name_of_the_document_citing_eige', months='',
     fig.update_layout(barmode='stack', xaxis_title="Article", yaxis_title="Mentions", template="plotly_white", showlegend=False)
     return fig
 
+
+
+# -----------------------------
+# Network Chart
+# -----------------------------
+@timed(kind="chart")
+@figure
+def network_chart(nodes, edges, title="Network", top_n=60):
+    """
+    Co-authorship / co-institution graph.
+    Each connected component is drawn as a ring; components are laid out on a grid,
+    largest first. Only the `top_n` most connected nodes are shown.
+    """
+    if nodes.empty:
+        return go.Figure().update_layout(title="No network data available", template="plotly_white")
+
+    nodes = nodes.sort_values(["degree", "documents"], ascending=False).head(top_n)
+    nodes = nodes.sort_values(["component_size", "component", "degree"], ascending=[False, True, False])
+
+    # ring layout per component
+    positions = {}
+    components = list(dict.fromkeys(nodes["component"]))
+    grid = int(np.ceil(np.sqrt(len(components))))
+    for i, comp in enumerate(components):
+        members = nodes.loc[nodes["component"] == comp, "name"].tolist()
+        cx, cy = (i % grid) * 3, -(i // grid) * 3
+        radius = 0 if len(members) == 1 else 1
+        for j, name in enumerate(members):
+            angle = 2 * np.pi * j / len(members)
+            positions[name] = (cx + radius * np.cos(angle), cy + radius * np.sin(angle))
+
+    edges = edges[edges["source"].isin(positions) & edges["target"].isin(positions)]
+    edge_x, edge_y = [], []
+    for source, target in zip(edges["source"], edges["target"]):
+        edge_x += [positions[source][0], positions[target][0], None]
+        edge_y += [positions[source][1], positions[target][1], None]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=edge_x, y=edge_y,
+        mode="lines",
+        line=dict(width=0.8, color="#b0b0b0"),
+        hoverinfo="skip"
+    ))
+    fig.add_trace(go.Scatter(
+        x=[positions[n][0] for n in nodes["name"]],
+        y=[positions[n][1] for n in nodes["name"]],
+        mode="markers",
+        marker=dict(
+            size=8 + 4 * nodes["degree"].clip(upper=10),
+            color=[colors[c % len(colors)] for c in nodes["component"]],
+            line=dict(width=1, color="white")
+        ),
+        text=[
+            f"{n}<br>Documents: {d}<br>Connections: {k}"
+            for n, d, k in zip(nodes["name"], nodes["documents"], nodes["degree"])
+        ],
+        hoverinfo="text"
+    ))
+    fig.update_layout(
+        template="plotly_white",
+        title=title,
+        showlegend=False,
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False, scaleanchor="x")
+    )
+    return fig
+
+# -----------------------------
+# Country Choropleth
+# -----------------------------
+@timed(kind="chart")
+@figure
+def country_choropleth(countries, value="mentions", title="Mentions by country"):
+    """
+    Choropleth of `countries` (iso3, country, mentions, documents per country,
+    see utils.countries.country_aggregates), coloured by `value`.
+    """
+    import plotly.express as px
+
+    fig = px.choropleth(
+        countries,
+        locations="iso3",
+        locationmode="ISO-3",
+        color=value,
+        hover_name="country",
+        hover_data={"iso3": False, "mentions": True, "documents": True},
+        color_continuous_scale="Blues",
+        projection="natural earth",
+        title=title,
+    )
+    fig.update_geos(showcountries=True, countrycolor="white", showframe=False)
+    fig.update_layout(template="plotly_white", margin=dict(l=0, r=0, t=40, b=0),
+                      coloraxis_colorbar=dict(title=value.capitalize()))
+    return fig
+
+# -----------------------------
+# EU / Non-EU Split
+# -----------------------------
+@timed(kind="chart")
+@figure
+def region_split_chart(regions, value="mentions"):
+    """Donut of `value` per EU / Non-EU (/ Unknown) region."""
+    fig = go.Figure(go.Pie(
+        labels=regions["region"],
+        values=regions[value],
+        customdata=regions["documents"],
+        hole=0.5,
+        marker=dict(colors=colors),
+        hovertemplate="%{label}: %{value} " + value + "<br>%{customdata} documents<extra></extra>",
+        sort=False,
+    ))
+    fig.update_layout(template="plotly_white", title="EU vs non-EU", margin=dict(l=0, r=0, t=40, b=0))
+    return fig
@@ -0,0 +1,326 @@
+import pandas as pd
+import streamlit as st
+
+from utils import artifacts, disk_cache, watcher, weights
+from utils.aggregates import TYPE_COL
+from utils.catalog import REPORTS, data_urls
+from utils.data_loader import freeze, get_shared_data
+from utils.instrumentation import mark_computed, timed
+
+IMPACT_COL = "impact_factor_of_the_journal:_1_respectable;_2_strong;_3_very_strong_(using_free_version_of_scopus)"
+
+# Compared metrics: (metric, output type) columns; counts add up over a period, so a
+# quarter without citations counts 0, while an average of no citations stays unknown
+COUNTS = ["mentions", "documents"]
+AVERAGES = ["average_weight", "impact_factor"]
+OUTPUT_TYPE = "output_type"
+LABELS = {
+    "mentions": "Mentions",
+    "documents": "Documents",
+    "average_weight": "Average impact weight",
+    "impact_factor": "Average journal impact factor",
+}
+# Deltas per period: the value, then the previous quarter's / previous year's value and the change
+STATS = ["value", "previous_quarter", "qoq", "qoq_pct", "previous_year", "yoy", "yoy_pct"]
+
+# The average weight is computed with utils.weights, so its code is part of the key too
+_CODE = artifacts.modules_fingerprint(["utils/comparisons.py", "utils/weights.py"])
+
+
+# -----------------------------
+# Period values
+# -----------------------------
+def period_rows(frames):
+    """
+    One frame of the citations of every `(year, quarter) -> data` in `frames`
+    (quarter None: a whole-year workbook), with the columns the metrics need.
+    The weight is the impact weight of the methodology (utils.weights), not
+    the hand-typed `ranking/weight`, like the Top-5 tables of the pages.
+    """
+    rows = []
+    for (year, quarter), data in frames.items():
+        # like the quarter summaries, only rows dated in the report's quarter(s) count; the
+        # blank rows some workbooks end with have none
+        if "quarter" in data.columns:
+            data = data[data["quarter"] == f"Q{quarter}"] if quarter else data[data["quarter"].notna()]
+        rows.append(pd.DataFrame({
+            "year": year,
+            "quarter": quarter,
+            "document_id": data["document_id"].to_numpy(),
+            "type": data[TYPE_COL].to_numpy() if TYPE_COL in data.columns else None,
+            "weight": weights.compute(data, weights.DEFAULT_WEIGHTS, "none").to_numpy(),
+            "impact": pd.to_numeric(data[IMPACT_COL], errors="coerce").to_numpy() if IMPACT_COL in data.columns else None,
+        }))
+    rows = pd.concat(rows, ignore_index=True)
+    rows["weight"] = rows["weight"].astype(float)
+    rows["impact"] = rows["impact"].astype(float)
+
+    # "report" / "Report", "web section - index" / "Web section, index": one output type,
+    # named as in the most recent workbook
+    types = rows["type"].astype("string").str.strip().replace("", pd.NA)
+    keys = types.str.lower().str.replace(r"[\s,:-]+", " ", regex=True)
+    labels = types.groupby(keys).last()
+    rows["type"] = keys.map(labels)
+    return rows
+
+
+def period_values(rows, by):
+    """Every metric per period of `by`: one row per period, one (metric, output type) column per metric."""
+    grouped = rows.groupby(by)
+    totals = pd.DataFrame({
+        "mentions": grouped.size(),
+        "documents": grouped["document_id"].nunique(),
+        "average_weight": grouped["weight"].mean(),
+        "impact_factor": grouped["impact"].mean(),
+    })
+    totals.columns = pd.MultiIndex.from_product([totals.columns, [""]])
+    types = rows.dropna(subset=["type"]).groupby(by + ["type"]).size().unstack(fill_value=0)
+    types.columns = pd.MultiIndex.from_product([[OUTPUT_TYPE], types.columns])
+    values = pd.concat([totals, types], axis=1)
+    values.columns.names = ["metric", "key"]
+    counts = [c for c in values.columns if c[0] not in AVERAGES]
+    values[counts] = values[counts].fillna(0)
+    return values
+
+
+def _deltas(values, quarterly):
+    """
+    The STATS of every period and metric at once: shifting the whole frame
+    by one row (quarter) and four rows (year) of a gap-free period index is
+    the window, so one pass covers every metric and output type.
+    """
+    counts = [c for c in values.columns if c[0] not in AVERAGES]
+    values = values.astype(float)
+    values[counts] = values[counts].fillna(0)
+    frames = {"value": values}
+    lags = {"previous_quarter": 1, "previous_year": 4} if quarterly else {"previous_year": 1}
+    for name, lag in lags.items():
+        previous = values.shift(lag)
+        change = values - previous
+        prefix = "qoq" if name == "previous_quarter" else "yoy"
+        frames.update({name: previous, prefix: change, f"{prefix}_pct": change / previous.where(previous != 0)})
+    deltas = pd.concat(frames, axis=1, names=["stat"]).stack(["metric", "key"], future_stack=True)
+    return deltas.reindex(columns=[s for s in STATS if s in deltas.columns]).dropna(subset=["value"])
+
+
+def quarter_deltas(rows):
+    """Quarter-over-quarter and year-over-year deltas of every quarter between the first and the last one with data."""
+    rows = rows.dropna(subset=["quarter"]).assign(period=lambda r: r["year"] * 4 + r["quarter"].astype(int) - 1)
+    values = period_values(rows, ["period"])
+    values = values.reindex(pd.RangeIndex(values.index.min(), values.index.max() + 1, name="period"))
+    deltas = _deltas(values, quarterly=True).reset_index()
+    deltas.insert(0, "year", deltas["period"] // 4)
+    deltas.insert(1, "quarter", deltas.pop("period") % 4 + 1)
+    return deltas
+
+
+def year_deltas(rows):
+    """Year-over-year deltas of every year between the first and the last one with data."""
+    values = period_values(rows, ["year"])
+    values = values.reindex(pd.RangeIndex(values.index.min(), values.index.max() + 1, name="year"))
+    return _deltas(values, quarterly=False).reset_index()
+
+
+def compare(frames):
+    """
+    `quarters` and `years`: the deltas of the quarterly and of the whole-year
+    workbooks in `frames` ({(year, quarter | None): data}).
+    """
+    rows = period_rows(frames)
+    return {
+        "quarters": freeze(quarter_deltas(rows[rows["quarter"].notna()])),
+        "years": freeze(year_deltas(rows[rows["quarter"].isna()])),
+    }
+
+
+# -----------------------------
+# Cached engine
+# -----------------------------
+def catalog_sources():
+    """((year, quarter | None), workbook URLs) of every report in the catalog."""
+    return tuple(
+        ((report["year"], report["quarter"]), tuple(data_urls(report_id)))
+        for report_id, report in REPORTS.items()
+    )
+
+
+@st.cache_resource
+def _comparisons(sources, fingerprint):
+    mark_computed()
+
+    def compute():
+        return compare({period: get_shared_data(list(urls)) for period, urls in sources})
+
+    return disk_cache.cached(
+        "comparisons", (sources, fingerprint, _CODE), compute, ttl=disk_cache.ttl_for(fingerprint)
+    )
+
+
+@timed("comparisons", kind="loader", cached=True)
+def comparisons(sources=None):
+    """
+    Period-over-period deltas of every report in the catalog, computed once
+    per content of the workbooks. Each period is measured on the workbook of
+    its own page, so the numbers match what that page shows.
+    """
+    sources = sources or catalog_sources()
+    return watcher.call(_comparisons, [url for _, urls in sources for url in urls], sources)
+
+
+def period_deltas(year, quarter=None, sources=None):
+    """The deltas of one quarter (or year, `quarter` None), indexed by (metric, key)."""
+    frames = comparisons(sources)
+    if quarter is None:
+        deltas = frames["years"][frames["years"]["year"] == year]
+    else:
+        deltas = frames["quarters"][(frames["quarters"]["year"] == year) & (frames["quarters"]["quarter"] == quarter)]
+    return deltas.set_index(["metric", "key"])
+
+
+# -----------------------------
+# Sentences
+# -----------------------------
+def period_label(year, quarter=None):
+    return f"Q{quarter} {year}" if quarter else str(year)
+
+
+def _number(value):
+    return f"{value:,.0f}" if float(value).is_integer() else f"{value:,.2f}"
+
+
+def _change(name, value, previous, change, pct, count=True):
+    """ "mentions rose by 10 (+83%)", "the average impact weight fell from 1.9 to 1.2", "documents stayed at 14"."""
+    if _number(value) == _number(previous):
+        return f"{name} stayed at {_number(value)}"
+    verb = "rose" if change > 0 else "fell"
+    if not count:
+        return f"{name} {verb} from {_number(previous)} to {_number(value)}"
+    percent = f" ({pct:+.0%})" if pd.notna(pct) else ""
+    return f"{name} {verb} by {_number(abs(change))}{percent}"
+
+
+def _join(parts):
+    return parts[0] if len(parts) == 1 else ", ".join(parts[:-1]) + " and " + parts[-1]
+
+
+def change_sentence(deltas, prefix, since):
+    """One sentence of the changes of every headline metric against `since` ("Q3 2024"), None without a previous value."""
+    previous = "previous_quarter" if prefix == "qoq" else "previous_year"
+    parts = []
+    for metric, name in [("mentions", "mentions"), ("documents", "documents"),
+                         ("average_weight", "the average impact weight of the citations")]:
+        if (metric, "") not in deltas.index:
+            continue
+        row = deltas.loc[(metric, "")]
+        if pd.isna(row[previous]) or pd.isna(row["value"]):
+            continue
+        parts.append(_change(name, row["value"], row[previous], row[prefix], row[f"{prefix}_pct"], metric in COUNTS))
+    if not parts:
+        return None
+    return f"Compared with {since}, {_join(parts)}."
+
+
+def output_type_sentence(deltas, prefix, since):
+    """The output types whose mentions grew and fell the most against `since`."""
+    if OUTPUT_TYPE not in deltas.index.get_level_values("metric"):
+        return None
+    changes = deltas.loc[OUTPUT_TYPE, prefix].dropna()
+    changes = changes[changes != 0]
+    if changes.empty:
+        return None
+    parts = []
+    if changes.max() > 0:
+        parts.append(f"the largest increase was in citations of {changes.idxmax()} ({changes.max():+.0f})")
+    if changes.min() < 0:
+        parts.append(f"the largest decrease in citations of {changes.idxmin()} ({changes.min():+.0f})")
+    text = _join(parts)
+    return f"Among EIGE’s outputs, {text} compared with {since}."
+
+
+def quarter_sentences(year, quarter, sources=None):
+    """
+    Generated comparison text of a quarterly report: its mentions against the
+    earlier quarters of the year (or the previous quarter, for Q1), then the
+    changes on the previous quarter and on the same quarter of the year before.
+    """
+    frames = comparisons(sources)
+    quarters = frames["quarters"]
+    mentions = quarters[quarters["metric"] == "mentions"].set_index(["year", "quarter"])["value"]
+    if (year, quarter) not in mentions.index:
+        return []
+    value = mentions[(year, quarter)]
+    earlier = mentions.loc[[(year, q) for q in range(1, quarter) if (year, q) in mentions.index]]
+    if earlier.empty and quarter == 1 and (year - 1, 4) in mentions.index:
+        earlier = mentions.loc[[(year - 1, 4)]]
+
+    sentences = []
+    if not earlier.empty:
+        def listing(periods):
+            return ", ".join(
+                f"Q{q} ({_number(v)})" if y == year else f"{period_label(y, q)} ({_number(v)})"
+                for (y, q), v in periods.items()
+            )
+        parts = [
+            f"{comparison} than in {listing(periods)}"
+            for comparison, periods in [("higher", earlier[earlier < value]), ("lower", earlier[earlier > value])]
+            if not periods.empty
+        ]
+        same = earlier[earlier == value]
+        if not same.empty:
+            parts.append(f"the same as in {listing(same)}")
+        if len(parts) == 1:
+            # "higher than in the previous quarters Q2 (17), Q3 (12)"
+            scope = "the previous quarters" if len(earlier) > 1 else "the previous quarter"
+            parts = [parts[0].replace(" in ", f" in {scope} ", 1)]
+        sentences.append(f"The number of mentions to EIGE ({_number(value)}) in Q{quarter} {year} is {' but '.join(parts)}.")
+
+    deltas = period_deltas(year, quarter, sources)
+    previous = (year, quarter - 1) if quarter > 1 else (year - 1, 4)
+    for prefix, since in [("qoq", period_label(*previous)), ("yoy", period_label(year - 1, quarter))]:
+        for sentence in (change_sentence(deltas, prefix, since), output_type_sentence(deltas, prefix, since)):
+            if sentence:
+                sentences.append(sentence)
+    return sentences
+
+
+def year_sentences(year, sources=None):
+    """Generated comparison text of an annual report: its totals and changes on the year before."""
+    deltas = period_deltas(year, sources=sources)
+    if deltas.empty:
+        return []
+    since = str(year - 1)
+    return [s for s in (change_sentence(deltas, "yoy", since), output_type_sentence(deltas, "yoy", since)) if s]
+
+
+def delta_table(year, quarter=None, sources=None):
+    """The headline metrics of a period with their previous-period values and changes, as shown on the pages."""
+    deltas = period_deltas(year, quarter, sources)
+    table = deltas.loc[[(m, "") for m in COUNTS + AVERAGES if (m, "") in deltas.index]].droplevel("key")
+    table = table[[c for c in STATS if c in table.columns]]
+    table.index = [LABELS[m] for m in table.index]
+    return table.rename(columns={
+        "value": period_label(year, quarter),
+        "previous_quarter": "Previous quarter",
+        "qoq": "Change on previous quarter",
+        "qoq_pct": "% change on previous quarter",
+        "previous_year": "Previous year",
+        "yoy": "Change on previous year",
+        "yoy_pct": "% change on previous year",
+    })
+
+
+# -----------------------------
+# Rendering
+# -----------------------------
+def comparison_section(year, quarter=None):
+    """The generated comparison sentences of a report page, with the table of deltas behind an expander."""
+    sentences = quarter_sentences(year, quarter) if quarter else year_sentences(year)
+    if not sentences:
+        return
+    st.markdown(" ".join(sentences))
+    with st.expander("Changes on the previous periods"):
+        table = delta_table(year, quarter)
+        percent = [c for c in table.columns if c.startswith("%")]
+        st.dataframe(table.style.format("{:.1%}", subset=percent, na_rep="–").format(
+            "{:,.2f}", subset=[c for c in table.columns if c not in percent], na_rep="–"
+        ))
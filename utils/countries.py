@@ -0,0 +1,196 @@
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import artifacts, disk_cache, geo, watcher
+from utils.data_loader import freeze, get_shared_data
+from utils.instrumentation import mark_computed, timed
+
+# Reverse-geocoding reference: cities with their country (iso3, country, place, latitude, longitude)
+REFERENCE_PATH = os.environ.get(
+    "CITATION_COUNTRY_POINTS", os.path.join(artifacts.ROOT, "data", "country_points.csv")
+)
+
+EU_MEMBERS = frozenset({
+    "AUT", "BEL", "BGR", "HRV", "CYP", "CZE", "DNK", "EST", "FIN", "FRA", "DEU", "GRC", "HUN", "IRL",
+    "ITA", "LVA", "LTU", "LUX", "MLT", "NLD", "POL", "PRT", "ROU", "SVK", "SVN", "ESP", "SWE",
+})
+EU, NON_EU, UNKNOWN = "EU", "Non-EU", "Unknown"
+
+# Locations farther than this from every reference city (at sea, unlisted countries) stay unknown
+MAX_DISTANCE_KM = 800
+
+EARTH_RADIUS_KM = 6371.0
+DATE_COL = "date_of_publication"
+
+_CODE = artifacts.file_sha256(__file__)
+_references = {}  # reference sha256 -> (KD-tree, reference frame)
+
+
+# -----------------------------
+# Reverse lookup
+# -----------------------------
+def unit_vectors(lat, lon):
+    """Points on the unit sphere, so Euclidean nearest neighbours are great-circle nearest neighbours."""
+    lat, lon = np.radians(np.asarray(lat, dtype=float)), np.radians(np.asarray(lon, dtype=float))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def load_reference(path=REFERENCE_PATH):
+    """KD-tree over the reference cities, rebuilt only when the file's content changes."""
+    from scipy.spatial import cKDTree
+
+    sha = watcher.digest(path)
+    if sha not in _references:
+        reference = pd.read_csv(path).dropna(subset=["iso3", geo.LAT_COL, geo.LON_COL]).reset_index(drop=True)
+        _references[sha] = (cKDTree(unit_vectors(reference[geo.LAT_COL], reference[geo.LON_COL])), reference)
+    return (*_references[sha], sha)
+
+
+def country_of(lat, lon, path=REFERENCE_PATH):
+    """
+    iso3, country and region (EU / Non-EU / Unknown) of each coordinate: the
+    country of the nearest reference city within MAX_DISTANCE_KM.
+    """
+    tree, reference, _ = load_reference(path)
+    lat, lon = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)
+    result = pd.DataFrame({"iso3": pd.Series([None] * len(lat), dtype=object), "country": None, "region": UNKNOWN})
+    valid = ~(np.isnan(lat) | np.isnan(lon))
+    if not valid.any():
+        return result
+
+    max_chord = 2 * math.sin(MAX_DISTANCE_KM / EARTH_RADIUS_KM / 2)
+    distance, nearest = tree.query(unit_vectors(lat[valid], lon[valid]), k=1, distance_upper_bound=max_chord)
+    found = np.flatnonzero(valid)[np.isfinite(distance)]
+    matches = reference.iloc[nearest[np.isfinite(distance)]]
+    result.loc[found, "iso3"] = matches["iso3"].to_numpy()
+    result.loc[found, "country"] = matches["country"].to_numpy()
+    result.loc[found, "region"] = np.where(matches["iso3"].isin(EU_MEMBERS), EU, NON_EU)
+    return result
+
+
+# -----------------------------
+# Aggregates
+# -----------------------------
+def country_links(join, data, path=REFERENCE_PATH):
+    """The citation links of a `geo.join_citations` result with the country and period of every row."""
+    located = country_of(join["locations"][geo.LAT_COL], join["locations"][geo.LON_COL], path)
+    links = join["links"][["row", "location", "document_id"]]
+    links = pd.concat([links.reset_index(drop=True), located.iloc[links["location"]].reset_index(drop=True)], axis=1)
+    rows = data.loc[links["row"]]
+    links["year"] = rows[DATE_COL].dt.year.astype("Int64").to_numpy() if DATE_COL in data.columns else pd.NA
+    links["quarter"] = rows["quarter"].to_numpy() if "quarter" in data.columns else None
+    # a row naming two institutions of one country counts once for it
+    return links.drop_duplicates(subset=["row", "iso3", "region"])
+
+
+def aggregate_countries(links):
+    """`countries` (mentions and documents per country) and `regions` (the same per EU / Non-EU / Unknown)."""
+    countries = (
+        links.dropna(subset=["iso3"])
+            .groupby(["iso3", "country", "region"])
+            .agg(mentions=("row", "nunique"), documents=("document_id", "nunique"))
+            .reset_index()
+            .sort_values(["mentions", "documents"], ascending=False, ignore_index=True)
+    )
+    regions = (
+        links.groupby("region")
+            .agg(mentions=("row", "nunique"), documents=("document_id", "nunique"))
+            .reindex([EU, NON_EU, UNKNOWN])
+            .dropna()
+            .astype(int)
+            .rename_axis("region")
+            .reset_index()
+    )
+    return {"countries": countries, "regions": regions}
+
+
+def period_aggregates(links):
+    """`aggregate_countries` of every period: {(year, quarter): ...}, None standing for all years / the whole year."""
+    periods = {(None, None): links}
+    for year, by_year in links.dropna(subset=["year"]).groupby("year"):
+        periods[(int(year), None)] = by_year
+        for quarter, by_quarter in by_year.dropna(subset=["quarter"]).groupby("quarter"):
+            periods[(int(year), quarter)] = by_quarter
+    return {
+        period: {name: freeze(frame) for name, frame in aggregate_countries(period_links).items()}
+        for period, period_links in periods.items()
+    }
+
+
+@st.cache_resource
+def _country_join(file_urls, geo_urls, fingerprint):
+    mark_computed()
+    _, _, reference_sha = load_reference()
+
+    def compute():
+        data = get_shared_data(file_urls)
+        links = country_links(geo.citation_join(file_urls, geo_urls), data)
+        return {"links": links, "periods": period_aggregates(links), "rows": len(data)}
+
+    return disk_cache.cached(
+        "countries", (file_urls, geo_urls, fingerprint, reference_sha, _CODE), compute,
+        ttl=disk_cache.ttl_for(fingerprint)
+    )
+
+
+def country_join(file_urls, geo_urls):
+    """The cached country links and period aggregates of a report's citation and map workbooks."""
+    file_urls = [file_urls] if isinstance(file_urls, str) else list(file_urls)
+    geo_urls = [geo_urls] if isinstance(geo_urls, str) else list(geo_urls)
+    return watcher.call(_country_join, file_urls + geo_urls + [REFERENCE_PATH], file_urls, geo_urls)
+
+
+@timed("country_aggregates", kind="loader", cached=True)
+def country_aggregates(file_urls, geo_urls, year=None, quarter=None, view=None):
+    """
+    Mentions and documents per country (`countries`) and per EU / Non-EU
+    (`regions`) of the citations of `file_urls` located on `geo_urls`, for
+    one `year` and `quarter` (None: all). Every period is aggregated once per
+    dataset, so a render is a lookup; `view` (the filtered rows; None while
+    no sidebar filter is set) re-aggregates the cached links instead.
+    """
+    join = country_join(file_urls, geo_urls)
+    links = join["links"]
+    if view is None:
+        aggregates = join["periods"].get((year, quarter))
+        return aggregates if aggregates is not None else aggregate_countries(links.iloc[:0])
+
+    links = links[links["row"].isin(view.index)]
+    if year is not None:
+        links = links[links["year"] == year]
+    if quarter is not None:
+        links = links[links["quarter"] == quarter]
+    return aggregate_countries(links)
+
+
+def periods(file_urls, geo_urls):
+    """The (year, quarter) keys with aggregates, in order."""
+    return sorted(country_join(file_urls, geo_urls)["periods"], key=lambda p: (p[0] or 0, p[1] or ""))
+
+
+# -----------------------------
+# Rendering
+# -----------------------------
+def country_section(file_urls, geo_urls, view=None, key="country_period"):
+    """Period selector (when the data spans several quarters), country choropleth and EU / Non-EU split."""
+    from utils.charts import country_choropleth, region_split_chart
+
+    options = [p for p in periods(file_urls, geo_urls) if p[0] is not None]
+    quarters = [p for p in options if p[1] is not None]
+    period = (None, None)
+    if len(quarters) > 1:
+        period = st.selectbox(
+            "Period", options, key=key,
+            format_func=lambda p: f"{p[1]} {p[0]}" if p[1] else f"Whole {p[0]}",
+        )
+    aggregates = country_aggregates(file_urls, geo_urls, *period, view=view)
+
+    left, right = st.columns([2, 1])
+    with left:
+        st.plotly_chart(country_choropleth(aggregates["countries"]))
+    with right:
+        st.plotly_chart(region_split_chart(aggregates["regions"]))
@@ -1,38 +1,179 @@
+import hashlib
+import os
+import numpy as np
 import pandas as pd
 import streamlit as st
 from io import BytesIO
-import requests
+from utils import artifacts, disk_cache, watcher
+from utils.dedup import assign_document_ids
+from utils.instrumentation import mark_computed, stage, timed
 
 
-# ---------- REGULAR (ANALYTICAL) DATA ----------
-@st.cache_data
-def get_data(file_urls):
-    # accept single URL or list
-    if isinstance(file_urls, str):
-        file_urls = [file_urls]
+# Pages reference workbooks by their raw GitHub URL. With CITATION_DATA_DIR set
+# (e.g. to a checkout of this repo) those URLs are read from disk instead.
+RAW_BASE_URL = "https://github.com/Coyote-Schmoyote/citation-monitoring/raw/refs/heads/main/"
+
 
-    if not isinstance(file_urls, list) or len(file_urls) == 0:
-        raise ValueError("file_urls must be a non-empty list or a single URL.")
+# ---------- READING ----------
+def resolve_source(source):
+    """Local path for a raw GitHub URL when CITATION_DATA_DIR has the file, else `source`."""
+    data_dir = os.environ.get("CITATION_DATA_DIR")
+    if data_dir and str(source).startswith(RAW_BASE_URL):
+        local_path = os.path.join(data_dir, source[len(RAW_BASE_URL):])
+        if os.path.exists(local_path):
+            return local_path
+    return source
 
-    dfs = []
 
-    for url in file_urls:
-        response = requests.get(url)
+def read_workbook(source):
+    """Read one workbook from a URL or a local path."""
+    source = resolve_source(source)
+    if str(source).startswith(("http://", "https://")):
+        import requests
+
+        response = requests.get(source)
         response.raise_for_status()
+        source = BytesIO(response.content)
+    return pd.read_excel(source, engine="openpyxl")
+
+
+def _read_all(sources, arg_name):
+    # accept single URL or list
+    if isinstance(sources, str):
+        sources = [sources]
+
+    if not isinstance(sources, list) or len(sources) == 0:
+        raise ValueError(f"{arg_name} must be a non-empty list or a single URL.")
 
-        file_bytes = BytesIO(response.content)
-        df = pd.read_excel(file_bytes, engine="openpyxl")
-        dfs.append(df)
+    with stage("read_workbooks"):
+        dfs = [read_workbook(source) for source in sources]
+        return pd.concat(dfs, ignore_index=True)
 
-    data = pd.concat(dfs, ignore_index=True)
 
-    # normalize columns
+# ---------- PRECOMPUTED ARTIFACTS ----------
+def _repo_relpath(source):
+    """Path of a workbook relative to the repo root, for raw GitHub URLs and local paths."""
+    source = str(source)
+    if source.startswith(RAW_BASE_URL):
+        return source[len(RAW_BASE_URL):]
+    path = os.path.abspath(source)
+    if path.startswith(artifacts.ROOT + os.sep):
+        return os.path.relpath(path, artifacts.ROOT)
+    return None
+
+
+def load_precomputed(sources, kind):
+    """
+    Normalized data from `python -m scripts.precompute`, or None when any
+    source has no artifact or its workbook / the normalization code changed.
+    """
+    if isinstance(sources, str):
+        sources = [sources]
+    if kind == "citations" and len(sources) != 1:
+        # rare-type grouping and document IDs are computed over the concatenated workbooks
+        return None
+
+    manifest = artifacts.read_manifest()
+    if manifest is None:
+        return None
+    fingerprint = artifacts.code_fingerprint()
+    data_dir = os.environ.get("CITATION_DATA_DIR")
+
+    frames = []
+    for source in sources:
+        relpath = _repo_relpath(source)
+        entry = relpath and artifacts.fresh_entry(relpath, data_dir, manifest, fingerprint)
+        if not entry or entry["kind"] != kind:
+            return None
+        frames.append(artifacts.read_partition(
+            os.path.join(artifacts.ARTIFACTS_DIR, entry["data"]), entry["json_columns"]
+        ))
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def normalize_columns(data):
     data.columns = (
         data.columns
         .str.strip()
         .str.lower()
         .str.replace(" ", "_")
     )
+    return data
+
+
+# ---------- SHARED READ-ONLY FRAMES ----------
+READ_ONLY_MESSAGE = "shared data is read-only: derive a new frame (e.g. with .assign()) instead"
+
+
+class _ReadOnlyIndexer:
+    """`.loc` / `.iloc` / `.at` / `.iat` of a ReadOnlyFrame: reads pass through, writes raise."""
+
+    def __init__(self, indexer):
+        self._indexer = indexer
+
+    def __getitem__(self, key):
+        return self._indexer[key]
+
+    def __call__(self, *args, **kwargs):
+        return _ReadOnlyIndexer(self._indexer(*args, **kwargs))
+
+    def __setitem__(self, key, value):
+        raise TypeError(READ_ONLY_MESSAGE)
+
+
+class ReadOnlyFrame(pd.DataFrame):
+    """
+    A cached frame shared between sessions. Adding, replacing or deleting
+    columns raises; anything derived from it (filters, `assign`, `copy`,
+    groupbys) is an ordinary DataFrame.
+    """
+
+    # pickled with the frame, so copies read back from the disk cache keep their hash
+    _metadata = ["_content_hash"]
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(READ_ONLY_MESSAGE)
+
+    # column assignment and every `inplace=True` method (they end in `_update_inplace`)
+    __setitem__ = __delitem__ = insert = pop = _update_inplace = _read_only
+
+    loc = property(lambda self: _ReadOnlyIndexer(pd.DataFrame.loc.fget(self)))
+    iloc = property(lambda self: _ReadOnlyIndexer(pd.DataFrame.iloc.fget(self)))
+    at = property(lambda self: _ReadOnlyIndexer(pd.DataFrame.at.fget(self)))
+    iat = property(lambda self: _ReadOnlyIndexer(pd.DataFrame.iat.fget(self)))
+
+    def __setattr__(self, name, value):
+        if name in ("columns", "index"):
+            self._read_only()
+        super().__setattr__(name, value)
+
+
+def freeze(data):
+    """Wrap `data` as a ReadOnlyFrame and make its numpy buffers non-writable."""
+    frozen = ReadOnlyFrame(data)
+    for block in frozen._mgr.blocks:
+        values = getattr(block.values, "_ndarray", block.values)  # datetime arrays wrap an ndarray
+        if isinstance(values, np.ndarray):
+            values.flags.writeable = False
+    # the content never changes, so hash it once for st.cache_data keys (see HASH_FUNCS)
+    digest = hashlib.sha1(pd.util.hash_pandas_object(data.astype(str)).to_numpy().tobytes())
+    digest.update(repr(list(data.columns)).encode())
+    object.__setattr__(frozen, "_content_hash", digest.hexdigest())
+    return frozen
+
+
+# Pass as `st.cache_data(hash_funcs=HASH_FUNCS)` to cached functions taking a shared frame
+HASH_FUNCS = {ReadOnlyFrame: lambda frame: frame._content_hash}
+
+
+# ---------- REGULAR (ANALYTICAL) DATA ----------
+def normalize_citation_data(data):
+    """Column names, dates, aggregated output types, short labels and document IDs."""
+    data = normalize_columns(data)
 
     def replace_values_with_other(df, column):
         counts = df[column].value_counts()
@@ -41,16 +182,19 @@ def get_data(file_urls):
 
     if "date_of_publication" in data.columns:
         last_valid_idx = data["date_of_publication"].last_valid_index()
-        
+
         if last_valid_idx is not None:
             data = data.loc[:last_valid_idx]
-            
+
         data["date_of_publication"] = pd.to_datetime(
             data["date_of_publication"],
             format="mixed",
             errors="coerce",
             dayfirst=True
     )
+        # derived once here so pages never add columns to the loaded frame
+        data["month"] = data["date_of_publication"].dt.strftime("%B")
+        data["quarter"] = "Q" + data["date_of_publication"].dt.quarter.astype("Int64").astype("string")
 
 
     if "url_of_the_document_citing_eige" in data.columns:
@@ -71,38 +215,61 @@ def get_data(file_urls):
             lambda x: x[:16] + "..." if isinstance(x, str) and len(x) > 15 else x
         )
 
+    # stable ID shared by near-duplicate titles, used for unique document counts
+    with stage("assign_document_ids"):
+        data["document_id"] = assign_document_ids(data)
+
     return data
 
 
-# ---------- GEOSPATIAL DATA ----------
+def _load_citation_data(file_urls):
+    with stage("load_precomputed"):
+        data = load_precomputed(file_urls, "citations")
+    if data is not None:
+        return data
+    data = _read_all(file_urls, "file_urls")
+    with stage("normalize_citation_data"):
+        return normalize_citation_data(data)
+
+
+# The cached loaders take the content hash of their workbooks (see utils.watcher),
+# so an updated workbook gets a new entry and only its old entries are cleared.
+def _stored_citation_data(file_urls, fingerprint):
+    """`_load_citation_data` through the on-disk tier shared by the app processes."""
+    return disk_cache.cached(
+        "citations", (file_urls, fingerprint, artifacts.code_fingerprint()),
+        lambda: _load_citation_data(file_urls), ttl=disk_cache.ttl_for(fingerprint)
+    )
+
+
 @st.cache_data
-def load_geospatial_data(geo_urls):
-    # accept single URL or list
-    if isinstance(geo_urls, str):
-        geo_urls = [geo_urls]
+def _cached_data(file_urls, fingerprint):
+    mark_computed()
+    return _stored_citation_data(file_urls, fingerprint)
 
-    if not isinstance(geo_urls, list) or len(geo_urls) == 0:
-        raise ValueError("geo_urls must be a non-empty list or a single URL.")
 
-    dfs = []
+@st.cache_resource
+def _shared_data(file_urls, fingerprint):
+    mark_computed()
+    return freeze(_stored_citation_data(file_urls, fingerprint))
 
-    for url in geo_urls:
-        response = requests.get(url)
-        response.raise_for_status()
 
-        file_bytes = BytesIO(response.content)
-        df = pd.read_excel(file_bytes, engine="openpyxl")
-        dfs.append(df)
+@timed("get_data", kind="loader", cached=True)
+def get_data(file_urls):
+    disk_cache.lookup("citations")
+    return watcher.call(_cached_data, file_urls, file_urls)
 
-    data = pd.concat(dfs, ignore_index=True)
 
-    # normalize columns
-    data.columns = (
-        data.columns
-        .str.strip()
-        .str.lower()
-        .str.replace(" ", "_")
-    )
+@timed("get_shared_data", kind="loader", cached=True)
+def get_shared_data(file_urls):
+    """Like `get_data`, but one read-only frame per dataset shared by every session and rerun."""
+    disk_cache.lookup("citations")
+    return watcher.call(_shared_data, file_urls, file_urls)
+
+
+# ---------- GEOSPATIAL DATA ----------
+def normalize_geospatial_data(data):
+    data = normalize_columns(data)
 
     if not {"latitude", "longitude"}.issubset(data.columns):
         raise ValueError("Latitude and longitude columns not found.")
@@ -110,3 +277,44 @@ def load_geospatial_data(geo_urls):
     data = data.dropna(subset=["latitude", "longitude"])
 
     return data
+
+
+def _load_geospatial_data(geo_urls):
+    with stage("load_precomputed"):
+        data = load_precomputed(geo_urls, "geo")
+    if data is not None:
+        return data
+    data = _read_all(geo_urls, "geo_urls")
+    return normalize_geospatial_data(data)
+
+
+def _stored_geospatial_data(geo_urls, fingerprint):
+    return disk_cache.cached(
+        "geo", (geo_urls, fingerprint, artifacts.code_fingerprint()),
+        lambda: _load_geospatial_data(geo_urls), ttl=disk_cache.ttl_for(fingerprint)
+    )
+
+
+@st.cache_data
+def _cached_geospatial_data(geo_urls, fingerprint):
+    mark_computed()
+    return _stored_geospatial_data(geo_urls, fingerprint)
+
+
+@st.cache_resource
+def _shared_geospatial_data(geo_urls, fingerprint):
+    mark_computed()
+    return freeze(_stored_geospatial_data(geo_urls, fingerprint))
+
+
+@timed("load_geospatial_data", kind="loader", cached=True)
+def load_geospatial_data(geo_urls):
+    disk_cache.lookup("geo")
+    return watcher.call(_cached_geospatial_data, geo_urls, geo_urls)
+
+
+@timed("load_shared_geospatial_data", kind="loader", cached=True)
+def load_shared_geospatial_data(geo_urls):
+    """Like `load_geospatial_data`, but one read-only frame shared by every session."""
+    disk_cache.lookup("geo")
+    return watcher.call(_shared_geospatial_data, geo_urls, geo_urls)
@@ -0,0 +1,167 @@
+import hashlib
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+import pandas as pd
+
+DOC_COL = "name_of_the_document_citing_eige"
+AUTHOR_COL = "name_of_the_author/organisation_citing_eige"
+DATE_COL = "date_of_publication"
+
+# 128 permutations split into 16 bands of 8 rows: pairs with a Jaccard
+# similarity above ~0.7 almost always share at least one band.
+NUM_PERM = 128
+BANDS = 16
+THRESHOLD = 0.8
+SHINGLE_SIZE = 5
+
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+
+
+# -----------------------------
+# Normalization
+# -----------------------------
+def normalize_title(title):
+    if not isinstance(title, str):
+        return ""
+    title = unicodedata.normalize("NFKD", title)
+    title = "".join(c for c in title if not unicodedata.combining(c))
+    title = re.sub(r"[^a-z0-9]+", " ", title.lower())
+    return " ".join(title.split())
+
+
+def normalize_authors(authors):
+    """Sorted set of lower-cased author surnames (longest token of each name)."""
+    if not isinstance(authors, str):
+        return ()
+    surnames = set()
+    for name in re.split(r"[,;]| and ", authors):
+        tokens = normalize_title(name).split()
+        tokens = [t for t in tokens if len(t) > 1]
+        if tokens:
+            surnames.add(max(tokens, key=len))
+    return tuple(sorted(surnames))
+
+
+def _shingles(title, authors):
+    padded = f" {title} "
+    grams = {padded[i:i + SHINGLE_SIZE] for i in range(max(len(padded) - SHINGLE_SIZE + 1, 1))}
+    grams.update(f"a:{a}" for a in authors)
+    return grams
+
+
+# -----------------------------
+# MinHash / LSH
+# -----------------------------
+def minhash_signature(shingles):
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+    )
+    if hashes.size == 0:
+        return np.full(NUM_PERM, _PRIME, dtype=np.uint64)
+    # (a * h + b) mod p for every permutation at once, then the column minimum
+    return ((np.outer(hashes, _PERM_A) + _PERM_B) % _PRIME).min(axis=0)
+
+
+def lsh_candidate_pairs(signatures, bands=BANDS):
+    """Pairs of row positions that collide in at least one LSH band."""
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    pairs = set()
+    for b in range(bands):
+        band = signatures[:, b * rows:(b + 1) * rows]
+        buckets = {}
+        for i, key in enumerate(map(bytes, band)):
+            buckets.setdefault(key, []).append(i)
+        for members in buckets.values():
+            if len(members) > 1:
+                first = members[0]
+                pairs.update((first, other) for other in members[1:])
+    return pairs
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_near_duplicates(titles, authors, threshold=THRESHOLD):
+    """
+    Cluster (title, authors) keys whose shingle sets have a Jaccard similarity
+    of at least `threshold`. Returns one cluster label per key.
+    """
+    shingle_sets = [_shingles(t, a) for t, a in zip(titles, authors)]
+    if not shingle_sets:
+        return np.array([], dtype=int)
+
+    signatures = np.vstack([minhash_signature(s) for s in shingle_sets])
+    parent = list(range(len(shingle_sets)))
+
+    # identical normalized titles always describe the same document
+    first_by_title = {}
+    for i, title in enumerate(titles):
+        if title:
+            j = first_by_title.setdefault(title, i)
+            if j != i:
+                parent[_find(parent, i)] = _find(parent, j)
+
+    for i, j in lsh_candidate_pairs(signatures):
+        ri, rj = _find(parent, i), _find(parent, j)
+        if ri == rj:
+            continue
+        a, b = shingle_sets[i], shingle_sets[j]
+        if len(a & b) / len(a | b) >= threshold:
+            parent[ri] = rj
+
+    return np.array([_find(parent, i) for i in range(len(parent))])
+
+
+# -----------------------------
+# Stable document IDs
+# -----------------------------
+def assign_document_ids(data, doc_col=DOC_COL, author_col=AUTHOR_COL, date_col=DATE_COL):
+    """
+    Return a `document_id` Series for `data`.
+
+    Near-duplicate titles (and repeated rows of the same citation) share one ID.
+    The ID is a hash of the normalized title of each cluster's earliest published
+    member (the first-seen row among equal dates) rather than a row position, so
+    an article keeps its ID across quarterly and annual workbooks and when later
+    near-duplicates join its cluster.
+    """
+    if doc_col not in data.columns:
+        return pd.Series(pd.NA, index=data.index, dtype="object", name="document_id")
+
+    titles = data[doc_col].map(normalize_title)
+    if author_col in data.columns:
+        authors = data[author_col].map(normalize_authors)
+    else:
+        authors = pd.Series([()] * len(data), index=data.index)
+    if date_col in data.columns:
+        dates = pd.to_datetime(data[date_col], errors="coerce")
+    else:
+        dates = pd.Series(pd.NaT, index=data.index)
+
+    keys = pd.DataFrame({"title": titles, "authors": authors})
+    unique_keys = keys.drop_duplicates().reset_index(drop=True)
+    labels = cluster_near_duplicates(unique_keys["title"].tolist(), unique_keys["authors"].tolist())
+
+    unique_keys["cluster"] = labels
+    first_dates = keys.assign(date=dates).groupby(["title", "authors"], sort=False)["date"].min()
+    unique_keys["date"] = first_dates.reindex(pd.MultiIndex.from_frame(unique_keys[["title", "authors"]])).to_numpy()
+    members = unique_keys[unique_keys["title"] != ""].sort_values("date", kind="stable", na_position="last")
+    canonical = members.groupby("cluster")["title"].first()
+    unique_keys["document_id"] = unique_keys["cluster"].map(
+        lambda c: hashlib.sha1(canonical[c].encode("utf-8")).hexdigest()[:12] if c in canonical.index else pd.NA
+    )
+
+    ids = keys.merge(unique_keys[["title", "authors", "document_id"]], on=["title", "authors"], how="left")["document_id"]
+    ids.index = data.index
+    return ids.rename("document_id")
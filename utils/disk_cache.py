@@ -0,0 +1,265 @@
+import collections
+import contextlib
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+import time
+
+import pandas as pd
+
+from utils import artifacts
+
+try:
+    import fcntl
+except ImportError:  # not on POSIX: entries are still written atomically, just not deduplicated
+    fcntl = None
+
+# On-disk tier below st.cache_data / st.cache_resource, shared by every app process on the host
+CACHE_DIR = os.environ.get("CITATION_CACHE_DIR", os.path.join(artifacts.ROOT, "build", "cache"))
+ENABLED = os.environ.get("CITATION_CACHE", "1") != "0"
+MAX_BYTES = int(float(os.environ.get("CITATION_CACHE_MAX_MB", "512")) * 2**20)
+# The LRU sweep walks the whole directory: run it once this much has been written (and on a process's first write)
+EVICT_EVERY_BYTES = max(MAX_BYTES // 16, 1)
+# Figures kept parsed in memory per process, in front of their JSON on disk
+FIGURE_MEMORY_ENTRIES = int(os.environ.get("CITATION_FIGURE_MEMORY_ENTRIES", "256"))
+
+# Entries of workbooks that are only reachable over HTTP cannot be content-keyed: expire them
+REMOTE_TTL = float(os.environ.get("CITATION_CACHE_TTL", "3600"))
+
+# Modules the figure builders call into (e.g. radar_chart ranks by weights.compute);
+# a change to any of them invalidates the stored figures like a change to the builder's own
+FIGURE_MODULES = ["utils/weights.py", "utils/aggregates.py"]
+
+_stats_lock = threading.Lock()
+_stats = {}  # namespace -> counters
+_written_lock = threading.Lock()
+_written = EVICT_EVERY_BYTES  # bytes stored since the last sweep
+_figures_lock = threading.Lock()
+_figures = collections.OrderedDict()  # entry key -> figure, least recently used first
+
+
+# -----------------------------
+# Stats
+# -----------------------------
+def _count(namespace, counter):
+    with _stats_lock:
+        counters = _stats.setdefault(namespace, dict.fromkeys(
+            ("memory_lookups", "disk_hits", "disk_misses"), 0
+        ))
+        counters[counter] += 1
+
+
+def lookup(namespace):
+    """Count a lookup of the in-memory tier; every `cached` call of `namespace` is one of its misses."""
+    _count(namespace, "memory_lookups")
+
+
+def _ratio(hits, total):
+    return round(hits / total, 3) if total else None
+
+
+def stats():
+    """Hits, misses and hit ratio per namespace and tier (in this process)."""
+    with _stats_lock:
+        snapshot = {namespace: dict(counters) for namespace, counters in _stats.items()}
+    report = {}
+    for namespace, c in sorted(snapshot.items()):
+        disk_lookups = c["disk_hits"] + c["disk_misses"]
+        tiers = {"disk": {
+            "hits": c["disk_hits"], "misses": c["disk_misses"], "hit_ratio": _ratio(c["disk_hits"], disk_lookups),
+        }}
+        if c["memory_lookups"]:
+            memory_hits = max(c["memory_lookups"] - disk_lookups, 0)
+            tiers["memory"] = {
+                "hits": memory_hits, "misses": disk_lookups, "hit_ratio": _ratio(memory_hits, c["memory_lookups"]),
+            }
+        report[namespace] = tiers
+    return report
+
+
+# -----------------------------
+# Entries
+# -----------------------------
+def entry_key(namespace, parts):
+    return hashlib.sha256(repr((namespace, parts)).encode()).hexdigest()
+
+
+def _entry_path(namespace, key):
+    return os.path.join(CACHE_DIR, namespace, key + ".pkl")
+
+
+@contextlib.contextmanager
+def _locked(path):
+    """Exclusive lock on the file `path`, shared by every process using CACHE_DIR (none on a read-only disk)."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        f = open(path, "a")
+    except OSError:
+        f = None
+    if fcntl is None or f is None:
+        yield
+        return
+    with f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read(path, ttl):
+    """(True, value) for a live entry, else (False, None). A hit refreshes the entry's LRU time (mtime)."""
+    try:
+        with open(path, "rb") as f:
+            created, value = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return False, None
+    if ttl is not None and time.time() - created > ttl:
+        return False, None
+    with contextlib.suppress(OSError):
+        os.utime(path)
+    return True, value
+
+
+def _write(path, value):
+    """Store an entry; False when the disk is read-only or full."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump((time.time(), value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)  # readers never see a half-written entry
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        return False
+    return True
+
+
+def evict(max_bytes=None):
+    """Delete least recently used entries until the cache fits in `max_bytes`; returns how many."""
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    with _locked(os.path.join(CACHE_DIR, "locks", "evict.lock")):
+        entries = []
+        for root, _, files in os.walk(CACHE_DIR):
+            for name in files:
+                if name.endswith(".pkl"):
+                    with contextlib.suppress(OSError):
+                        stat = os.stat(os.path.join(root, name))
+                        entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            with contextlib.suppress(OSError):
+                os.remove(path)
+                removed += 1
+            with contextlib.suppress(OSError):
+                os.remove(path + ".lock")
+            total -= size
+    return removed
+
+
+def _should_evict(size):
+    """Count `size` stored bytes; True (and the counter reset) once EVICT_EVERY_BYTES were written."""
+    global _written
+    with _written_lock:
+        _written += size
+        if _written < EVICT_EVERY_BYTES:
+            return False
+        _written = 0
+        return True
+
+
+def cached(namespace, parts, compute, ttl=None):
+    """
+    `compute()` through the disk tier: the entry keyed by `parts` (any repr-stable
+    value) if one is live, else computed once across processes and stored.
+    """
+    if not ENABLED:
+        _count(namespace, "disk_misses")
+        return compute()
+    key = entry_key(namespace, parts)
+    path = _entry_path(namespace, key)
+    hit, value = _read(path, ttl)
+    if hit:
+        _count(namespace, "disk_hits")
+        return value
+
+    # one lock per entry: compute() may call `cached` for other entries (the
+    # comparisons read the loaders' entries), which a shared lock would deadlock
+    with _locked(path + ".lock"):
+        # another process or thread may have stored it while we waited for the lock
+        hit, value = _read(path, ttl)
+        if hit:
+            _count(namespace, "disk_hits")
+            return value
+        value = compute()
+        _count(namespace, "disk_misses")
+        stored = _write(path, value)
+    if stored and _should_evict(os.path.getsize(path) if os.path.exists(path) else 0):
+        evict()
+    return value
+
+
+def ttl_for(fingerprint):
+    """No expiry for content-keyed entries; REMOTE_TTL when a source has no local file to hash."""
+    return REMOTE_TTL if any(digest is None for digest in fingerprint) else None
+
+
+# -----------------------------
+# Figures
+# -----------------------------
+def content_key(value):
+    """Repr-stable cache key part for an argument; frames are keyed by their content."""
+    if isinstance(value, pd.DataFrame):
+        content_hash = getattr(value, "_content_hash", None)
+        if content_hash is not None:
+            return content_hash
+        try:
+            hashed = pd.util.hash_pandas_object(value)
+        except TypeError:  # unhashable cells (lists, dicts)
+            hashed = pd.util.hash_pandas_object(value.astype(str))
+        return (hashlib.sha1(hashed.to_numpy().tobytes()).hexdigest(), tuple(map(str, value.columns)))
+    if isinstance(value, pd.Series):
+        return content_key(value.to_frame())
+    return repr(value)
+
+
+def figure(func):
+    """
+    Cache a plotly figure builder in the disk tier, keyed by its arguments
+    (frames by content), its module's source and FIGURE_MODULES; figures
+    are stored as JSON. The last FIGURE_MEMORY_ENTRIES figures stay parsed
+    in memory and are shared by every caller, so do not modify them.
+    """
+    import plotly.io as pio
+
+    signature = inspect.signature(func)
+    code = (artifacts.file_sha256(inspect.getsourcefile(func)), artifacts.modules_fingerprint(FIGURE_MODULES))
+    namespace = "figure"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not ENABLED:
+            return func(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        parts = (func.__qualname__, code, tuple((k, content_key(v)) for k, v in bound.arguments.items()))
+        key = entry_key(namespace, parts)
+        lookup(namespace)
+        with _figures_lock:
+            if key in _figures:
+                _figures.move_to_end(key)
+                return _figures[key]
+        fig = pio.from_json(cached(namespace, parts, lambda: pio.to_json(func(*args, **kwargs))))
+        with _figures_lock:
+            _figures[key] = fig
+            while len(_figures) > FIGURE_MEMORY_ENTRIES:
+                _figures.popitem(last=False)
+        return fig
+    return wrapper
@@ -0,0 +1,148 @@
+import datetime
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import artifacts
+from utils.data_loader import HASH_FUNCS
+from utils.instrumentation import mark_computed, timed
+
+MIME_TYPES = {
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".csv": "text/csv",
+    ".parquet": "application/vnd.apache.parquet",
+}
+EXPORT_FORMATS = {"CSV": ".csv", "Parquet": ".parquet", "Excel": ".xlsx"}
+
+
+# -----------------------------
+# Report files
+# -----------------------------
+def repo_path(relpath):
+    return relpath if os.path.isabs(relpath) else os.path.join(artifacts.ROOT, relpath)
+
+
+@st.cache_resource(max_entries=8)
+def _file_bytes(path, mtime_ns, size):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def file_payload(path):
+    """
+    `st.download_button` data for a file: read when the button is clicked,
+    then kept in memory (shared by every session) until the file changes.
+    """
+    def read():
+        stat = os.stat(path)
+        return _file_bytes(path, stat.st_mtime_ns, stat.st_size)
+    return read
+
+
+def file_button(label, relpath, file_name=None, **kwargs):
+    """Download button for a repo file; disabled when the file is not in this checkout."""
+    path = repo_path(relpath)
+    file_name = file_name or os.path.basename(relpath)
+    if not os.path.exists(path):
+        return st.download_button(
+            label, data=b"", file_name=file_name, disabled=True,
+            help=f"{os.path.basename(relpath)} is not available.", **kwargs
+        )
+    return st.download_button(
+        label, data=file_payload(path), file_name=file_name,
+        mime=MIME_TYPES.get(os.path.splitext(file_name)[1].lower()), on_click="ignore", **kwargs
+    )
+
+
+def report_button(label, report_id, view=None, file_name=None, **kwargs):
+    """
+    Download button for the Word report generated from `view` (the filtered
+    rows; None for all of `report_id`'s data); built only when clicked.
+    """
+    from utils.word_report import report_docx
+
+    # images are rendered in this process: no process pool forked from the threaded server
+    return st.download_button(
+        label, data=lambda: report_docx(report_id, workers=1, data=view),
+        file_name=file_name or f"{report_id}_generated_report.docx",
+        mime=MIME_TYPES[".docx"], on_click="ignore", key=f"report_{report_id}", **kwargs
+    )
+
+
+# -----------------------------
+# Data exports
+# -----------------------------
+def to_csv(data):
+    # BOM so Excel opens accented names correctly
+    return data.to_csv(index=False).encode("utf-8-sig")
+
+
+def to_parquet(data):
+    """Parquet bytes; hand-typed mixed columns ("2", 2, "1 X user") are stored as text."""
+    data = data.copy(deep=False)
+    for c in artifacts._mixed_columns(data):
+        data[c] = data[c].map(lambda v: None if pd.isna(v) else str(v))
+    buffer = io.BytesIO()
+    data.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+def _cell(value):
+    if value is None or value is pd.NaT or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.tz_localize(None).to_pydatetime() if value.tzinfo else value.to_pydatetime()
+    if isinstance(value, (str, int, float, bool, datetime.datetime, datetime.date)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def to_xlsx(data, sheet_name="data"):
+    """
+    Excel bytes written row by row in xlsxwriter's constant-memory mode, so
+    the workbook never holds more than one row of cells.
+    """
+    import xlsxwriter
+
+    buffer = io.BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, {
+        "constant_memory": True, "nan_inf_to_errors": True, "remove_timezone": True,
+        "default_date_format": "yyyy-mm-dd",
+    })
+    sheet = workbook.add_worksheet(sheet_name)
+    header = workbook.add_format({"bold": True})
+    sheet.write_row(0, 0, [str(c) for c in data.columns], header)
+    for i, row in enumerate(data.itertuples(index=False, name=None), start=1):
+        sheet.write_row(i, 0, [_cell(v) for v in row])
+    sheet.freeze_panes(1, 0)
+    workbook.close()
+    return buffer.getvalue()
+
+
+WRITERS = {".csv": to_csv, ".parquet": to_parquet, ".xlsx": to_xlsx}
+
+
+@timed("export", kind="builder", cached=True)
+@st.cache_data(hash_funcs=HASH_FUNCS, max_entries=16, show_spinner=False)
+def export(data, extension):
+    """`data` as CSV, Parquet or Excel bytes (by file extension), built once per view and format."""
+    mark_computed()
+    return WRITERS[extension](data)
+
+
+def export_buttons(data, name, key="export"):
+    """One download button per export format of `data` (e.g. the filtered view); built only when clicked."""
+    columns = st.columns(len(EXPORT_FORMATS))
+    for column, (label, extension) in zip(columns, EXPORT_FORMATS.items()):
+        with column:
+            st.download_button(
+                f"Export {label}", data=lambda extension=extension: export(data, extension),
+                file_name=f"{name}{extension}", mime=MIME_TYPES[extension], on_click="ignore",
+                key=f"{key}_{extension[1:]}",
+            )
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.instrumentation import finish_page, stage
+from utils.network import institution_column
+
+DATE_COL = "date_of_publication"
+TYPE_COL = "type_of_eige's_output_cited_agg"
+JOURNAL_COL = "name_of_the_journal_citing_eige"
+
+
+# -----------------------------
+# Index
+# -----------------------------
+def _positions_by_value(values):
+    """{value: sorted int32 row positions} for a Series indexed by row position."""
+    values = values.dropna().astype(str).str.strip()
+    values = values[values != ""]
+    groups = pd.Series(values.index.to_numpy(np.int32)).groupby(values.to_numpy(), sort=True)
+    return {value: np.unique(rows.to_numpy()) for value, rows in groups}
+
+
+def _institution_positions(series):
+    # cells list several institutions: index every one of them
+    parts = series.reset_index(drop=True).dropna().astype(str).str.split(r"[,;]", regex=True).explode()
+    return _positions_by_value(parts)
+
+
+def build_index(data):
+    """
+    Row positions of `data` per filter value, plus the rows in date order.
+    Filtering then intersects small sorted arrays instead of scanning the frame.
+    """
+    dates = data[DATE_COL].to_numpy() if DATE_COL in data.columns else np.array([], dtype="datetime64[ns]")
+    valid = np.flatnonzero(~pd.isna(dates))
+    order = valid[np.argsort(dates[valid], kind="stable")].astype(np.int32)
+
+    columns = {}
+    if TYPE_COL in data.columns:
+        columns["Output type"] = _positions_by_value(data[TYPE_COL].reset_index(drop=True))
+    if JOURNAL_COL in data.columns:
+        columns["Journal"] = _positions_by_value(data[JOURNAL_COL].reset_index(drop=True))
+    institution_col = institution_column(data)
+    if institution_col:
+        columns["Institution"] = _institution_positions(data[institution_col])
+
+    return {
+        "rows": len(data),
+        "date_order": order,
+        "sorted_dates": dates[order],
+        "columns": columns,
+    }
+
+
+@st.cache_resource(max_entries=32)
+def cached_index(key, _data):
+    """`build_index` shared across sessions; `key` identifies the loaded data."""
+    with stage("build_filter_index"):
+        return build_index(_data)
+
+
+def data_key(data, sources):
+    """Cache key of a loaded frame: its sources plus a hash of its content (of its document IDs for unshared frames)."""
+    if isinstance(sources, str):
+        sources = [sources]
+    fingerprint = getattr(data, "_content_hash", None)
+    if fingerprint is None and "document_id" in data.columns:
+        fingerprint = int(pd.util.hash_pandas_object(data["document_id"], index=False).sum())
+    return (tuple(sources), len(data), fingerprint)
+
+
+# -----------------------------
+# Filtering
+# -----------------------------
+def date_positions(index, start=None, end=None):
+    """Sorted row positions with `start <= date <= end` (binary search over the date order)."""
+    sorted_dates = index["sorted_dates"]
+    lo = 0 if start is None else np.searchsorted(sorted_dates, np.datetime64(pd.Timestamp(start)), side="left")
+    hi = len(sorted_dates) if end is None else np.searchsorted(
+        sorted_dates, np.datetime64(pd.Timestamp(end) + pd.Timedelta(days=1)), side="left"
+    )
+    return np.sort(index["date_order"][lo:hi])
+
+
+def filter_positions(index, date_range=None, selections=None):
+    """Row positions matching the date range and, per column, any of the selected values."""
+    positions = None
+    if date_range:
+        positions = date_positions(index, *date_range)
+    for column, values in (selections or {}).items():
+        if not values:
+            continue
+        lookup = index["columns"][column]
+        matches = np.unique(np.concatenate([lookup.get(v, np.array([], dtype=np.int32)) for v in values]))
+        positions = matches if positions is None else np.intersect1d(positions, matches, assume_unique=True)
+    if positions is None:
+        return np.arange(index["rows"], dtype=np.int32)
+    return positions
+
+
+# -----------------------------
+# Sidebar
+# -----------------------------
+def sidebar_filters(data, sources):
+    """
+    Date range, output type, journal and institution filters in the sidebar.
+    Returns `(view, filtered)`; `view` is `data` itself while no filter is set.
+    """
+    index = cached_index(data_key(data, sources), data)
+    key = "filters:" + "|".join(sorted(sources if not isinstance(sources, str) else [sources]))
+
+    st.sidebar.subheader("Filters")
+    date_range = None
+    if len(index["sorted_dates"]):
+        first = pd.Timestamp(index["sorted_dates"][0]).date()
+        last = pd.Timestamp(index["sorted_dates"][-1]).date()
+        picked = st.sidebar.date_input(
+            "Date of publication", value=(first, last), min_value=first, max_value=last, key=key + ":dates"
+        )
+        # a single date while the range is still being picked
+        if isinstance(picked, (tuple, list)) and len(picked) == 2 and tuple(picked) != (first, last):
+            date_range = tuple(picked)
+
+    selections = {
+        column: st.sidebar.multiselect(column, list(lookup), key=f"{key}:{column}")
+        for column, lookup in index["columns"].items()
+    }
+
+    if date_range is None and not any(selections.values()):
+        return data, False
+
+    positions = filter_positions(index, date_range, selections)
+    if positions.size == 0:
+        st.warning("No citations match the selected filters.")
+        finish_page()
+        st.stop()
+    return data.iloc[positions], True
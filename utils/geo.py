@@ -0,0 +1,278 @@
+import math
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import artifacts, disk_cache, watcher, weights
+from utils.data_loader import HASH_FUNCS, freeze, get_shared_data, load_shared_geospatial_data
+from utils.instrumentation import mark_computed, timed
+from utils.network import institution_column
+
+LAT_COL = "latitude"
+LON_COL = "longitude"
+LOCATION_COL = "location"
+
+# Map detail levels: hexagon radius (grid: half the cell side) in km at the equator
+RESOLUTIONS = {
+    "Continent": 600,
+    "Country": 150,
+    "Region": 40,
+    "City": 8,
+}
+# The default detail is the finest with at most this many cells
+MAX_CELLS = 500
+
+# Stored joins are rebuilt when this module or the weight engine changes
+_CODE = artifacts.modules_fingerprint(["utils/geo.py", "utils/weights.py"])
+
+EARTH_RADIUS_M = 6_378_137.0
+MAX_LATITUDE = 85.0511  # Web Mercator limit
+
+
+# -----------------------------
+# Projection
+# -----------------------------
+def to_mercator(lat, lon):
+    """Web Mercator metres of arrays of latitudes / longitudes."""
+    lat = np.clip(np.asarray(lat, dtype=float), -MAX_LATITUDE, MAX_LATITUDE)
+    x = EARTH_RADIUS_M * np.radians(np.asarray(lon, dtype=float))
+    y = EARTH_RADIUS_M * np.log(np.tan(np.pi / 4 + np.radians(lat) / 2))
+    return x, y
+
+
+def from_mercator(x, y):
+    lon = np.degrees(np.asarray(x) / EARTH_RADIUS_M)
+    lat = np.degrees(2 * np.arctan(np.exp(np.asarray(y) / EARTH_RADIUS_M)) - np.pi / 2)
+    return lat, lon
+
+
+# -----------------------------
+# Binning
+# -----------------------------
+def hex_cells(x, y, radius):
+    """Axial (q, r) coordinates of the pointy-top hexagons of circumradius `radius` containing each point."""
+    q = (math.sqrt(3) / 3 * x - y / 3) / radius
+    r = (2 / 3 * y) / radius
+    # cube rounding: round all three coordinates, then fix the one that moved most
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+def hex_centres(q, r, radius):
+    return radius * math.sqrt(3) * (q + r / 2), radius * 1.5 * r
+
+
+def bin_points(geo, resolution, kind="hex", weights=None):
+    """
+    Points of `geo` per hexagon (`kind="hex"`) or square (`kind="grid"`) at
+    `resolution` (a RESOLUTIONS key): cell centre, number of points and, with
+    a `weights` column, its sum. One row per non-empty cell.
+    """
+    radius = RESOLUTIONS[resolution] * 1000
+    columns = [LAT_COL, LON_COL] + ([weights] if weights else [])
+    geo = geo[columns].dropna(subset=[LAT_COL, LON_COL])
+    x, y = to_mercator(geo[LAT_COL].to_numpy(), geo[LON_COL].to_numpy())
+
+    if kind == "hex":
+        q, r = hex_cells(x, y, radius)
+    else:
+        q, r = np.floor(x / (2 * radius)).astype(np.int64), np.floor(y / (2 * radius)).astype(np.int64)
+
+    cells = pd.DataFrame({"q": q, "r": r, "points": 1})
+    if weights:
+        cells["weight"] = pd.to_numeric(geo[weights], errors="coerce").fillna(0).to_numpy()
+    cells = cells.groupby(["q", "r"], sort=True).sum().reset_index()
+
+    if kind == "hex":
+        cx, cy = hex_centres(cells["q"].to_numpy(), cells["r"].to_numpy(), radius)
+    else:
+        cx, cy = (cells["q"].to_numpy() + 0.5) * 2 * radius, (cells["r"].to_numpy() + 0.5) * 2 * radius
+    cells[LAT_COL], cells[LON_COL] = from_mercator(cx, cy)
+    return cells.drop(columns=["q", "r"])
+
+
+@timed("map_bins", kind="builder", cached=True)
+@st.cache_data(hash_funcs=HASH_FUNCS, max_entries=32)
+def map_bins(geo, kind="hex", weights=None):
+    """`bin_points` at every resolution, computed once per dataset: {resolution: cells}."""
+    mark_computed()
+    return disk_cache.cached(
+        "map_bins", (disk_cache.content_key(geo), kind, weights, RESOLUTIONS),
+        lambda: {resolution: bin_points(geo, resolution, kind, weights) for resolution in RESOLUTIONS}
+    )
+
+
+def default_resolution(bins, max_cells=MAX_CELLS):
+    """The finest resolution with at most `max_cells` cells."""
+    fitting = [resolution for resolution, cells in bins.items() if len(cells) <= max_cells]
+    return fitting[-1] if fitting else next(iter(bins))
+
+
+# -----------------------------
+# Citation points
+# -----------------------------
+def normalize_name(name):
+    """Institution name as a join key: lowercase, no accents, punctuation or extra spaces."""
+    if not isinstance(name, str):
+        return ""
+    name = unicodedata.normalize("NFKD", name.lower())
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w]+", " ", name).split())
+
+
+def location_index(geo):
+    """
+    One row per distinct coordinate (`location` joins the names found there)
+    and the normalized-name -> location lookup.
+    """
+    geo = geo.dropna(subset=[LAT_COL, LON_COL])
+    coords = geo[[LAT_COL, LON_COL]].round(6)
+    location_ids, uniques = pd.MultiIndex.from_frame(coords).factorize()
+    names = geo[LOCATION_COL].astype(str).str.strip() if LOCATION_COL in geo.columns else pd.Series("", index=geo.index)
+    locations = pd.DataFrame({
+        LOCATION_COL: names.groupby(location_ids).agg(lambda n: "; ".join(dict.fromkeys(n))).to_numpy(),
+        LAT_COL: uniques.get_level_values(0).to_numpy(),
+        LON_COL: uniques.get_level_values(1).to_numpy(),
+    })
+    # a name listed at two coordinates keeps the first
+    lookup = pd.Series(location_ids, index=names.map(normalize_name).to_numpy())
+    lookup = lookup[(lookup.index != "") & ~lookup.index.duplicated()]
+    return locations, lookup
+
+
+def citation_links(data, lookup):
+    """(row, location, document_id, weight) for every citation row naming an institution found on the map."""
+    col = institution_column(data)
+    if col is None:
+        return pd.DataFrame(columns=["row", "location", "document_id", "weight"])
+    names = data[col].dropna().astype(str).str.split(r"[,;]", regex=True).explode()
+    keys = names.map(normalize_name)
+    matched = keys[keys.isin(lookup.index)]
+    links = pd.DataFrame({
+        "row": matched.index.to_numpy(),
+        "location": lookup.loc[matched.to_numpy()].to_numpy(),
+    }).drop_duplicates()  # one row naming two institutions at the same place counts once
+    rows = data.loc[links["row"]]
+    links["document_id"] = rows["document_id"].to_numpy() if "document_id" in data.columns else links["row"]
+    # the computed impact weight (utils.weights), as on the Top-5 tables and radar charts
+    links["weight"] = weights.compute(data).loc[links["row"]].to_numpy()
+    return links
+
+
+def aggregate_points(links, locations):
+    """Mentions, documents and mean impact weight per location; unmatched locations get zero mentions."""
+    per_location = links.groupby("location").agg(
+        mentions=("row", "size"),
+        documents=("document_id", "nunique"),
+        mean_weight=("weight", "mean"),
+    )
+    points = locations.join(per_location)
+    points[["mentions", "documents"]] = points[["mentions", "documents"]].fillna(0).astype(int)
+    return points
+
+
+def join_citations(data, geo):
+    """Weighted point set of `geo` by the citations in `data`, plus the row links to re-aggregate filtered views."""
+    locations, lookup = location_index(geo)
+    links = citation_links(data, lookup)
+    return {
+        "points": freeze(aggregate_points(links, locations)),
+        "links": links,
+        "locations": locations,
+        "rows": len(data),
+    }
+
+
+@st.cache_resource
+def _citation_join(file_urls, geo_urls, fingerprint):
+    mark_computed()
+    return disk_cache.cached(
+        "citation_points", (file_urls, geo_urls, fingerprint, _CODE),
+        lambda: join_citations(get_shared_data(file_urls), load_shared_geospatial_data(geo_urls)),
+        ttl=disk_cache.ttl_for(fingerprint)
+    )
+
+
+def citation_join(file_urls, geo_urls):
+    """The cached `join_citations` of a report's citation and map workbooks."""
+    file_urls = [file_urls] if isinstance(file_urls, str) else list(file_urls)
+    geo_urls = [geo_urls] if isinstance(geo_urls, str) else list(geo_urls)
+    return watcher.call(_citation_join, file_urls + geo_urls, file_urls, geo_urls)
+
+
+@timed("citation_points", kind="loader", cached=True)
+def citation_points(file_urls, geo_urls, view=None):
+    """
+    Map locations of `geo_urls` weighted by the citations of `file_urls`,
+    joined once per dataset; `view` (the filtered rows; None while no
+    sidebar filter is set) re-aggregates the cached links instead of
+    joining again.
+    """
+    join = citation_join(file_urls, geo_urls)
+    if view is None:
+        return join["points"]
+    links = join["links"]
+    return aggregate_points(links[links["row"].isin(view.index)], join["locations"])
+
+
+# -----------------------------
+# Rendering
+# -----------------------------
+def deck(cells, resolution, kind="hex", value="points", label="institutions", extruded=False):
+    """
+    deck.gl map of binned `cells`: a HexagonLayer / GridLayer summing `value`
+    per cell into its colour (and height with `extruded`), so the browser
+    gets one point per cell instead of every row.
+    """
+    import pydeck as pdk
+
+    centre_lat = float(cells[LAT_COL].mean()) if len(cells) else 50.0
+    # deck.gl sizes cells in metres at the view centre; the bins are in Mercator metres
+    size = RESOLUTIONS[resolution] * 1000 * math.cos(math.radians(centre_lat))
+    common = dict(
+        data=cells,
+        get_position=f"[{LON_COL}, {LAT_COL}]",
+        get_color_weight=value,
+        color_aggregation='"SUM"',  # quoted: pydeck turns bare strings into accessors
+        get_elevation_weight=value,
+        elevation_aggregation='"SUM"',
+        extruded=extruded,
+        elevation_range=[0, 3 * size],
+        pickable=True,
+        opacity=0.8,
+    )
+    if kind == "hex":
+        layer = pdk.Layer("HexagonLayer", radius=size, coverage=0.9, **common)
+    else:
+        layer = pdk.Layer("GridLayer", cell_size=2 * size, **common)
+
+    if len(cells):
+        view = pdk.data_utils.compute_view(cells[[LON_COL, LAT_COL]].to_numpy().tolist())
+    else:
+        view = pdk.ViewState(latitude=centre_lat, longitude=10.0, zoom=2)
+    view.pitch = 40 if extruded else 0
+    return pdk.Deck(layers=[layer], initial_view_state=view, tooltip={"text": f"{{colorValue}} {label}"})
+
+
+def map_section(geo, weights=None, label="institutions", kind="hex", key="map_detail"):
+    """
+    Map detail selector and the binned map of `geo`; with `weights` (e.g. the
+    `mentions` of `citation_points`) cells are coloured and raised by its sum.
+    """
+    bins = map_bins(geo, kind=kind, weights=weights)
+    resolution = st.select_slider(
+        "Map detail", options=list(bins), value=default_resolution(bins), key=key
+    )
+    st.pydeck_chart(deck(
+        bins[resolution], resolution, kind=kind,
+        value="weight" if weights else "points", label=label, extruded=bool(weights)
+    ))
@@ -0,0 +1,218 @@
+import bisect
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils import artifacts, watcher
+from utils.geo import LAT_COL, LOCATION_COL, LON_COL, normalize_name
+from utils.network import institution_column
+
+# Local gazetteer: one row per known institution (name, latitude, longitude)
+GAZETTEER_PATH = os.environ.get("CITATION_GAZETTEER", os.path.join(artifacts.ROOT, "data", "gazetteer.csv"))
+MEMO_PATH = os.environ.get(
+    "CITATION_GEOCODER_MEMO", os.path.join(artifacts.ROOT, "build", "geocoder", "memo.json")
+)
+
+# Fuzzy matches need this Dice similarity of character trigrams
+FUZZY_THRESHOLD = 0.75
+# Prefix and fuzzy matching need a name of several words: single words are places ("London", "Croatia")
+MIN_FUZZY_WORDS = 2
+# "University of Geneva" is not "University of Genoa": fuzzy matches must also agree on the
+# words left after dropping these generic ones, at DISTINCT_THRESHOLD
+GENERIC_WORDS = {
+    "university", "universidad", "universidade", "universita", "universitat", "universite", "universiteit",
+    "institute", "college", "school", "centre", "center", "of", "de", "di", "the", "for", "and", "in",
+}
+DISTINCT_THRESHOLD = 0.5
+# Cells list several institutions; shorter fragments are abbreviations or noise
+MIN_NAME_LENGTH = 4
+
+_indexes = {}  # gazetteer sha256 -> index
+
+
+# -----------------------------
+# Gazetteer index
+# -----------------------------
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def distinct_part(key):
+    return " ".join(word for word in key.split() if word not in GENERIC_WORDS)
+
+
+def dice(a, b):
+    a, b = trigrams(a), trigrams(b)
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def build_index(gazetteer):
+    """
+    Lookups over a gazetteer frame: exact names, normalized names, the sorted
+    normalized names (prefix search) and trigram postings (fuzzy search).
+    """
+    gazetteer = gazetteer.dropna(subset=[LOCATION_COL, LAT_COL, LON_COL]).reset_index(drop=True)
+    names = gazetteer[LOCATION_COL].astype(str).str.strip()
+    keys = names.map(normalize_name)
+
+    postings = {}
+    for i, key in enumerate(keys):
+        for gram in trigrams(key):
+            postings.setdefault(gram, []).append(i)
+
+    order = np.argsort(keys.to_numpy(dtype=str), kind="stable")
+    return {
+        "names": names.to_numpy(dtype=object),
+        "keys": keys.to_numpy(dtype=object),
+        "coords": gazetteer[[LAT_COL, LON_COL]].to_numpy(dtype=float),
+        "exact": {name: i for i, name in reversed(list(enumerate(names)))},
+        "normalized": {key: i for i, key in reversed(list(enumerate(keys))) if key},
+        "sorted_keys": keys.to_numpy(dtype=str)[order].tolist(),
+        "sorted_ids": order,
+        "trigram_sizes": np.array([len(trigrams(k)) for k in keys], dtype=np.int32),
+        "postings": {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()},
+    }
+
+
+def load_gazetteer(path=GAZETTEER_PATH):
+    """The gazetteer index, rebuilt only when the file's content changes."""
+    sha = watcher.digest(path)
+    if sha not in _indexes:
+        _indexes[sha] = build_index(pd.read_csv(path))
+    return _indexes[sha], sha
+
+
+# -----------------------------
+# Lookup
+# -----------------------------
+def _prefix(index, key):
+    """Gazetteer row whose normalized name starts with `key` (truncated names), if exactly one does."""
+    lo = bisect.bisect_left(index["sorted_keys"], key)
+    hi = bisect.bisect_left(index["sorted_keys"], key + "\uffff")
+    if hi - lo == 1:
+        return int(index["sorted_ids"][lo])
+    return None
+
+
+def _fuzzy(index, key):
+    """
+    Most similar gazetteer row by trigram Dice coefficient (at least
+    FUZZY_THRESHOLD) whose distinctive words are similar too.
+    """
+    grams = [g for g in trigrams(key) if g in index["postings"]]
+    if not grams:
+        return None
+    ids, shared = np.unique(np.concatenate([index["postings"][g] for g in grams]), return_counts=True)
+    scores = 2 * shared / (len(trigrams(key)) + index["trigram_sizes"][ids])
+    distinct = distinct_part(key)
+    for i in np.argsort(-scores, kind="stable"):
+        if scores[i] < FUZZY_THRESHOLD:
+            break
+        if dice(distinct, distinct_part(index["keys"][ids[i]])) >= DISTINCT_THRESHOLD:
+            return int(ids[i])
+    return None
+
+
+def lookup(index, name):
+    """(gazetteer row, method) of `name`: exact, then normalized, then prefix, then fuzzy; (None, None) if unresolved."""
+    name = name.strip()
+    if name in index["exact"]:
+        return index["exact"][name], "exact"
+    key = normalize_name(name)
+    if not key:
+        return None, None
+    if key in index["normalized"]:
+        return index["normalized"][key], "normalized"
+    if len(key.split()) < MIN_FUZZY_WORDS:
+        return None, None
+    row = _prefix(index, key)
+    if row is not None:
+        return row, "prefix"
+    row = _fuzzy(index, key)
+    if row is not None:
+        return row, "fuzzy"
+    return None, None
+
+
+# -----------------------------
+# Memo
+# -----------------------------
+def read_memo(gazetteer_sha, path=MEMO_PATH):
+    """Resolved names of earlier runs against the same gazetteer: {name: [location, lat, lon, method] | None}."""
+    try:
+        with open(path) as f:
+            memo = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return memo["names"] if memo.get("gazetteer") == gazetteer_sha else {}
+
+
+def write_memo(names, gazetteer_sha, path=MEMO_PATH):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w") as f:
+            json.dump({"gazetteer": gazetteer_sha, "names": names}, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass  # read-only deployment: the memo is only an accelerator
+
+
+def geocode(names, path=GAZETTEER_PATH, memo_path=MEMO_PATH):
+    """
+    Coordinates of institution `names` from the local gazetteer, without
+    network access. Returns one row per distinct name: `name`, the gazetteer
+    `location`, `latitude`, `longitude` and the `method` that matched (NaN
+    when unresolved).
+    """
+    index, sha = load_gazetteer(path)
+    memo = read_memo(sha, memo_path) if memo_path else {}
+    rows, changed = [], False
+    for name in dict.fromkeys(n.strip() for n in names if isinstance(n, str) and n.strip()):
+        if name not in memo:
+            row, method = lookup(index, name)
+            memo[name] = None if row is None else [
+                index["names"][row], float(index["coords"][row, 0]), float(index["coords"][row, 1]), method
+            ]
+            changed = True
+        hit = memo[name]
+        rows.append([name] + (hit if hit else [None, np.nan, np.nan, None]))
+    if changed and memo_path:
+        write_memo(memo, sha, memo_path)
+    return pd.DataFrame(rows, columns=["name", LOCATION_COL, LAT_COL, LON_COL, "method"])
+
+
+# -----------------------------
+# Map tables
+# -----------------------------
+def institution_names(data):
+    """Every institution named in the citation data (cells list several, split on , and ;)."""
+    col = institution_column(data)
+    if col is None:
+        return []
+    names = data[col].dropna().astype(str).str.split(r"[,;]", regex=True).explode().str.strip()
+    return names[names.str.len() >= MIN_NAME_LENGTH].drop_duplicates().tolist()
+
+
+def geo_table(data, path=GAZETTEER_PATH, memo_path=MEMO_PATH):
+    """
+    `(geo, unresolved)`: a map table (location, latitude, longitude) like the
+    hand-built `*_map.xlsx` workbooks, generated from the institutions of
+    `data`, and the names the gazetteer could not resolve.
+    """
+    coded = geocode(institution_names(data), path, memo_path)
+    resolved = coded.dropna(subset=[LAT_COL, LON_COL])
+    geo = resolved[[LOCATION_COL, LAT_COL, LON_COL]].drop_duplicates(subset=[LOCATION_COL]).reset_index(drop=True)
+    unresolved = coded.loc[coded[LAT_COL].isna(), "name"].tolist()
+    return geo, unresolved
+
+
+def seed_gazetteer(geo_frames):
+    """A gazetteer from map tables: one row per normalized location name, first coordinates win."""
+    gazetteer = pd.concat(geo_frames, ignore_index=True)[[LOCATION_COL, LAT_COL, LON_COL]]
+    gazetteer = gazetteer.dropna()
+    gazetteer[LOCATION_COL] = gazetteer[LOCATION_COL].astype(str).str.strip()
+    keys = gazetteer[LOCATION_COL].map(normalize_name)
+    return gazetteer[(keys != "") & ~keys.duplicated()].sort_values(LOCATION_COL).reset_index(drop=True)
@@ -0,0 +1,180 @@
+import contextlib
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+
+# Enabled per script run with ?debug=1 in the page URL
+QUERY_PARAM = "debug"
+LOG_PATH = os.environ.get("CITATION_TRACE_LOG", "build/instrumentation.jsonl")
+
+# Each Streamlit session runs its script in its own thread
+_state = threading.local()
+
+
+def enabled():
+    return getattr(_state, "records", None) is not None
+
+
+# -----------------------------
+# Page lifecycle
+# -----------------------------
+def start_page(page):
+    """Turn recording on for this run when the page URL has `?debug=1`."""
+    try:
+        flag = st.query_params.get(QUERY_PARAM, "")
+    except Exception:  # no script run context (CLI, background thread)
+        flag = ""
+    if flag.lower() not in ("1", "true", "yes"):
+        _state.records = None
+        return
+
+    _state.records = []
+    _state.stack = []
+    _state.page = page
+    _state.section = None
+    _state.page_start = time.perf_counter()
+
+
+def section(name):
+    """Close the previous page section and start timing `name`."""
+    if not enabled():
+        return
+    _close_section()
+    _state.section = (name, time.perf_counter())
+
+
+def finish_page():
+    """Close the last section, show the debug sidebar and append the run to the JSONL log."""
+    if not enabled():
+        return
+    _close_section()
+    _record("page", _state.page, time.perf_counter() - _state.page_start)
+    records = _state.records
+    _state.records = None
+
+    render_debug_sidebar(records)
+    write_log(_state.page, records)
+
+
+def _close_section():
+    if _state.section is not None:
+        name, start = _state.section
+        _record("section", name, time.perf_counter() - start)
+        _state.section = None
+
+
+def _record(kind, name, seconds, rows=None, cache_hit=None):
+    _state.records.append({
+        "kind": kind,
+        "name": name,
+        "seconds": seconds,
+        "rows": rows,
+        "cache_hit": cache_hit,
+        "depth": len(_state.stack),
+    })
+
+
+def _row_count(result):
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return len(result)
+    if isinstance(result, tuple) and result and isinstance(result[0], (pd.DataFrame, pd.Series)):
+        return len(result[0])
+    return None
+
+
+# -----------------------------
+# Stages and builders
+# -----------------------------
+@contextlib.contextmanager
+def stage(name, kind="stage"):
+    """Time a block of code (loader stage, author splitting, ...)."""
+    if not enabled():
+        yield
+        return
+    frame = {"computed": False}
+    _state.stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _state.stack.pop()
+        _record(kind, name, time.perf_counter() - start)
+
+
+def timed(name=None, kind="builder", cached=False):
+    """
+    Decorator recording duration and output row count of a function.
+
+    With `cached=True` put it above `st.cache_data` and call `mark_computed()`
+    first thing in the cached body: the call is reported as a cache hit
+    unless the body actually ran.
+    """
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_state, "records", None) is None:
+                return func(*args, **kwargs)
+
+            frame = {"computed": False}
+            _state.stack.append(frame)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                _state.stack.pop()
+            _record(
+                kind, label, time.perf_counter() - start,
+                rows=_row_count(result),
+                cache_hit=(not frame["computed"]) if cached else None,
+            )
+            return result
+        return wrapper
+    return decorator
+
+
+def mark_computed():
+    """Called from the body of a cached function: the current call was a cache miss."""
+    if enabled() and _state.stack:
+        _state.stack[-1]["computed"] = True
+
+
+# -----------------------------
+# Output
+# -----------------------------
+def render_debug_sidebar(records):
+    timings = pd.DataFrame(records)
+    with st.sidebar.expander("Debug: timings", expanded=True):
+        hits = timings["cache_hit"].dropna()
+        if len(hits):
+            st.write(f"Cache hits: {int(hits.sum())}/{len(hits)}")
+        st.dataframe(
+            timings.assign(
+                name=timings["depth"].map(lambda d: "· " * d) + timings["name"],
+                ms=(timings["seconds"] * 1000).round(1)
+            )[["kind", "name", "ms", "rows", "cache_hit"]],
+            use_container_width=True,
+            hide_index=True
+        )
+
+
+def write_log(page, records, path=None):
+    path = path or LOG_PATH
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a") as f:
+            f.write(json.dumps({
+                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "page": page,
+                "records": records,
+            }) + "\n")
+    except OSError:
+        # read-only deployments still get the sidebar
+        pass
@@ -0,0 +1,162 @@
+import re
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils import artifacts, disk_cache
+from utils.data_loader import HASH_FUNCS
+from utils.instrumentation import mark_computed, timed
+
+# Stored networks are rebuilt when this module changes
+_CODE = artifacts.file_sha256(__file__)
+
+AUTHOR_COL = "name_of_the_author/organisation_citing_eige"
+INSTITUTION_COLS = ["name_of_the_institution_citing_eige", "name_of_the_institution"]
+
+# Regex for initials-only patterns like: J. C., A.-Q., B.-M.
+INITIALS_PATTERN = re.compile(r'^[A-Z](?:\.|\.-[A-Z]\.)(?:\s[A-Z](?:\.|\.-[A-Z]\.))*$', re.I)
+
+# Stop words (countries, cities, etc.) that end up as separate institution entries
+INSTITUTION_STOP_WORDS = ['spain', 'zgreb', 'norway', 'bergen', 'canada', 'gdansk']
+
+
+# -----------------------------
+# Entity splitting
+# -----------------------------
+def institution_column(data):
+    """2024 workbooks use `name_of_the_institution`, 2025 ones add `_citing_eige`."""
+    for col in INSTITUTION_COLS:
+        if col in data.columns:
+            return col
+    return None
+
+
+def split_authors(series):
+    """One row per author, indexed like `series`; drops initials-only fragments."""
+    authors = series.dropna().astype(str).str.split(",").explode().str.strip()
+    authors = authors[authors.str.len() > 4]
+    return authors[~authors.str.match(INITIALS_PATTERN)]
+
+
+def split_institutions(series):
+    """
+    One row per university/college/institute, indexed like `series`. Cells are
+    split on commas only, as the report pages always did: "A; B" stays one entry.
+    """
+    unis = series.dropna().astype(str).str.split(",").explode().str.strip()
+    unis = unis[~unis.str.lower().isin(INSTITUTION_STOP_WORDS) & (unis.str.len() > 2)]
+    return unis[unis.str.lower().str.contains('university|college|institute')]
+
+
+# -----------------------------
+# Sparse incidence / co-occurrence
+# -----------------------------
+def incidence_matrix(entities, documents):
+    """
+    Binary entity × document matrix.
+    `entities` and `documents` are aligned sequences (one pair per mention).
+    """
+    from scipy import sparse
+
+    ent_codes, ent_names = pd.factorize(pd.Series(entities), sort=True)
+    doc_codes, doc_names = pd.factorize(pd.Series(documents))
+    keep = (ent_codes >= 0) & (doc_codes >= 0)
+
+    matrix = sparse.csr_matrix(
+        (np.ones(keep.sum(), dtype=np.int32), (ent_codes[keep], doc_codes[keep])),
+        shape=(len(ent_names), len(doc_names))
+    )
+    # several mentions of the same entity in one document count once
+    matrix.data[:] = 1
+    return matrix, pd.Index(ent_names)
+
+
+def co_occurrence(incidence):
+    """Entity × entity matrix of shared documents, without self loops."""
+    co = (incidence @ incidence.T).tocsr()
+    co.setdiag(0)
+    co.eliminate_zeros()
+    return co
+
+
+@timed("build_network", kind="builder", cached=True)
+@st.cache_data(hash_funcs=HASH_FUNCS, max_entries=32)  # entries of replaced frames age out
+def build_network(data, kind="author"):
+    """
+    Co-authorship (`kind="author"`) or co-institution (`kind="institution"`)
+    graph of the citing documents.
+
+    Returns `(nodes, edges)`: nodes carry document count, degree, degree
+    centrality and connected component; edges carry the number of shared
+    documents.
+    """
+    mark_computed()
+    return disk_cache.cached(
+        "network", (kind, disk_cache.content_key(data), _CODE), lambda: _build_network(data, kind)
+    )
+
+
+def _build_network(data, kind):
+    from scipy import sparse
+    from scipy.sparse.csgraph import connected_components
+
+    empty_nodes = pd.DataFrame(columns=[
+        "name", "documents", "degree", "degree_centrality", "component", "component_size"
+    ])
+    empty_edges = pd.DataFrame(columns=["source", "target", "weight"])
+
+    if kind == "author":
+        col = AUTHOR_COL if AUTHOR_COL in data.columns else None
+        split = split_authors
+    else:
+        col = institution_column(data)
+        split = split_institutions
+    if col is None or "document_id" not in data.columns:
+        return empty_nodes, empty_edges
+
+    entities = split(data[col])
+    if entities.empty:
+        return empty_nodes, empty_edges
+    documents = data.loc[entities.index, "document_id"]
+
+    incidence, names = incidence_matrix(entities.to_numpy(), documents.to_numpy())
+    co = co_occurrence(incidence)
+
+    degree = np.diff(co.indptr)
+    n_components, labels = connected_components(co, directed=False)
+    component_sizes = np.bincount(labels, minlength=n_components)
+
+    nodes = pd.DataFrame({
+        "name": names,
+        "documents": np.asarray(incidence.sum(axis=1)).ravel(),
+        "degree": degree,
+        "degree_centrality": degree / max(len(names) - 1, 1),
+        "component": labels,
+        "component_size": component_sizes[labels],
+    })
+
+    upper = sparse.triu(co, k=1).tocoo()
+    edges = pd.DataFrame({
+        "source": names[upper.row],
+        "target": names[upper.col],
+        "weight": upper.data,
+    })
+    return nodes, edges
+
+
+def most_connected(nodes, n=10):
+    """Top `n` nodes by degree, formatted for display."""
+    top = (
+        nodes.sort_values(["degree", "documents"], ascending=False)
+        .head(n)
+        .rename(columns={
+            "name": "Name",
+            "documents": "Documents",
+            "degree": "Connections",
+            "component_size": "Cluster size"
+        })[["Name", "Documents", "Connections", "Cluster size"]]
+        .reset_index(drop=True)
+    )
+    top.index = top.index + 1
+    top.index.name = "Rank"
+    return top
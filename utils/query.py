@@ -0,0 +1,184 @@
+import functools
+import hashlib
+import os
+
+import pandas as pd
+import streamlit as st
+
+from utils import aggregates, artifacts, disk_cache, watcher
+from utils.data_loader import _repo_relpath, get_shared_data, load_shared_geospatial_data
+from utils.instrumentation import mark_computed, timed
+
+# Standard columns every citation relation exposes to the metric queries
+CITATION_COLUMNS = {
+    "date_of_publication": "date_of_publication",
+    "type": "\"type_of_eige's_output_cited\"",
+    "document_id": "document_id",
+    "weight": "\"ranking/weight\"",
+}
+GEO_COLUMNS = {"location": "location", "latitude": "latitude", "longitude": "longitude"}
+
+# Metric queries over the relation `c` (one row per mention); `?` are bound per call
+METRICS = {
+    "mentions": "SELECT count(*) AS mentions FROM c",
+    "documents": "SELECT count(DISTINCT document_id) AS documents FROM c",
+    "per_quarter": """
+        SELECT 'Q' || quarter(date_of_publication) AS quarter,
+               count(DISTINCT document_id) AS documents,
+               count(type) AS mentions
+        FROM c
+        WHERE date_of_publication IS NOT NULL
+          AND (CAST(? AS INTEGER) IS NULL OR year(date_of_publication) = ?)
+        GROUP BY 1 ORDER BY 1
+    """,
+    "per_month": """
+        SELECT month(date_of_publication) AS month,
+               count(DISTINCT document_id) AS documents,
+               count(*) AS mentions
+        FROM c
+        WHERE date_of_publication IS NOT NULL
+          AND (CAST(? AS INTEGER) IS NULL OR year(date_of_publication) = ?)
+        GROUP BY 1 ORDER BY 1
+    """,
+    "per_type": """
+        SELECT type, count(*) AS mentions, count(DISTINCT document_id) AS documents
+        FROM c GROUP BY 1 ORDER BY mentions DESC, type
+    """,
+    "locations": """
+        SELECT location, count(*) AS points, avg(latitude) AS latitude, avg(longitude) AS longitude
+        FROM g GROUP BY 1 ORDER BY points DESC, location
+    """,
+}
+YEAR_METRICS = {"per_quarter", "per_month"}
+GEO_METRICS = {"locations"}
+
+
+# -----------------------------
+# Connection
+# -----------------------------
+def _select(columns, relation):
+    return ", ".join(f"{expr} AS {name}" for name, expr in columns.items()) + f" FROM {relation}"
+
+
+def _partition_views(manifest):
+    """SQL of the `citations` and `geo` views: a projection of every Parquet partition, tagged by workbook."""
+    views = {"citation": [], "geo": []}
+    for relpath, entry in sorted(manifest["files"].items()):
+        if entry.get("error"):
+            continue
+        path = os.path.join(artifacts.ARTIFACTS_DIR, entry["data"]).replace("'", "''")
+        source = relpath.replace("'", "''")
+        if entry["kind"] == "citations":
+            views["citation"].append(f"SELECT '{source}' AS source, " + _select(CITATION_COLUMNS, f"read_parquet('{path}')"))
+        else:
+            views["geo"].append(f"SELECT '{source}' AS source, " + _select(GEO_COLUMNS, f"read_parquet('{path}')"))
+    return views
+
+
+@st.cache_resource
+def connection(manifest_stamp):
+    """
+    In-process DuckDB database with `citations` / `geo` views over the
+    precomputed partitions; the views read Parquet on demand, nothing is
+    materialized. A new manifest (`manifest_stamp`) gets a new database.
+    """
+    import duckdb
+
+    con = duckdb.connect(":memory:")
+    manifest = artifacts.read_manifest()
+    if manifest is not None:
+        views = _partition_views(manifest)
+        if views["citation"]:
+            con.execute("CREATE VIEW citations AS " + " UNION ALL ".join(views["citation"]))
+        if views["geo"]:
+            con.execute("CREATE VIEW geo AS " + " UNION ALL ".join(views["geo"]))
+    return con
+
+
+def _manifest_stamp():
+    manifest = artifacts.read_manifest()
+    return (manifest or {}).get("created")
+
+
+# -----------------------------
+# Queries
+# -----------------------------
+@functools.lru_cache(maxsize=None)
+def _sql(metric, relation):
+    """Full statement of `metric` over a relation; built once, then reused with new parameters."""
+    alias = "g" if metric in GEO_METRICS else "c"
+    return f"WITH {alias} AS ({relation}) {METRICS[metric]}"
+
+
+def _fresh_sources(sources, kind):
+    """Repo-relative paths of `sources` if every one has a fresh partition, else None."""
+    if isinstance(sources, str):
+        sources = [sources]
+    manifest = artifacts.read_manifest()
+    if manifest is None:
+        return None
+    fingerprint = artifacts.code_fingerprint()
+    data_dir = os.environ.get("CITATION_DATA_DIR")
+    relpaths = []
+    for source in sources:
+        relpath = _repo_relpath(source)
+        entry = relpath and artifacts.fresh_entry(relpath, data_dir, manifest, fingerprint)
+        if not entry or entry["kind"] != kind:
+            return None
+        relpaths.append(relpath)
+    return relpaths
+
+
+def _run_query(metric, sources, year):
+    kind = "geo" if metric in GEO_METRICS else "citations"
+    params = [year, year] if metric in YEAR_METRICS else []
+    cursor = connection(_manifest_stamp()).cursor()
+
+    relpaths = _fresh_sources(sources, kind)
+    if relpaths is not None:
+        view = "geo" if kind == "geo" else "citations"
+        relation = f"SELECT * FROM {view} WHERE list_contains(?::VARCHAR[], source)"
+        return cursor.execute(_sql(metric, relation), [relpaths] + params).df()
+
+    # no fresh partition: query the DataFrame the pages use, registered on this cursor only
+    frame = load_shared_geospatial_data(sources) if kind == "geo" else get_shared_data(sources)
+    name = "frame_" + hashlib.sha1(repr(sources).encode()).hexdigest()[:12]
+    cursor.register(name, frame)
+    columns = GEO_COLUMNS if kind == "geo" else CITATION_COLUMNS
+    return cursor.execute(_sql(metric, "SELECT " + _select(columns, name)), params).df()
+
+
+@st.cache_data
+def _cached_query(metric, sources, year, fingerprint):
+    mark_computed()
+    return disk_cache.cached(
+        "query", (METRICS[metric], sources, year, fingerprint, artifacts.code_fingerprint()),
+        lambda: _run_query(metric, sources, year), ttl=disk_cache.ttl_for(fingerprint)
+    )
+
+
+@timed("query", kind="query", cached=True)
+def query(metric, sources, year=None):
+    """
+    Run a standard metric over the workbooks `sources` (URLs or paths, as for
+    `get_data`). Fresh precomputed partitions are scanned in place; otherwise
+    the loaded DataFrame is queried. Results are cached per workbook content.
+    """
+    disk_cache.lookup("query")
+    return watcher.call(_cached_query, sources, metric, sources, year)
+
+
+def scalar(metric, sources):
+    return query(metric, sources).iloc[0, 0]
+
+
+def output_type_counts(sources, view=None):
+    """
+    Mentions per output type, most frequent first (as `value_counts`), from
+    the `per_type` metric; `view` (the rows left by the sidebar filters,
+    None while no filter is set) is counted directly.
+    """
+    if view is not None:
+        return aggregates.output_type_counts(view)
+    per_type = query("per_type", sources).dropna(subset=["type"])
+    return pd.Series(per_type["mentions"].to_numpy(), index=pd.Index(per_type["type"], name=aggregates.TYPE_COL), name="count")
@@ -0,0 +1,220 @@
+import calendar
+import os
+
+import pandas as pd
+import streamlit as st
+
+from utils import artifacts, disk_cache, sketches, watcher
+from utils.aggregates import DATE_COL, JOURNAL_COL, QUARTERS, TYPE_COL, WEIGHT_COL
+from utils.data_loader import _repo_relpath, get_shared_data
+from utils.instrumentation import mark_computed, timed
+from utils.network import AUTHOR_COL, institution_column, split_authors, split_institutions
+
+CITATIONS_COL = "number_of_citations_(using_google_scholar)"
+
+# Grains from finest to coarsest; every coarser table is a merge of the finer one
+GRAINS = {"month": ["year", "quarter", "month"], "quarter": ["year", "quarter"], "year": ["year"]}
+# Measures that add up across periods, and distinct-count sketches that merge (utils.sketches)
+ADDITIVE = ["mentions", "typed_mentions", "citations", "weight", "weighted"]
+DISTINCT = ["documents", "journals", "institutions", "authors"]
+
+
+# -----------------------------
+# Rollup tables
+# -----------------------------
+def _distinct_values(data):
+    """The values each distinct measure counts, indexed by row (authors and institutions: one per name)."""
+    institution_col = institution_column(data)
+    return {
+        "documents": data["document_id"],
+        "journals": data[JOURNAL_COL] if JOURNAL_COL in data.columns else pd.Series(dtype=object),
+        "institutions": split_institutions(data[institution_col]) if institution_col else pd.Series(dtype=object),
+        "authors": split_authors(data[AUTHOR_COL]) if AUTHOR_COL in data.columns else pd.Series(dtype=object),
+    }
+
+
+def month_rollup(data):
+    """
+    The finest rollup: one row per (year, quarter, month) of publication
+    with the additive measures and sketches of the distinct documents,
+    journals, institutions and authors. Rows without a date get a NaN
+    period, so the year table still has them.
+    """
+    dates = data[DATE_COL] if DATE_COL in data.columns else pd.Series(pd.NaT, index=data.index)
+    periods = pd.DataFrame({
+        "year": dates.dt.year.astype("Int64"),
+        "quarter": dates.dt.quarter.astype("Int64"),
+        "month": dates.dt.month.astype("Int64"),
+    }, index=data.index)
+    group = periods.groupby(GRAINS["month"], dropna=False).ngroup()
+    measures = pd.DataFrame({
+        "typed": data[TYPE_COL].notna() if TYPE_COL in data.columns else False,
+        "citations": pd.to_numeric(data[CITATIONS_COL], errors="coerce") if CITATIONS_COL in data.columns else None,
+        "weight": pd.to_numeric(data[WEIGHT_COL], errors="coerce") if WEIGHT_COL in data.columns else None,
+    }, index=data.index)
+    grouped = measures.groupby(group)
+    table = pd.DataFrame({
+        "mentions": grouped.size(),
+        "typed_mentions": grouped["typed"].sum().astype(int),
+        "citations": grouped["citations"].sum(min_count=1).fillna(0),
+        "weight": grouped["weight"].sum(min_count=1).fillna(0),
+        "weighted": grouped["weight"].count(),
+    })
+    for name, values in _distinct_values(data).items():
+        by_group = pd.Series(values.to_numpy(), dtype=object).groupby(group.loc[values.index].to_numpy())
+        built = by_group.agg(sketches.sketch) if len(values) else pd.Series(dtype=object)
+        table[name] = [built.get(g, sketches.empty()) for g in table.index]
+    keys = periods.assign(group=group).drop_duplicates("group").set_index("group")
+    return keys.join(table).sort_index().reset_index(drop=True)
+
+
+def roll_up(table, keys):
+    """
+    Merge a rollup table into the coarser grain `keys` (any subset of its
+    keys, [] for the grand total): sums of the additive measures and merges
+    of the distinct-count sketches, without going back to the rows.
+    """
+    if not keys:
+        row = {c: table[c].sum() for c in ADDITIVE}
+        row.update({c: sketches.merge(table[c]) for c in DISTINCT})
+        return pd.DataFrame([row])
+    grouped = table.groupby(keys, dropna=False)
+    merged = grouped[ADDITIVE].sum()
+    for c in DISTINCT:
+        merged[c] = grouped[c].agg(sketches.merge)
+    return merged.reset_index()
+
+
+def materialize(data):
+    """The month, quarter and year tables of `data`, each rolled up from the finer one."""
+    return expand(month_rollup(data))
+
+
+def expand(month_table):
+    """The quarter and year tables of a month table."""
+    tables = {"month": month_table}
+    tables["quarter"] = roll_up(tables["month"], GRAINS["quarter"])
+    tables["year"] = roll_up(tables["quarter"], GRAINS["year"])
+    return tables
+
+
+def counts(table):
+    """A rollup table with the sketches replaced by their distinct counts."""
+    return table.assign(**{c: table[c].map(sketches.estimate) for c in DISTINCT})
+
+
+# -----------------------------
+# Stored rollups (scripts.precompute)
+# -----------------------------
+def write_rollup(table, path):
+    """A month table as Parquet, the sketches as bytes."""
+    table.assign(**{c: table[c].map(sketches.to_bytes) for c in DISTINCT}).to_parquet(path, index=False)
+
+
+def read_rollup(path):
+    table = pd.read_parquet(path)
+    for c in ["year", "quarter", "month"]:
+        table[c] = table[c].astype("Int64")
+    return table.assign(**{c: table[c].map(sketches.from_bytes) for c in DISTINCT})
+
+
+def load_stored(file_urls):
+    """
+    The month table stored with the Parquet partition of a single workbook,
+    and its row count, or None when the partition is missing or stale.
+    """
+    if len(file_urls) != 1:
+        # document IDs are assigned over the concatenated workbooks
+        return None
+    manifest = artifacts.read_manifest()
+    relpath = manifest and _repo_relpath(file_urls[0])
+    entry = relpath and artifacts.fresh_entry(relpath, os.environ.get("CITATION_DATA_DIR"), manifest)
+    if not entry or not entry.get("rollups"):
+        return None
+    return read_rollup(os.path.join(artifacts.ARTIFACTS_DIR, entry["rollups"])), entry["rows"]
+
+
+# -----------------------------
+# Cached tables
+# -----------------------------
+@st.cache_resource
+def _rollups(file_urls, fingerprint):
+    mark_computed()
+
+    def compute():
+        stored = load_stored(file_urls)
+        if stored is not None:
+            month_table, rows = stored
+            return {"tables": expand(month_table), "rows": rows}
+        data = get_shared_data(file_urls)
+        return {"tables": materialize(data), "rows": len(data)}
+
+    return disk_cache.cached(
+        "rollups", (file_urls, fingerprint, artifacts.code_fingerprint()), compute, ttl=disk_cache.ttl_for(fingerprint)
+    )
+
+
+@timed("rollups", kind="loader", cached=True)
+def rollups(file_urls, view=None):
+    """
+    The month / quarter / year rollup tables of a dataset, materialized once
+    per content of its workbooks. `view` (the filtered rows; None while no
+    sidebar filter is set) is rolled up on the fly instead.
+    """
+    file_urls = [file_urls] if isinstance(file_urls, str) else list(file_urls)
+    stored = watcher.call(_rollups, file_urls, file_urls)
+    if view is None:
+        return stored["tables"]
+    return materialize(view)
+
+
+# -----------------------------
+# Report tables
+# -----------------------------
+def quarter_table(tables, year):
+    """Publications and mentions per quarter (Q1–Q4) plus a total row, from the quarter rollup."""
+    # merged across years: like the pages, a stray next-year date still counts in its quarter
+    by_quarter = counts(roll_up(tables["quarter"].dropna(subset=["quarter"]), ["quarter"]))
+    by_quarter.index = "Q" + by_quarter.pop("quarter").astype(int).astype(str)
+    summary = (
+        by_quarter[["documents", "typed_mentions"]]
+            .rename(columns={"documents": "Number of publications", "typed_mentions": "Number of mentions"})
+            .reindex(QUARTERS, fill_value=0)
+    )
+    total_row = pd.DataFrame({
+        "Number of publications": [summary["Number of publications"].sum()],
+        "Number of mentions": [summary["Number of mentions"].sum()]
+    }, index=[f"Total {year}"])
+    return pd.concat([summary, total_row])
+
+
+def month_documents(tables):
+    """Unique documents per month name, in calendar order, from the month rollup."""
+    by_month = counts(roll_up(tables["month"].dropna(subset=["month"]), ["month"])).sort_values("month")
+    return pd.Series(
+        by_month["documents"].to_numpy(),
+        index=pd.Index([calendar.month_name[int(m)] for m in by_month["month"]], name="month"),
+        name="document_id",
+    )
+
+
+def quarter_summary(file_urls, year, view=None):
+    """`quarter_table` of a dataset's cached rollups (or of `view`)."""
+    return quarter_table(rollups(file_urls, view), year)
+
+
+def monthly_documents(file_urls, view=None):
+    """`month_documents` of a dataset's cached rollups (or of `view`)."""
+    return month_documents(rollups(file_urls, view))
+
+
+def distinct_count(file_urls, measure="documents", view=None):
+    """Distinct documents / journals / institutions / authors of a dataset, from its year sketches."""
+    return sketches.count_distinct(rollups(file_urls, view)["year"][measure])
+
+
+def distinct_across(datasets, measure="documents"):
+    """Distinct values over several datasets (e.g. every annual workbook): a merge of their year sketches."""
+    return sketches.count_distinct(
+        sketch for file_urls in datasets for sketch in rollups(file_urls)["year"][measure]
+    )
@@ -0,0 +1,238 @@
+import bisect
+import json
+import math
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import artifacts, watcher
+from utils.catalog import REPORTS, data_urls
+from utils.data_loader import _repo_relpath, get_shared_data
+from utils.network import AUTHOR_COL, institution_column
+
+INDEX_DIR = os.path.join(artifacts.ARTIFACTS_DIR, "search")
+INDEX_VERSION = 1
+
+# Searchable fields: (column, boost); the institution column differs between years
+FIELDS = {
+    "document": ("name_of_the_document_citing_eige", 2.0),
+    "journal": ("name_of_the_journal_citing_eige", 1.0),
+    "institution": (None, 1.0),
+    "authors": (AUTHOR_COL, 1.0),
+    "output": ("eige's_output_cited", 1.0),
+}
+WEIGHT_COL = "ranking/weight"
+
+# BM25 parameters; prefix-only matches count at PREFIX_FACTOR of an exact match
+K1 = 1.2
+B = 0.75
+PREFIX_FACTOR = 0.5
+MAX_EXPANSIONS = 200
+
+TOKEN_PATTERN = re.compile(r"\w+")
+STOP_WORDS = {"a", "an", "and", "at", "by", "de", "for", "in", "la", "of", "on", "the", "to", "with"}
+
+
+# -----------------------------
+# Corpus
+# -----------------------------
+def default_sources():
+    """The annual workbooks: every citation of every year, once."""
+    return [url for rid, report in REPORTS.items() if report["quarter"] is None for url in data_urls(rid)]
+
+
+def _year_of(source):
+    relpath = _repo_relpath(source)
+    for report in REPORTS.values():
+        if relpath in report["data"]:
+            return report["year"]
+    return None
+
+
+def corpus(sources):
+    """One record per mention with the searchable fields, year and weight."""
+    frames = []
+    for source in sources:
+        data = get_shared_data([source])
+        columns = {name: col or institution_column(data) for name, (col, _) in FIELDS.items()}
+        frames.append(pd.DataFrame({
+            "year": _year_of(source),
+            "document_id": data["document_id"].to_numpy(),
+            **{name: data[col].astype("string").to_numpy() if col in data.columns else pd.NA
+               for name, col in columns.items()},
+            "weight": pd.to_numeric(data[WEIGHT_COL], errors="coerce").to_numpy()
+            if WEIGHT_COL in data.columns else np.nan,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+# -----------------------------
+# Index
+# -----------------------------
+def tokenize(text):
+    """Lowercase, accent-free word tokens without stop words."""
+    if not isinstance(text, str):
+        return []
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return [t for t in TOKEN_PATTERN.findall(text) if t not in STOP_WORDS]
+
+
+def build_index(records):
+    """
+    Inverted index over `records`: a sorted vocabulary, and per term the rows
+    it occurs in with its boosted term frequency (CSR layout: `offsets`
+    delimit each term's slice of `rows` / `tfs`).
+    """
+    parts = []
+    for name, (_, boost) in FIELDS.items():
+        tokens = records[name].map(tokenize).explode().dropna()
+        parts.append(pd.DataFrame({"term": tokens.to_numpy(), "row": tokens.index.to_numpy(), "tf": boost}))
+    postings = (
+        pd.concat(parts, ignore_index=True)
+        .groupby(["term", "row"], sort=True)["tf"].sum()
+        .reset_index()
+    )
+    lengths = np.bincount(postings["row"], weights=postings["tf"], minlength=len(records))
+    terms, starts = np.unique(postings["term"].to_numpy(dtype=str), return_index=True)
+    return {
+        "vocabulary": terms.tolist(),
+        "offsets": np.append(starts, len(postings)).astype(np.int64),
+        "rows": postings["row"].to_numpy(np.int32),
+        "tfs": postings["tf"].to_numpy(np.float32),
+        "lengths": lengths.astype(np.float32),
+        "records": records,
+    }
+
+
+def save_index(index, meta, path=INDEX_DIR):
+    os.makedirs(path, exist_ok=True)
+    np.savez(
+        os.path.join(path, "index.npz"),
+        vocabulary=np.array(index["vocabulary"], dtype=str),
+        offsets=index["offsets"], rows=index["rows"], tfs=index["tfs"], lengths=index["lengths"],
+    )
+    index["records"].to_parquet(os.path.join(path, "records.parquet"), index=False)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def load_index(meta, path=INDEX_DIR):
+    """The persisted index if it was built from the same sources (`meta`), else None."""
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            if json.load(f) != meta:
+                return None
+        arrays = np.load(os.path.join(path, "index.npz"))
+        return {
+            "vocabulary": arrays["vocabulary"].tolist(),
+            "offsets": arrays["offsets"],
+            "rows": arrays["rows"],
+            "tfs": arrays["tfs"],
+            "lengths": arrays["lengths"],
+            "records": pd.read_parquet(os.path.join(path, "records.parquet")),
+        }
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def index_meta(sources):
+    """Identifies an index build: format version and the SHA-256 of every source workbook."""
+    data_dir = os.environ.get("CITATION_DATA_DIR") or artifacts.ROOT
+    files = {}
+    for source in sources:
+        relpath = _repo_relpath(source)
+        local = relpath and os.path.join(data_dir, relpath)
+        files[relpath or source] = watcher.digest(local) if local and os.path.exists(local) else None
+    return {"version": INDEX_VERSION, "code": artifacts.code_fingerprint(), "sources": files}
+
+
+def ensure_index(sources=None, path=INDEX_DIR):
+    """Load the persisted index, rebuilding and persisting it when its sources changed."""
+    sources = sources or default_sources()
+    meta = index_meta(sources)
+    index = load_index(meta, path)
+    if index is None:
+        index = build_index(corpus(sources))
+        try:
+            save_index(index, meta, path)
+        except OSError:
+            pass  # read-only deployment: keep the in-memory index
+    return index
+
+
+@st.cache_resource
+def get_index(meta_key):
+    """`ensure_index` shared across sessions; `meta_key` changes with the source workbooks."""
+    return ensure_index()
+
+
+# -----------------------------
+# Query
+# -----------------------------
+def _term_range(vocabulary, prefix):
+    lo = bisect.bisect_left(vocabulary, prefix)
+    hi = bisect.bisect_left(vocabulary, prefix + "\uffff")
+    return lo, hi
+
+
+def _token_scores(index, token, avg_length):
+    """(rows, scores) of every row containing a term starting with `token`."""
+    vocabulary, offsets = index["vocabulary"], index["offsets"]
+    lo, hi = _term_range(vocabulary, token)
+    if hi - lo > MAX_EXPANSIONS:
+        # very short prefixes: keep the most frequent completions
+        df = offsets[lo + 1:hi + 1] - offsets[lo:hi]
+        terms = lo + np.sort(np.argsort(df)[::-1][:MAX_EXPANSIONS])
+    else:
+        terms = range(lo, hi)
+
+    n = len(index["lengths"])
+    all_rows, all_scores = [], []
+    for t in terms:
+        start, end = offsets[t], offsets[t + 1]
+        rows, tf = index["rows"][start:end], index["tfs"][start:end]
+        idf = math.log(1 + (n - len(rows) + 0.5) / (len(rows) + 0.5))
+        norm = K1 * (1 - B + B * index["lengths"][rows] / avg_length)
+        factor = 1.0 if vocabulary[t] == token else PREFIX_FACTOR
+        all_rows.append(rows)
+        all_scores.append(factor * idf * tf * (K1 + 1) / (tf + norm))
+    if not all_rows:
+        return np.array([], dtype=np.int32), np.array([], dtype=np.float32)
+
+    rows, inverse = np.unique(np.concatenate(all_rows), return_inverse=True)
+    return rows, np.bincount(inverse, weights=np.concatenate(all_scores))
+
+
+def search(index, query, limit=50, years=None):
+    """
+    Mentions matching every token of `query` (each as a word prefix), best
+    BM25 score first, one row per document and year, with their weight.
+    """
+    tokens = tokenize(query)
+    records = index["records"]
+    if not tokens or records.empty:
+        return records.iloc[0:0].assign(score=pd.Series(dtype=float))
+
+    avg_length = max(float(index["lengths"].mean()), 1.0)
+    rows, scores = None, None
+    for token in dict.fromkeys(tokens):
+        token_rows, token_scores = _token_scores(index, token, avg_length)
+        if rows is None:
+            rows, scores = token_rows, token_scores
+            continue
+        rows, left, right = np.intersect1d(rows, token_rows, assume_unique=True, return_indices=True)
+        scores = scores[left] + token_scores[right]
+
+    results = records.iloc[rows].assign(score=scores)
+    if years:
+        results = results[results["year"].isin(years)]
+    return (
+        results.sort_values(["score", "weight"], ascending=False)
+        .drop_duplicates(subset=["year", "document_id"])
+        .head(limit)
+    )
@@ -1,9 +1,8 @@
 import streamlit as st
-from io import BytesIO
-from docx import Document
 import pandas as pd
 from utils.data_loader import get_data,load_geospatial_data
-from utils.charts import output_type_bar_chart, sunburst_chart, trend_line_chart, citation_stack, radar_chart, scatterplot
+from utils import downloads, weights
+from utils.charts import output_type_bar_chart, sunburst_chart, trend_line_chart, citation_stack, radar_chart
 
 # Sidebar navigation using native hamburger menu
 st.sidebar.image("./data/b&s_logo.png")
@@ -204,54 +203,41 @@ st.subheader("3.4.1 Impact ranking")
 st.markdown("While the impact metrics described above provide us with a micro view on the academic and social impact of the articles citing EIGE, it does not allow us to conduct a less granular analysis. To ensure comparability between the articles, we attributed a weight to each metric: 0,3 for number of citations, 0,2 for the impact factor and the altmetric, and 0,15 for location and category of the citation. ")
 with st.container():
     st.dataframe(
-        data[[
+        # the computed impact weight, the one the radar chart above ranks by
+        weights.with_weights(data)[[
             'location_of_the_citation:_3_body_of_the_article;_2_introduction;_1_bibliography/reference', 
             'impact_factor_of_the_journal:_1_respectable;_2_strong;_3_very_strong_(using_free_version_of_scopus)',
             'number_of_mentions_in_social_media_using_altmetric',
-            'ranking/weight'
+            'weight'
         ]]
         .rename(columns={
             'location_of_the_citation:_3_body_of_the_article;_2_introduction;_1_bibliography/reference': 'Location of the citation',
             'impact_factor_of_the_journal:_1_respectable;_2_strong;_3_very_strong_(using_free_version_of_scopus)': 'Impact factor',
             'number_of_mentions_in_social_media_using_altmetric': 'Altmetric',
-            'ranking/weight':'Weight'
+            'weight':'Weight'
         }),
         use_container_width=True  #
     )
 
 #-----DOWNLOAD
-# Save the reoport
-# Path to your existing .docx file
-doc_file_path = "data/2025-01-15 2024 report.docx"
-# Open the file in binary mode
-with open(doc_file_path, "rb") as file:
-    file_data = file.read()
-
-# Path to your existing Excel file
-excel_file_path = "data/2024Q4_20250203.xlsx"
-# Open the Excel file in binary mode
-with open(excel_file_path, "rb") as file:
-    excel_data = file.read()
-
-
 #two cols
 col1, col2 = st.columns(2)
 
 with col1:
-        # Create a report download button
-    st.download_button(
-        label="Download the Q4 2024 report",
-        data=file_data,
-        file_name="Q42024_report.docx",
-        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        type="primary"
+    # Report download button: the file is read only when clicked
+    downloads.file_button(
+        "Download the Q4 2024 report", "data/2025-01-15 2024 report.docx",
+        file_name="Q42024_report.docx", type="primary"
     )
 with col2:
-    # Create data download button
-    st.download_button(
-        label="Download the monitoring data",
-        data=excel_data,
-        file_name="2024Q4_data.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        type="primary"
-    )
\ No newline at end of file
+    # Data download button
+    downloads.file_button(
+        "Download the monitoring data", "data/2024Q4_20250203.xlsx",
+        file_name="2024Q4_data.xlsx", type="primary"
+    )
+
+# Word report generated from the aggregates and charts of the whole report
+downloads.report_button("Generate the Q4 2024 Word report from the current data", "2024Q4")
+
+# Exports of the data shown on the page (sidebar filters applied)
+downloads.export_buttons(data, "2024Q4_data")
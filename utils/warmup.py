@@ -0,0 +1,181 @@
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+
+import streamlit as st
+
+from utils import watcher
+from utils.catalog import REPORTS, data_urls, geo_urls
+
+# Worker threads share the process-wide st.cache_resource / st.cache_data stores with the pages
+WORKERS = int(os.environ.get("CITATION_WARMUP_WORKERS", "2"))
+ENABLED = os.environ.get("CITATION_WARMUP", "1") != "0"
+
+# Queue priorities: neighbours of the report being read go before the background warm-up
+PREFETCH = 0
+WARMUP = 1
+SEARCH_TASK = "search"
+
+
+# -----------------------------
+# Tasks
+# -----------------------------
+def warm_report(report_id):
+    """Fill every cache a report page reads: data, map, countries, filter index, metrics, comparisons, networks, figures."""
+    from utils import comparisons, countries, geo, query, rollups
+    from utils.aggregates import report_figures
+    from utils.data_loader import get_shared_data
+    from utils.filters import cached_index, data_key
+    from utils.network import build_network
+
+    report = REPORTS[report_id]
+    sources = data_urls(report_id)
+    data = get_shared_data(sources)
+    geo.citation_points(sources, geo_urls(report_id))
+    countries.country_join(sources, geo_urls(report_id))
+    cached_index(data_key(data, sources), data)
+    query.output_type_counts(sources)
+    comparisons.comparisons()
+    if report["quarter"] is None:
+        rollups.rollups(sources)
+        for kind in ("author", "institution"):
+            build_network(data, kind=kind)
+    # chart building is most of a cold render
+    report_figures(data, report["year"], annual=report["quarter"] is None)
+
+
+def warm_search():
+    from utils import search
+
+    search.get_index(json.dumps(search.index_meta(search.default_sources()), sort_keys=True))
+
+
+def run_task(task):
+    if task == SEARCH_TASK:
+        warm_search()
+    else:
+        warm_report(task)
+
+
+def neighbours(report_id):
+    """The previous and next quarterly reports (across years) and the annual report of the same year."""
+    quarterly = sorted(
+        (rid for rid, r in REPORTS.items() if r["quarter"] is not None),
+        key=lambda rid: (REPORTS[rid]["year"], REPORTS[rid]["quarter"])
+    )
+    report = REPORTS[report_id]
+    if report["quarter"] is None:
+        return [rid for rid in quarterly if REPORTS[rid]["year"] == report["year"]]
+    i = quarterly.index(report_id)
+    near = quarterly[max(i - 1, 0):i] + quarterly[i + 1:i + 2]
+    annual = [rid for rid, r in REPORTS.items() if r["quarter"] is None and r["year"] == report["year"]]
+    return near + annual
+
+
+# -----------------------------
+# Pool
+# -----------------------------
+def _worker(pool):
+    while True:
+        _, _, task = pool["queue"].get()
+        with pool["lock"]:
+            if pool["status"][task]["state"] != "queued":
+                continue  # queued twice (prefetch of an already queued task)
+            pool["status"][task].update(state="running", started=time.time())
+        start = time.perf_counter()
+        try:
+            run_task(task)
+            update = {"state": "done", "error": None}
+        except Exception as exc:  # reported through status(); the page will load it itself
+            update = {"state": "error", "error": repr(exc)}
+        with pool["lock"]:
+            if pool["status"][task]["state"] == "running":  # else requeued meanwhile (see _requeue)
+                pool["status"][task].update(update, seconds=time.perf_counter() - start)
+
+
+def _submit(pool, task, priority):
+    with pool["lock"]:
+        entry = pool["status"].setdefault(task, {"state": "new", "seconds": None, "error": None})
+        if entry["state"] in ("running", "done", "error"):
+            return
+        if entry["state"] == "queued" and priority >= entry["priority"]:
+            return
+        entry.update(state="queued", priority=priority)
+        pool["queue"].put((priority, next(pool["counter"]), task))
+
+
+def _requeue(pool, path):
+    """Warm the reports (and the search index) reading the changed workbook at `path` again."""
+    tasks = [
+        rid for rid in REPORTS
+        if path in map(watcher.local_path, data_urls(rid) + geo_urls(rid))
+    ]
+    if any(REPORTS[rid]["quarter"] is None for rid in tasks):
+        tasks.append(SEARCH_TASK)
+    for task in tasks:
+        with pool["lock"]:
+            if task in pool["status"]:
+                pool["status"][task]["state"] = "new"
+        _submit(pool, task, WARMUP)
+
+
+@st.cache_resource
+def _pool():
+    """One pool per server process, warming every report on creation."""
+    pool = {
+        "queue": queue.PriorityQueue(),
+        "counter": itertools.count(),
+        "lock": threading.Lock(),
+        "status": {},
+        "started": time.time(),
+    }
+    for _ in range(WORKERS):
+        threading.Thread(target=_worker, args=(pool,), name="citation-warmup", daemon=True).start()
+    for task in list(REPORTS) + [SEARCH_TASK]:
+        _submit(pool, task, WARMUP)
+    watcher.on_change(lambda path: _requeue(pool, path))
+    return pool
+
+
+def start(current=None):
+    """
+    Start the warm-up (first call per process) and move the neighbours of the
+    report being viewed (`current`, a REPORTS key) to the front of the queue.
+    """
+    if not ENABLED:
+        return
+    pool = _pool()
+    if current is not None:
+        for task in neighbours(current):
+            _submit(pool, task, PREFETCH)
+
+
+def status():
+    """Warm-up state per task (`queued` / `running` / `done` / `error`) with timings and errors."""
+    if not ENABLED:
+        return {"enabled": False, "tasks": {}}
+    pool = _pool()
+    with pool["lock"]:
+        tasks = {task: dict(entry) for task, entry in pool["status"].items()}
+    states = [t["state"] for t in tasks.values()]
+    return {
+        "enabled": True,
+        "started": pool["started"],
+        "done": states.count("done"),
+        "errors": states.count("error"),
+        "pending": states.count("queued") + states.count("running"),
+        "tasks": tasks,
+    }
+
+
+def wait(timeout=None):
+    """Block until nothing is queued or running; True when the warm-up finished in time."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while status().get("pending"):
+        if deadline is not None and time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+
+from utils import artifacts
+
+# Seconds between polls of the watched workbooks; 0 only checks when a cached loader is called
+INTERVAL = float(os.environ.get("CITATION_WATCH_INTERVAL", "5"))
+
+_lock = threading.RLock()
+_digests = {}    # local path -> (mtime_ns, size, sha256)
+_entries = {}    # local path -> {key: (cached function, args, fingerprint)} derived from it
+_listeners = []  # called with the local path of every changed workbook
+_thread = None
+
+
+# -----------------------------
+# Content hashes
+# -----------------------------
+def local_path(source):
+    """The file on disk behind a workbook URL or path, or None when there is none to watch."""
+    from utils.data_loader import _repo_relpath, resolve_source
+
+    resolved = str(resolve_source(source))
+    if not resolved.startswith(("http://", "https://")) and os.path.exists(resolved):
+        return os.path.abspath(resolved)
+    relpath = _repo_relpath(source)
+    if relpath:
+        # the deployed checkout mirrors the raw GitHub URLs the pages read
+        path = os.path.join(os.environ.get("CITATION_DATA_DIR") or artifacts.ROOT, relpath)
+        if os.path.exists(path):
+            return os.path.abspath(path)
+    return None
+
+
+def _check(path):
+    """(sha256, changed) of `path`; the file is only rehashed when its mtime or size moved."""
+    try:
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        signature = None
+    with _lock:
+        previous = _digests.get(path)
+        if previous is not None and previous[:2] == signature:
+            return previous[2], False
+    sha = artifacts.file_sha256(path) if signature is not None else None
+    with _lock:
+        _digests[path] = (*(signature or (None, None)), sha)
+    return sha, previous is not None and previous[2] != sha
+
+
+def digest(path):
+    """SHA-256 of a local file, memoized on its mtime and size."""
+    sha, changed = _check(path)
+    if changed:
+        _invalidate(path)
+    return sha
+
+
+def fingerprint(sources):
+    """Content hash of every source (None for files not on disk), in order."""
+    if isinstance(sources, str):
+        sources = [sources]
+    return tuple(digest(path) if path else None for path in map(local_path, sources))
+
+
+# -----------------------------
+# Cache entries
+# -----------------------------
+def call(cached_func, sources, *args):
+    """
+    `cached_func(*args, fingerprint(sources))`: the cache entry is keyed by
+    the content of `sources`, and is cleared when one of them changes.
+    """
+    paths = [local_path(s) for s in ([sources] if isinstance(sources, str) else sources)]
+    fp = tuple(digest(path) if path else None for path in paths)
+    key = repr((cached_func.__qualname__, args, fp))
+    with _lock:
+        for path in filter(None, paths):
+            _entries.setdefault(path, {})[key] = (cached_func, args, fp)
+    _ensure_polling()
+    return cached_func(*args, fp)
+
+
+def on_change(callback):
+    """Register `callback(path)`, run after the entries derived from a changed workbook were cleared."""
+    with _lock:
+        _listeners.append(callback)
+    return callback
+
+
+def _invalidate(path):
+    with _lock:
+        entries = _entries.pop(path, {})
+        listeners = list(_listeners)
+    for cached_func, args, fp in entries.values():
+        cached_func.clear(*args, fp)
+    for callback in listeners:
+        callback(path)
+
+
+# -----------------------------
+# Polling
+# -----------------------------
+def poll():
+    """Check every watched workbook once; returns the paths that changed."""
+    with _lock:
+        paths = list(_digests)
+    changed = [path for path in paths if _check(path)[1]]
+    for path in changed:
+        _invalidate(path)
+    return changed
+
+
+def _poll_forever():
+    while True:
+        time.sleep(INTERVAL)
+        poll()
+
+
+def _ensure_polling():
+    global _thread
+    if INTERVAL <= 0:
+        return
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_poll_forever, name="citation-watcher", daemon=True)
+            _thread.start()
@@ -0,0 +1,194 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.aggregates import WEIGHT_COL
+from utils.instrumentation import timed
+
+# Impact metrics and their workbook columns, in the order of the weight vector
+METRICS = {
+    "citations": "number_of_citations_(using_google_scholar)",
+    "impact_factor": "impact_factor_of_the_journal:_1_respectable;_2_strong;_3_very_strong_(using_free_version_of_scopus)",
+    "altmetric": "number_of_mentions_in_social_media_using_altmetric",
+    "location": "location_of_the_citation:_3_body_of_the_article;_2_introduction;_1_bibliography/reference",
+    "category": "category_of_mention:_1_positive;_0_neutral;_-1_negative",
+}
+LABELS = {
+    "citations": "Citations",
+    "impact_factor": "Impact factor",
+    "altmetric": "Altmetric",
+    "location": "Location of the citation",
+    "category": "Category of mention",
+}
+
+# The monitoring methodology: 0.3 citations, 0.2 impact factor and altmetric, 0.15 location and category.
+# Override with e.g. CITATION_WEIGHTS="citations=0.4,altmetric=0.1"
+DEFAULT_WEIGHTS = {"citations": 0.3, "impact_factor": 0.2, "altmetric": 0.2, "location": 0.15, "category": 0.15}
+# "none": raw metric values, as the stored weights; "max": each metric over its largest value;
+# "minmax": each metric scaled to 0–1 over the rows ranked together
+NORMALIZATIONS = ("none", "max", "minmax")
+NORMALIZATION = os.environ.get("CITATION_WEIGHT_NORMALIZATION", "none")
+# Stored weights farther than this from the formula are reported as mismatches (they are typed by hand)
+TOLERANCE = 0.05
+
+# Parsed rows kept for reuse; the oldest are dropped beyond this many
+MEMO_ROWS = int(os.environ.get("CITATION_WEIGHT_MEMO_ROWS", "100000"))
+
+_memo = pd.DataFrame(columns=list(METRICS), dtype=float)  # input-row hash -> parsed metric values, oldest first
+_lock = threading.Lock()  # every read and write of _memo (pages and warm-up threads)
+
+
+# -----------------------------
+# Configuration
+# -----------------------------
+def validate_weights(weights):
+    """`weights` as a full {metric: float} mapping; ValueError on unknown metrics or negative / all-zero weights."""
+    unknown = set(weights) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unknown impact metrics: {', '.join(sorted(unknown))}. Expected some of {', '.join(METRICS)}.")
+    weights = {metric: float(weights.get(metric, 0.0)) for metric in METRICS}
+    if any(not np.isfinite(w) or w < 0 for w in weights.values()):
+        raise ValueError(f"Impact weights must be non-negative numbers, got {weights}.")
+    if not sum(weights.values()):
+        raise ValueError("At least one impact weight must be positive.")
+    return weights
+
+
+def parse_weights(text):
+    """ "citations=0.4,altmetric=0.1" -> DEFAULT_WEIGHTS with those metrics replaced."""
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        metric, sep, value = part.partition("=")
+        if not sep:
+            raise ValueError(f"Expected metric=weight, got {part!r}.")
+        try:
+            weights[metric.strip()] = float(value)
+        except ValueError:
+            raise ValueError(f"Weight of {metric.strip()} is not a number: {value!r}.") from None
+    return validate_weights(weights)
+
+
+def validate_normalization(normalization):
+    if normalization not in NORMALIZATIONS:
+        raise ValueError(f"Unknown weight normalization {normalization!r}. Expected one of {', '.join(NORMALIZATIONS)}.")
+    return normalization
+
+
+WEIGHTS = parse_weights(os.environ.get("CITATION_WEIGHTS", ""))
+validate_normalization(NORMALIZATION)
+
+
+# -----------------------------
+# Metric values
+# -----------------------------
+def altmetric_counts(values):
+    """
+    Social-media mentions from the Altmetric column: numbers as they are;
+    "18 ( 11 X users; 4 Bluesky users, ...)" is its leading total, other
+    text ("posted by 2 X users, 1 Facebook page") the sum of its counts.
+    """
+    text = values.astype("string").str.strip()
+    numbers = pd.to_numeric(values, errors="coerce")
+    total = pd.to_numeric(text.str.extract(r"^(\d+)\s*\(", expand=False), errors="coerce")
+    parts = text.str.extractall(r"(\d+)")[0].astype(float).groupby(level=0).sum()
+    return numbers.fillna(total).fillna(parts.reindex(values.index)).fillna(0.0)
+
+
+def parse_metrics(inputs):
+    """The numeric metric values of raw workbook inputs (one column per metric; blanks count 0)."""
+    parsed = pd.DataFrame(index=inputs.index)
+    for metric in METRICS:
+        if metric == "altmetric":
+            parsed[metric] = altmetric_counts(inputs[metric])
+        else:
+            parsed[metric] = pd.to_numeric(inputs[metric], errors="coerce").fillna(0.0)
+    return parsed.astype(float)
+
+
+def metric_matrix(data):
+    """
+    One row of metric values per row of `data`. Rows are keyed by the hash
+    of their raw inputs, so only rows whose inputs were never seen (a new or
+    edited row of an updated workbook) are parsed again. At most MEMO_ROWS
+    parsed rows are kept, the most recently added ones.
+    """
+    global _memo
+    inputs = pd.DataFrame({
+        metric: data[col].astype(object) if col in data.columns else pd.Series(None, index=data.index, dtype=object)
+        for metric, col in METRICS.items()
+    }, index=data.index)
+    keys = pd.util.hash_pandas_object(inputs.astype(str), index=False).to_numpy()
+    with _lock:
+        new = ~pd.Index(keys).isin(_memo.index)
+        if new.any():
+            parsed = parse_metrics(inputs[new])
+            parsed.index = keys[new]
+            _memo = pd.concat([_memo, parsed[~parsed.index.duplicated()]])
+        matrix = _memo.loc[keys].to_numpy()
+        if len(_memo) > MEMO_ROWS:
+            _memo = _memo.iloc[-MEMO_ROWS:]
+        return matrix
+
+
+def normalize(matrix, normalization=None):
+    normalization = validate_normalization(normalization or NORMALIZATION)
+    if normalization == "none" or not len(matrix):
+        return matrix
+    low = matrix.min(axis=0) if normalization == "minmax" else np.zeros(matrix.shape[1])
+    span = matrix.max(axis=0) - low
+    return (matrix - low) / np.where(span > 0, span, 1.0)
+
+
+# -----------------------------
+# Weights
+# -----------------------------
+@timed("compute_weights", kind="builder")
+def compute(data, weights=None, normalization=None):
+    """The impact weight of every row of `data`: its (normalized) metric values times `weights`, in one product."""
+    vector = np.array(list(validate_weights(weights or WEIGHTS).values()))
+    return pd.Series(normalize(metric_matrix(data), normalization) @ vector, index=data.index, name="weight").round(4)
+
+
+def with_weights(data, weights=None, normalization=None):
+    """`data` with the computed weight in a `weight` column (a shallow copy; the shared frame is not touched)."""
+    return data.assign(weight=compute(data, weights, normalization))
+
+
+def validate(data, tolerance=TOLERANCE):
+    """
+    The stored `ranking/weight` next to the weight of the methodology
+    (default weights, raw values), with the rows that disagree flagged.
+    """
+    stored = pd.to_numeric(data[WEIGHT_COL], errors="coerce") if WEIGHT_COL in data.columns else np.nan
+    computed = compute(data, DEFAULT_WEIGHTS, "none")
+    report = pd.DataFrame({"stored": stored, "computed": computed}, index=data.index)
+    report["difference"] = (report["computed"] - report["stored"]).round(4)
+    report["matches"] = report["difference"].abs() <= tolerance
+    return report
+
+
+# -----------------------------
+# Rendering
+# -----------------------------
+def weight_controls(key="weights"):
+    """Sliders for the weight of every metric (and the normalization), behind an expander; returns (weights, normalization)."""
+    with st.expander("Adjust the impact weights"):
+        columns = st.columns(len(METRICS))
+        weights = {}
+        for column, metric in zip(columns, METRICS):
+            with column:
+                weights[metric] = st.slider(
+                    LABELS[metric], 0.0, 1.0, WEIGHTS[metric], step=0.05, key=f"{key}_{metric}"
+                )
+        normalization = st.radio(
+            "Normalization", NORMALIZATIONS, index=NORMALIZATIONS.index(NORMALIZATION),
+            horizontal=True, key=f"{key}_normalization",
+            help="none: raw values, as in the methodology; max / minmax: every metric scaled to 0–1 first.",
+        )
+    if not sum(weights.values()):
+        st.warning("All weights are zero; using the default weights.")
+        return WEIGHTS, normalization
+    return weights, normalization
@@ -0,0 +1,226 @@
+import importlib.util
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from utils import artifacts, disk_cache
+
+# Chart images are rendered by this many processes (0: one per CPU, 1: in the calling process)
+IMAGE_WORKERS = int(os.environ.get("CITATION_IMAGE_WORKERS", "0")) or os.cpu_count() or 1
+IMAGE_SIZE = (1000, 600)  # pixels
+IMAGE_WIDTH_INCHES = 6.0
+MAX_TABLE_ROWS = 60
+
+# Stored documents are rebuilt when this module or a module their aggregates and figures come from changes
+REPORT_MODULES = [
+    "utils/word_report.py", "utils/aggregates.py", "utils/charts.py", "utils/weights.py",
+    "utils/network.py", "utils/rollups.py", "utils/sketches.py",
+]
+_CODE = artifacts.modules_fingerprint(REPORT_MODULES)
+
+SECTION_FIGURES = {
+    "EIGE outputs cited": ["output_type_bar_chart", "annual_bar", "sunburst_chart"],
+    "Trends": ["total_citations_trend", "trend_line_chart"],
+    "Documents citing EIGE": ["citation_stack", "network_chart"],
+    "Impact": ["radar_chart"],
+}
+
+
+# -----------------------------
+# Chart images (run in worker processes)
+# -----------------------------
+def figure_png(fig_json):
+    """PNG of a Plotly figure (JSON) rendered by kaleido; None when it cannot render (no kaleido or browser)."""
+    import plotly.io as pio
+
+    width, height = IMAGE_SIZE
+    try:
+        return pio.from_json(fig_json).to_image(format="png", width=width, height=height, scale=2)
+    except Exception:  # kaleido missing, or no Chrome for it to drive
+        return None
+
+
+def render_images(figures, workers=None):
+    """{name: PNG bytes or None} of Plotly `figures`, rendered in `workers` processes (1: in this process)."""
+    import plotly.io as pio
+
+    workers = min(workers or IMAGE_WORKERS, len(figures))
+    jsons = {name: pio.to_json(fig) for name, fig in figures.items()}
+    if workers <= 1:
+        return {name: figure_png(fig_json) for name, fig_json in jsons.items()}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {name: pool.submit(figure_png, fig_json) for name, fig_json in jsons.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def figure_table(fig):
+    """
+    The values a chart plots, for documents whose images could not be rendered:
+    one row per trace and one column per label, or a single "Value" column
+    when no label is shared by two traces.
+    Traces on numeric x/y coordinates (the network layout) have no such table.
+    """
+    rows = []
+    for trace in fig.data:
+        if trace.type == "sunburst":
+            parents = trace.parents if trace.parents is not None else [""] * len(trace.labels)
+            labels = [f"{parent} / {label}" if parent else label for label, parent in zip(trace.labels, parents)]
+            values = trace.values
+        elif trace.type == "scatterpolar":
+            labels, values = trace.theta, trace.r
+        elif trace.type in ("bar", "scatter"):
+            horizontal = trace.orientation == "h"
+            labels, values = (trace.y, trace.x) if horizontal else (trace.x, trace.y)
+            if labels is None or values is None or pd.api.types.is_float_dtype(pd.Series(list(labels))):
+                continue
+        else:
+            continue
+        rows += [(trace.name or "", label, value) for label, value in zip(labels, values)]
+    if not rows:
+        return None
+    table = pd.DataFrame(rows, columns=["Series", "Label", "Value"])
+    if table.groupby("Label", sort=False)["Series"].nunique().max() == 1:  # one trace per label (coloured bars)
+        return table.groupby("Label", sort=False)["Value"].sum()
+    return table.pivot_table(index="Series", columns="Label", values="Value", aggfunc="sum", sort=False)
+
+
+# -----------------------------
+# Narrative
+# -----------------------------
+def ranking(counts, limit=None):
+    """ "Q4 (22), Q2 (17), Q3 (12)": labels by descending count."""
+    counts = counts[counts > 0].sort_values(ascending=False, kind="stable")
+    return ", ".join(f"{label} ({int(count)})" for label, count in counts.head(limit).items())
+
+
+def narrative(report, aggregates):
+    """The report's summary paragraphs, every number taken from `aggregates`."""
+    period = report["title"].replace(" Report", "").replace(" Annual", "")
+    if report["quarter"] is not None:
+        period += f" ({aggregates['months']})"
+    paragraphs = [
+        f"In {period}, EIGE was mentioned {aggregates['mentions']} times in "
+        f"{aggregates['documents']} documents"
+        + (f" published in {aggregates['journals']} journals." if aggregates.get("journals") else "."),
+    ]
+    if aggregates.get("most_frequent_output_type"):
+        output_types = aggregates["output_types"]
+        paragraphs.append(
+            f"The most cited EIGE output type was {aggregates['most_frequent_output_type']} "
+            f"({int(output_types.max())} mentions). By output type: {ranking(output_types, limit=5)}."
+        )
+    if "quarter_summary" in aggregates:
+        quarters = aggregates["quarter_summary"].loc[["Q1", "Q2", "Q3", "Q4"], "Number of publications"]
+        paragraphs.append(f"Publications per quarter, most active first: {ranking(quarters)}.")
+    if len(aggregates.get("repeating_authors", ())):
+        paragraphs.append(
+            f"{len(aggregates['repeating_authors'])} authors cited EIGE more than once, "
+            f"led by {ranking(aggregates['repeating_authors'], limit=3)}."
+        )
+    return paragraphs
+
+
+# -----------------------------
+# Document
+# -----------------------------
+def _cell_text(value):
+    if value is None or (not isinstance(value, (list, dict)) and pd.isna(value)):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def add_table(document, frame, max_rows=MAX_TABLE_ROWS):
+    """Append `frame` (a Series or DataFrame; named index included) as a Word table."""
+    if isinstance(frame, pd.Series):
+        frame = frame.rename(frame.name or "count").to_frame()
+    if frame.index.name is not None or not isinstance(frame.index, pd.RangeIndex):
+        frame = frame.reset_index()
+    shown = frame.head(max_rows)
+    table = document.add_table(rows=1, cols=len(shown.columns), style="Light Grid Accent 1")
+    for cell, column in zip(table.rows[0].cells, shown.columns):
+        cell.text = str(column).replace("_", " ")
+    for row in shown.itertuples(index=False, name=None):
+        for cell, value in zip(table.add_row().cells, row):
+            cell.text = _cell_text(value)
+    if len(frame) > max_rows:
+        document.add_paragraph().add_run(f"First {max_rows} of {len(frame)} rows.").italic = True
+    return table
+
+
+def build_document(report, aggregates, figures, images):
+    """The report as .docx bytes: summary, tables and chart images (their data where an image is None)."""
+    from docx import Document
+    from docx.shared import Inches
+
+    document = Document()
+    document.add_heading(report["title"], level=0)
+    document.add_paragraph().add_run(aggregates["months"]).italic = True
+
+    document.add_heading("1. Summary", level=1)
+    for paragraph in narrative(report, aggregates):
+        document.add_paragraph(paragraph)
+    if "quarter_summary" in aggregates:
+        add_table(document, aggregates["quarter_summary"])
+
+    def add_figures(names):
+        for name in names:
+            if images.get(name) is not None:
+                document.add_picture(io.BytesIO(images[name]), width=Inches(IMAGE_WIDTH_INCHES))
+                continue
+            table = figure_table(figures[name]) if name in figures else None
+            if table is not None and len(table):
+                document.add_paragraph().add_run(
+                    f"{figures[name].layout.title.text or name.replace('_', ' ').capitalize()} (chart data; the image could not be rendered)"
+                ).italic = True
+                add_table(document, table)
+
+    tables = {
+        "EIGE outputs cited": ["output_types"],
+        "Trends": ["monthly_documents"],
+        "Documents citing EIGE": ["documents_table", "repeating_authors", "repeating_universities",
+                                  "most_connected_institutions"],
+        "Impact": ["top_impact"],
+    }
+    for number, (title, figure_names) in enumerate(SECTION_FIGURES.items(), start=2):
+        document.add_heading(f"{number}. {title}", level=1)
+        for name in tables[title]:
+            value = aggregates.get(name)
+            if value is not None and len(value):
+                document.add_heading(name.replace("_", " ").capitalize(), level=2)
+                add_table(document, value)
+        add_figures(figure_names)
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def build_report_docx(report_id, data, workers=None):
+    """Aggregates and figures of a report (the pages' cached builders), images and document."""
+    from utils.aggregates import report_aggregates, report_figures
+    from utils.catalog import REPORTS
+
+    report = REPORTS[report_id]
+    annual = report["quarter"] is None
+    aggregates = report_aggregates(data, report["year"], annual=annual)
+    figures = report_figures(data, report["year"], annual=annual)
+    return build_document(report, aggregates, figures, render_images(figures, workers))
+
+
+def report_docx(report_id, workers=None, data=None):
+    """
+    The generated Word report of `report_id`, cached on disk by the content
+    of its data (and the code of REPORT_MODULES, and whether kaleido is installed).
+    """
+    from utils.catalog import data_urls
+    from utils.data_loader import get_shared_data
+
+    data = get_shared_data(data_urls(report_id)) if data is None else data
+    return disk_cache.cached(
+        "docx", (report_id, disk_cache.content_key(data), _CODE, importlib.util.find_spec("kaleido") is not None),
+        lambda: build_report_docx(report_id, data, workers)
+    )